@@ -0,0 +1,176 @@
+"""Бенчмарк раздачи апдейтов: стандартный handle_update против ShardedDispatcher.
+
+Запуск из корня репозитория:
+    python -m app.benchmarks.bench_dispatcher --users 10000 --messages 5
+
+Синтетические пользователи присылают по несколько сообщений подряд; апдейты
+перемешиваются между пользователями, но у каждого идут по порядку. Бот —
+настоящий aiomax.Bot, у которого вместо aiohttp-сессии стоит заглушка MAX API
+(отвечает с задержкой --api-latency). Хендлер, как хендлеры бота, читает
+данные FSM, ждёт «бекенд» (--handler-delay со случайным разбросом), записывает
+данные FSM и отвечает сообщением.
+
+Для каждого режима выводится время, апдейтов в секунду, задержка ответа и
+число нарушений порядка (хендлер увидел не предыдущее сообщение пользователя).
+Режим default повторяет bot.run(): задачи хендлеров запускаются без ожидания.
+Дочерние процессы (BOT_WORKER_PROCESSES) здесь не запускаются — они делят
+апдейты тем же process_for и внутри устроены как режим sharded.
+"""
+import time
+import random
+import asyncio
+import argparse
+
+import aiomax
+
+from app.services.dispatcher import ShardedDispatcher, BOT_SHARDS
+from app.services.resilience import LatencyHistogram
+
+
+class StubResponse:
+    """Ответ заглушки MAX API (то, что читают aiomax и PacedBot)."""
+
+    content_type = "application/json"
+
+    def __init__(self, payload: dict, status: int = 200):
+        self.status = status
+        self.headers = {}
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+    def release(self):
+        pass
+
+
+class StubMaxApi:
+    """Заглушка aiohttp-сессии бота: каждый запрос отвечает через latency секунд."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+
+    async def _respond(self, url: str, params: dict | None = None, json: dict | None = None, **kwargs):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        params = params or {}
+        chat_id = params.get("chat_id") or params.get("user_id") or 0
+        body = json or {}
+        return StubResponse({
+            "message": {
+                "recipient": {"chat_id": int(chat_id), "chat_type": "dialog"},
+                "body": {"mid": f"stub-{self.requests}", "seq": self.requests, "text": body.get("text")},
+                "timestamp": int(time.time() * 1000),
+                "sender": {"user_id": 1, "first_name": "bench", "name": "bench", "is_bot": True, "last_activity_time": 0},
+            }
+        })
+
+    get = post = put = patch = delete = _respond
+
+
+def synthetic_updates(users: int, messages: int, seed: int) -> list[dict]:
+    """messages сообщений от каждого из users пользователей, перемешанных между пользователями."""
+    rng = random.Random(seed)
+    pending = {user_id: 0 for user_id in range(1, users + 1)}
+    updates = []
+    while pending:
+        user_id = rng.choice(list(pending)) if len(pending) < 64 else rng.randint(1, users)
+        if user_id not in pending:
+            continue
+        seq = pending[user_id]
+        updates.append({
+            "update_type": "message_created",
+            "timestamp": 0,
+            "message": {
+                "sender": {"user_id": user_id, "first_name": "user", "name": "user", "is_bot": False, "last_activity_time": 0},
+                "recipient": {"chat_id": user_id, "chat_type": "dialog"},
+                "body": {"mid": f"{user_id}-{seq}", "seq": seq, "text": f"msg {seq}"},
+                "timestamp": 0,
+            },
+        })
+        if seq + 1 == messages:
+            del pending[user_id]
+        else:
+            pending[user_id] = seq + 1
+    return updates
+
+
+def create_bench_bot(api: StubMaxApi, handler_delay: float, stats: dict):
+    bot = aiomax.Bot("bench-token", default_format="markdown")
+    bot.session = api
+    bot.username = "bench_bot"
+
+    @bot.on_message()
+    async def echo(message: aiomax.Message, cursor: aiomax.fsm.FSMCursor):
+        seq = int(message.body.text.split()[1])
+        data = cursor.get_data() or {"last": -1}
+        if data["last"] != seq - 1:
+            stats["order_violations"] += 1
+        await asyncio.sleep(handler_delay * random.uniform(0.5, 1.5))
+        cursor.change_data({"last": seq})
+        await message.reply(f"ok {seq}")
+        stats["latency"].observe("reply", time.perf_counter() - stats["dispatched_at"].pop(message.body.message_id))
+
+    return bot
+
+
+async def run_default(bot, updates: list[dict], dispatched_at: dict) -> None:
+    """Как bot.run(): handle_update запускает задачи хендлеров и не ждёт их."""
+    before = asyncio.all_tasks()
+    for update in updates:
+        dispatched_at[update["message"]["body"]["mid"]] = time.perf_counter()
+        await bot.handle_update(update)
+    await asyncio.gather(*(asyncio.all_tasks() - before))
+
+
+async def run_sharded(bot, updates: list[dict], dispatched_at: dict, shards: int) -> None:
+    dispatcher = ShardedDispatcher(bot, shards, queue_size=1000)
+    await dispatcher.start()
+    for update in updates:
+        dispatched_at[update["message"]["body"]["mid"]] = time.perf_counter()
+        await dispatcher.dispatch(update)
+    await dispatcher.stop()
+
+
+async def bench(mode: str, args) -> dict:
+    api = StubMaxApi(args.api_latency)
+    stats = {"order_violations": 0, "latency": LatencyHistogram(), "dispatched_at": {}}
+    bot = create_bench_bot(api, args.handler_delay, stats)
+    updates = synthetic_updates(args.users, args.messages, args.seed)
+
+    started = time.perf_counter()
+    if mode == "default":
+        await run_default(bot, updates, stats["dispatched_at"])
+    else:
+        await run_sharded(bot, updates, stats["dispatched_at"], args.shards)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "updates": len(updates),
+        "seconds": round(elapsed, 2),
+        "updates_per_second": round(len(updates) / elapsed),
+        "api_requests": api.requests,
+        "order_violations": stats["order_violations"],
+        "reply_latency_ms": {
+            key: value for key, value in stats["latency"].snapshot()["reply"].items() if key != "buckets"
+        },
+    }
+
+
+async def main(args) -> None:
+    for mode in args.modes:
+        print(await bench(mode, args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Раздача апдейтов: default против sharded на заглушке MAX API")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=5, help="сообщений от каждого пользователя")
+    parser.add_argument("--shards", type=int, default=BOT_SHARDS)
+    parser.add_argument("--api-latency", type=float, default=0.005, help="задержка ответа MAX API, с")
+    parser.add_argument("--handler-delay", type=float, default=0.01, help="средняя задержка «бекенда» в хендлере, с")
+    parser.add_argument("--modes", nargs="+", default=["default", "sharded"], choices=["default", "sharded"])
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -38,11 +38,15 @@ from app.keyboards.inline_keyboards import (
     admin_help_keyboard,
     application_moderation_keyboard,
     my_applications_return_keyboard,
+    events_page_keyboard,
+    funds_page_keyboard,
 )
 from app.states import VolunteerStates, HelpRequestStates, CommonStates, AdminStates
 from app.services.role_stub import get_role, set_role, MOCK_FEED_MESSAGE, MOCK_REQUEST_DETAILS
 from app.services.backend_client import backend_client
+from app.services.name_matcher import city_matchers, tag_matchers
 from app.services.session_store import set_session_token, get_session_token
+from app.services.send_scheduler import bulk_sends
 
 # Логгер для отслеживания аутентификации и стартовых событий
 logger = logging.getLogger(__name__)
@@ -65,11 +69,16 @@ WELCOME_MESSAGE = (
 CITY_PROMPT_SUFFIX = (
     "Доступные города: 🏙️ Москва • 🏛️ Санкт-Петербург • 🏔️ Новосибирск"
 )
-MAX_CITIES_PAGE_SIZE = 100  # Ограничение бекенда (page_size <= 100)
 INTERESTS_PROMPT_SUFFIX = (
     "Доступные интересы: 🌿 экология, 📚 образование, 🏥 медицина, 👶 дети, 🐾 животные"
 )
 
+# Режим вывода лент: "page" — страница одним сообщением с кнопками под каждым
+# элементом и листанием (редактирование сообщения на месте), "items" — как раньше,
+# отдельное сообщение на каждое событие/фонд. Читается при каждом выводе (FEED_RENDER_MODE).
+FEED_DESCRIPTION_LIMIT = 300  # обрезка описания в странице ленты
+MESSAGE_TEXT_LIMIT = 4000  # лимит текста сообщения MAX
+
 # Разрешаем этому пользователю переизбирать роль (для тестов)
 TEST_USER_ID = 89408765
 
@@ -95,8 +104,6 @@ def is_state(expected: str) -> Callable[[aiomax.Message], bool]:
 _RETURN_TO_FEED: dict[int, bool] = {}
 _RETURN_TO_PROFILE: dict[int, bool] = {}
 _FUND_FEED_CACHE: dict[int, dict[int, dict]] = {}  # user_id -> {fund_id: fund_dict}
-_SELECTED_FUND: dict[int, int] = {}  # user_id -> fund_id (для доната)
-_PENDING_EVENT_DATA: dict[int, dict] = {}  # временное хранение данных события до ввода города
 
 def _set_return_to_feed(user_id: int) -> None:
     _RETURN_TO_FEED[user_id] = True
@@ -114,13 +121,75 @@ def _has_return_to_profile(user_id: int) -> bool:
 def _clear_return_to_profile(user_id: int) -> None:
     _RETURN_TO_PROFILE.pop(user_id, None)
 
+def _fsm_data(storage: Any, user_id: int) -> dict:
+    """Копия данных FSM пользователя (словарь; менять через _update_fsm_data)."""
+    data = storage.get_data(user_id)
+    return dict(data) if isinstance(data, dict) else {}
+
+def _update_fsm_data(storage: Any, user_id: int, **changes: Any) -> None:
+    """Обновить ключи данных FSM (None удаляет ключ): данные хранятся вместе с состоянием."""
+    data = _fsm_data(storage, user_id)
+    for key, value in changes.items():
+        if value is None:
+            data.pop(key, None)
+        else:
+            data[key] = value
+    storage.change_data(user_id, data or None)
+
 async def _show_feed(send_callable: Callable[[str, Any | None], Awaitable[aiomax.Message]]) -> None:
     """Показ ленты с клавиатурой действий."""
     kb = feed_actions_keyboard()
     await send_callable(MOCK_FEED_MESSAGE, keyboard=kb)
 
+def _shorten(text: str, limit: int | None) -> str:
+    if limit is None or len(text) <= limit:
+        return text
+    return text[:limit - 1].rstrip() + "…"
+
+def _feed_render_mode() -> str:
+    return os.getenv("FEED_RENDER_MODE", "page").lower()
+
+def _page_text(header: str, blocks: list[str], footer: str) -> str:
+    """Текст страницы ленты не длиннее MESSAGE_TEXT_LIMIT: при переполнении обрезаются блоки, а не заголовок и подсказка."""
+    body_limit = MESSAGE_TEXT_LIMIT - len(header) - len(footer) - 4
+    return header + "\n\n" + _shorten("\n\n".join(blocks), body_limit) + "\n\n" + footer
+
+def _format_event(event: dict, description_limit: int | None = None) -> str:
+    """Блок с данными события для ленты."""
+    return (
+        "────────────────\n"
+        f"🧷 ID: {event.get('id')}\n"
+        f"📝 Название: {event.get('title') or '—'}\n"
+        f"📄 Описание: {_shorten(event.get('description') or '—', description_limit)}\n"
+        f"📍 Адрес: {event.get('address') or '—'}\n"
+        f"🛠️ Что делать: {event.get('what_to_do') or '—'}\n"
+        "────────────────"
+    )
+
+def _format_fund(fund: dict, description_limit: int | None = None) -> str:
+    """Блок с данными фонда для ленты."""
+    target = fund.get("target_amount") or 0
+    collected = fund.get("collected_amount") or 0
+    progress_pct = 0
+    try:
+        if target > 0:
+            progress_pct = int((collected / target) * 100)
+    except Exception:
+        progress_pct = 0
+    return (
+        "────────────────\n"
+        f"🧷 ID: {fund.get('id')}\n"
+        f"📝 Название: {fund.get('title') or '—'}\n"
+        f"📄 Описание: {_shorten(fund.get('description') or '—', description_limit)}\n"
+        f"🎯 Цель: {target}₽\n"
+        f"📦 Собрано: {collected}₽ ({progress_pct}%)\n"
+        f"⭐ Рейтинг за 100₽: +{fund.get('rating_per_100') or 0}\n"
+        "────────────────"
+    )
+
 async def _send_events_feed(
     user_id: int,
+    storage: Any,
     send_callable: Callable[[str, Any | None], Awaitable[aiomax.Message]],
     page: int = 1,
     page_size: int = 5,
@@ -128,7 +197,10 @@ async def _send_events_feed(
     """Получить ленту событий с бэкенда и отправить пользователю.
 
     Используется как в первоначальном переходе по кнопке 'Лента заявок', так и при возврате
-    из подтверждения отклика / после изменения фильтров.
+    из подтверждения отклика / после изменения фильтров. В режиме "page" страница уходит одним
+    сообщением; при листании send_callable редактирует это сообщение (cb.answer).
+    Курсоры страниц (next_cursor бэкенда) лежат в данных FSM под ключом "feed_cursors":
+    кнопки несут только номер страницы, а бэкенд листает по курсору, а не через OFFSET.
     """
     token = get_session_token(user_id)
     if not token:
@@ -139,36 +211,28 @@ async def _send_events_feed(
         )
         return
 
-    include_tag_ids: list[int] | None = None
-    try:
-        profile = await backend_client.get_user_profile(token)
-        interests = (profile.get("interests") or [])
-        if interests:
-            try:
-                tags = await backend_client.get_tags(page=1, page_size=100)
-                tag_map = {t.get("name", "").lower(): t.get("id") for t in tags}
-                for interest in interests:
-                    tid = tag_map.get(str(interest).lower())
-                    if tid is not None:
-                        include_tag_ids = [tid]
-                        break
-            except Exception as e_tags:
-                logger.warning("Tags fetch failed (events_feed): user_id=%s error=%s", user_id, e_tags)
-    except Exception as e_prof:
-        logger.warning("Profile fetch failed (events_feed): user_id=%s error=%s", user_id, e_prof)
-
+    # Экран ленты одним запросом: персональная лента (по всем интересам) и город.
+    # Первая страница открывается заново, остальные — по курсору, сохранённому при показе предыдущей.
+    feed_cursors: dict[str, str] = (_fsm_data(storage, user_id).get("feed_cursors") or {}) if page > 1 else {}
     events: list[dict] = []
+    has_city = True
     try:
-        feed_resp = await backend_client.get_events_feed(
-            token=token,
-            include_tag_ids=include_tag_ids,
-            page=page,
-            page_size=page_size,
+        screen = await backend_client.get_feed_screen(
+            token, page=page, page_size=page_size, after=feed_cursors.get(str(page))
         )
-        events = feed_resp.get("events") or []
+        has_city = screen.get("city") is not None
+        events = (screen.get("feed") or {}).get("events") or []
     except Exception as e_feed:
         logger.warning("Events feed fetch failed (events_feed): user_id=%s error=%s", user_id, e_feed)
 
+    if not has_city:
+        kb = volunteer_main_menu_keyboard()
+        await send_callable(
+            "🏙️ Город не указан — лента пуста. Укажите город через 'Редактировать профиль'.",
+            keyboard=kb,
+        )
+        return
+
     if not events:
         kb = volunteer_main_menu_keyboard()
         await send_callable(
@@ -178,26 +242,32 @@ async def _send_events_feed(
         return
 
     # Состояние ленты — сохраняем MAIN_MENU (навигационные кнопки работают)
-    # Отправляем каждое событие отдельным сообщением
-    for event in events:
-        eid = event.get("id")
-        title = event.get("title") or "—"
-        description = event.get("description") or "—"
-        address = event.get("address") or "—"
-        what_to_do = event.get("what_to_do") or "—"
-        text = (
-            "📌 Мероприятие\n"
-            "────────────────\n"
-            f"🧷 ID: {eid}\n"
-            f"📝 Название: {title}\n"
-            f"📄 Описание: {description}\n"
-            f"📍 Адрес: {address}\n"
-            f"🛠️ Что делать: {what_to_do}\n"
-            "────────────────\n"
-            "Нажмите 'Откликнуться', если готовы помочь."
+    if _feed_render_mode() == "page":
+        total_pages = max(page, int((screen.get("feed") or {}).get("total_pages") or 1))
+        text = _page_text(
+            f"📋 Лента заявок — страница {page} из {total_pages}",
+            [_format_event(event, FEED_DESCRIPTION_LIMIT) for event in events],
+            "Нажмите 'Откликнуться #ID' под событием, если готовы помочь.",
         )
-        kb_item = event_item_keyboard()
-        await send_callable(text, keyboard=kb_item)
+        feed_cursors = {key: value for key, value in feed_cursors.items() if int(key) <= page}
+        next_cursor = (screen.get("feed") or {}).get("next_cursor")
+        if next_cursor:
+            feed_cursors[str(page + 1)] = next_cursor
+        _update_fsm_data(storage, user_id, feed_cursors=feed_cursors or None)
+        kb = events_page_keyboard([event.get("id") for event in events], page, total_pages)
+        await send_callable(text, keyboard=kb)
+        return
+
+    # Отправляем каждое событие отдельным сообщением (пачка — в полосе массовых отправок)
+    with bulk_sends():
+        for event in events:
+            text = (
+                "📌 Мероприятие\n"
+                + _format_event(event)
+                + "\nНажмите 'Откликнуться', если готовы помочь."
+            )
+            kb_item = event_item_keyboard()
+            await send_callable(text, keyboard=kb_item)
 
 async def _send_funds_feed(
     user_id: int,
@@ -205,7 +275,7 @@ async def _send_funds_feed(
     page: int = 1,
     page_size: int = 5,
 ) -> None:
-    """Получить ленту фондов и отправить пользователю."""
+    """Получить ленту фондов и отправить пользователю (в режиме "page" — одним сообщением)."""
     token = get_session_token(user_id)
     if not token:
         kb = volunteer_main_menu_keyboard()
@@ -236,33 +306,93 @@ async def _send_funds_feed(
 
     _FUND_FEED_CACHE[user_id] = {f.get("id"): f for f in funds if f.get("id") is not None}
 
-    for fund in funds:
-        fid = fund.get("id")
-        title = fund.get("title") or "—"
-        description = fund.get("description") or "—"
-        target = fund.get("target_amount") or 0
-        collected = fund.get("collected_amount") or 0
-        rating_per_100 = fund.get("rating_per_100") or 0
-        progress_pct = 0
-        try:
-            if target > 0:
-                progress_pct = int((collected / target) * 100)
-        except Exception:
-            progress_pct = 0
-        text = (
-            "💰 Фонд помощи\n"
-            "────────────────\n"
-            f"🧷 ID: {fid}\n"
-            f"📝 Название: {title}\n"
-            f"📄 Описание: {description}\n"
-            f"🎯 Цель: {target}₽\n"
-            f"📦 Собрано: {collected}₽ ({progress_pct}%)\n"
-            f"⭐ Рейтинг за 100₽: +{rating_per_100}\n"
-            "────────────────\n"
-            "Нажмите 'Пожертвовать', чтобы сделать вклад."
+    if _feed_render_mode() == "page":
+        total_pages = max(page, int(feed_resp.get("total_pages") or 1))
+        text = _page_text(
+            f"💰 Фонды помощи — страница {page} из {total_pages}",
+            [_format_fund(fund, FEED_DESCRIPTION_LIMIT) for fund in funds],
+            "Нажмите 'Пожертвовать #ID' под фондом, чтобы сделать вклад.",
         )
-        kb_item = fund_item_keyboard()
-        await send_callable(text, keyboard=kb_item)
+        kb = funds_page_keyboard([fund.get("id") for fund in funds], page, total_pages)
+        await send_callable(text, keyboard=kb)
+        return
+
+    with bulk_sends():
+        for fund in funds:
+            text = (
+                "💰 Фонд помощи\n"
+                + _format_fund(fund)
+                + "\nНажмите 'Пожертвовать', чтобы сделать вклад."
+            )
+            kb_item = fund_item_keyboard()
+            await send_callable(text, keyboard=kb_item)
+
+async def _submit_application(
+    user_id: int,
+    event_id: int,
+    storage: Any,
+    send_callable: Callable[[str, Any | None], Awaitable[aiomax.Message]],
+) -> None:
+    """Отклик на событие: проверка события, создание заявки и ответ пользователю."""
+    token = get_session_token(user_id)
+    if not token:
+        storage.change_state(user_id, VolunteerStates.MAIN_MENU)
+        kb = volunteer_main_menu_keyboard()
+        await send_callable("⚠️ Нет активной сессии. /start", keyboard=kb)
+        return
+
+    # Проверим что событие действительно существует — запрос деталей
+    event_details = None
+    try:
+        event_details = await backend_client.get_event_details(token, event_id)
+    except Exception as e_event:
+        logger.warning("Event details failed user_id=%s event_id=%s error=%s", user_id, event_id, e_event)
+
+    if not event_details:
+        kb_err = response_confirmation_keyboard()
+        await send_callable(
+            "❌ Событие с таким ID не найдено. Проверьте и введите снова или вернитесь к ленте.",
+            keyboard=kb_err,
+        )
+        return
+
+    # Создаём отклик
+    created_app = None
+    try:
+        created_app = await backend_client.create_application(token, event_id)
+    except Exception as e_create:
+        logger.warning("Create application failed user_id=%s event_id=%s error=%s", user_id, event_id, e_create)
+
+    if not created_app:
+        kb_err = response_confirmation_keyboard()
+        await send_callable(
+            "❌ Не удалось создать отклик. Попробуйте позже или вернитесь к ленте.",
+            keyboard=kb_err,
+        )
+        return
+
+    # Готовим красивый ответ с деталями события
+    contact = event_details.get("contact") or "—"
+    date = event_details.get("date") or "—"
+    address = event_details.get("address") or "—"
+    what_to_do = event_details.get("what_to_do") or "—"
+    title = event_details.get("title") or "—"
+
+    text = (
+        "✅ Спасибо за отклик! Ваша заявка на рассмотрении.\n"
+        "────────────────────\n"
+        f"🧷 ID события: {event_id}\n"
+        f"📝 Название: {title}\n"
+        f"☎️ Контакт: {contact}\n"
+        f"🕒 Дата: {date}\n"
+        f"📍 Адрес: {address}\n"
+        f"🛠️ Что делать: {what_to_do}\n"
+        "────────────────────\n"
+        "Ожидайте подтверждения."
+    )
+    storage.change_state(user_id, VolunteerStates.MAIN_MENU)
+    kb = response_confirmation_keyboard()
+    await send_callable(text, keyboard=kb)
 
 async def _render_profile(user_id: int, send_callable: Callable[[str, Any | None], Awaitable[aiomax.Message]]) -> None:
     """Формирование и отправка профиля (общая логика для просмотра и возврата после редактирования)."""
@@ -279,19 +409,20 @@ async def _render_profile(user_id: int, send_callable: Callable[[str, Any | None
     rating = 0
     participation_count = 0
     try:
-        profile = await backend_client.get_user_profile(token)
+        # Один запрос: профиль, интересы и город собирает бекенд
+        screen = await backend_client.get_profile_screen(token)
+        profile = screen.get("profile") or {}
         rating = profile.get("rating", 0)
         participation_count = profile.get("participation_count", 0)
         interests = profile.get("interests") or []
         if interests:
             interests_text = ", ".join(interests)
+        city = screen.get("city")
         city_id = profile.get("city_id")
-        if city_id is not None:
-            try:
-                city = await backend_client.get_city(city_id)
-                city_name = city.get("name") or f"ID {city_id}"
-            except Exception as e_city:
-                logger.warning("City fetch failed (render_profile): user_id=%s city_id=%s error=%s", user_id, city_id, e_city)
+        if city:
+            city_name = city.get("name") or f"ID {city_id}"
+        elif city_id is not None:
+            city_name = f"ID {city_id}"
     except Exception as e_prof:
         logger.warning("Profile fetch failed (render_profile): user_id=%s error=%s", user_id, e_prof)
     text = (
@@ -407,7 +538,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
     # --- лента заявок ---
     @bot.on_button_callback(lambda d: d.payload == "feed")
     async def _feed(cb: aiomax.Callback, cursor: aiomax.FSMCursor):
-        """Лента событий: получаем с бэкенда /events/feed и выводим каждое событие отдельным сообщением.
+        """Лента событий: получаем с бэкенда экран ленты и выводим страницу одним сообщением (FEED_RENDER_MODE).
 
         Логика выбора тега:
         - Берём профиль пользователя -> список интересов (строки).
@@ -416,7 +547,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         - Если интересов нет или нет совпадений — отдаём ленту без фильтра (город пользователя).
         """
         cb.bot.storage.change_state(cb.user_id, VolunteerStates.MAIN_MENU)
-        await _send_events_feed(cb.user_id, lambda text, keyboard=None: cb.send(text, keyboard=keyboard))
+        await _send_events_feed(cb.user_id, cb.bot.storage, lambda text, keyboard=None: cb.send(text, keyboard=keyboard))
 
     # --- лента фондов ---
     @bot.on_button_callback(lambda d: d.payload == "funds")
@@ -451,6 +582,64 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             "ID указан в блоке '🧷 ID: ...' в ленте фондов."
         )
 
+    # --- отклик на событие из страницы ленты ---
+    @bot.on_button_callback(lambda d: (d.payload or "").startswith("respond_"))
+    async def _respond_to_event(cb: aiomax.Callback, cursor: aiomax.FSMCursor):
+        event_id_str = cb.payload.replace("respond_", "")
+        if not event_id_str.isdigit():
+            await cb.send("❌ Некорректный ID события.")
+            return
+        await _submit_application(
+            cb.user_id,
+            int(event_id_str),
+            cb.bot.storage,
+            lambda text, keyboard=None: cb.send(text, keyboard=keyboard),
+        )
+
+    # --- пожертвование в фонд из страницы ленты ---
+    @bot.on_button_callback(lambda d: (d.payload or "").startswith("donate_"))
+    async def _donate_to_fund(cb: aiomax.Callback, cursor: aiomax.FSMCursor):
+        fund_id_str = cb.payload.replace("donate_", "")
+        cached = _FUND_FEED_CACHE.get(cb.user_id) or {}
+        if not fund_id_str.isdigit() or int(fund_id_str) not in cached:
+            kb_err = volunteer_main_menu_keyboard()
+            await cb.send(
+                "❌ Фонд не найден в последней ленте. Откройте 'Лента фондов' и попробуйте снова.",
+                keyboard=kb_err,
+            )
+            return
+        _update_fsm_data(cb.bot.storage, cb.user_id, selected_fund=int(fund_id_str))
+        cb.bot.storage.change_state(cb.user_id, VolunteerStates.WAIT_DONATION_AMOUNT)
+        await cb.send(
+            "✅ Фонд выбран. Введите сумму пожертвования в рублях (целое число, > 0).\n"
+            "Например: 500"
+        )
+
+    # --- листание ленты заявок: редактируем то же сообщение ---
+    @bot.on_button_callback(lambda d: (d.payload or "").startswith("feed_page_"))
+    async def _feed_page(cb: aiomax.Callback, cursor: aiomax.FSMCursor):
+        page_str = cb.payload.replace("feed_page_", "")
+        page = int(page_str) if page_str.isdigit() else 1
+        cb.bot.storage.change_state(cb.user_id, VolunteerStates.MAIN_MENU)
+        await _send_events_feed(
+            cb.user_id,
+            cb.bot.storage,
+            lambda text, keyboard=None: cb.answer(text=text, keyboard=keyboard),
+            page=max(page, 1),
+        )
+
+    # --- листание ленты фондов: редактируем то же сообщение ---
+    @bot.on_button_callback(lambda d: (d.payload or "").startswith("funds_page_"))
+    async def _funds_page(cb: aiomax.Callback, cursor: aiomax.FSMCursor):
+        page_str = cb.payload.replace("funds_page_", "")
+        page = int(page_str) if page_str.isdigit() else 1
+        cb.bot.storage.change_state(cb.user_id, VolunteerStates.MAIN_MENU)
+        await _send_funds_feed(
+            cb.user_id,
+            lambda text, keyboard=None: cb.answer(text=text, keyboard=keyboard),
+            page=max(page, 1),
+        )
+
     # --- ввод ID события для отклика ---
     @bot.on_message(is_state(VolunteerStates.WAIT_EVENT_ID))
     async def _volunteer_event_id(msg: aiomax.Message, cursor: aiomax.FSMCursor):
@@ -463,65 +652,12 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             return
         event_id = int(raw)
 
-        token = get_session_token(msg.user_id)
-        if not token:
-            msg.bot.storage.change_state(msg.user_id, VolunteerStates.MAIN_MENU)
-            kb = volunteer_main_menu_keyboard()
-            await msg.reply("⚠️ Нет активной сессии. /start", keyboard=kb)
-            return
-
-        # Проверим что событие действительно существует — запрос деталей
-        event_details = None
-        try:
-            event_details = await backend_client.get_event_details(token, event_id)
-        except Exception as e_event:
-            logger.warning("Event details failed user_id=%s event_id=%s error=%s", msg.user_id, event_id, e_event)
-
-        if not event_details:
-            kb_err = response_confirmation_keyboard()
-            await msg.reply(
-                "❌ Событие с таким ID не найдено. Проверьте и введите снова или вернитесь к ленте.",
-                keyboard=kb_err,
-            )
-            return
-
-        # Создаём отклик
-        created_app = None
-        try:
-            created_app = await backend_client.create_application(token, event_id)
-        except Exception as e_create:
-            logger.warning("Create application failed user_id=%s event_id=%s error=%s", msg.user_id, event_id, e_create)
-
-        if not created_app:
-            kb_err = response_confirmation_keyboard()
-            await msg.reply(
-                "❌ Не удалось создать отклик. Попробуйте позже или вернитесь к ленте.",
-                keyboard=kb_err,
-            )
-            return
-
-        # Готовим красивый ответ с деталями события
-        contact = event_details.get("contact") or "—"
-        date = event_details.get("date") or "—"
-        address = event_details.get("address") or "—"
-        what_to_do = event_details.get("what_to_do") or "—"
-        title = event_details.get("title") or "—"
-
-        text = (
-            "✅ Спасибо за отклик! Ваша заявка на рассмотрении.\n"
-            "────────────────────\n"
-            f"🧷 ID события: {event_id}\n"
-            f"📝 Название: {title}\n"
-            f"☎️ Контакт: {contact}\n"
-            f"🕒 Дата: {date}\n"
-            f"📍 Адрес: {address}\n"
-            f"🛠️ Что делать: {what_to_do}\n"
-            "────────────────────\n"
-            "Ожидайте подтверждения."
+        await _submit_application(
+            msg.user_id,
+            event_id,
+            msg.bot.storage,
+            lambda text, keyboard=None: msg.reply(text, keyboard=keyboard),
         )
-        msg.bot.storage.change_state(msg.user_id, VolunteerStates.MAIN_MENU)
-        kb = response_confirmation_keyboard()
-        await msg.reply(text, keyboard=kb)
 
     # --- ввод ID фонда для доната ---
     @bot.on_message(is_state(VolunteerStates.WAIT_FUND_ID))
@@ -551,7 +687,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             )
             return
 
-        _SELECTED_FUND[msg.user_id] = fund_id
+        _update_fsm_data(msg.bot.storage, msg.user_id, selected_fund=fund_id)
         msg.bot.storage.change_state(msg.user_id, VolunteerStates.WAIT_DONATION_AMOUNT)
         await msg.reply(
             "✅ Фонд выбран. Введите сумму пожертвования в рублях (целое число, > 0).\n"
@@ -573,7 +709,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             await msg.reply("❌ Сумма должна быть больше нуля. Введите другое значение.")
             return
 
-        fund_id = _SELECTED_FUND.get(msg.user_id)
+        fund_id = _fsm_data(msg.bot.storage, msg.user_id).get("selected_fund")
         if fund_id is None:
             msg.bot.storage.change_state(msg.user_id, VolunteerStates.MAIN_MENU)
             kb = volunteer_main_menu_keyboard()
@@ -618,14 +754,14 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         kb = donation_confirmation_keyboard()
         await msg.reply(text, keyboard=kb)
 
-        _SELECTED_FUND.pop(msg.user_id, None)
+        _update_fsm_data(msg.bot.storage, msg.user_id, selected_fund=None)
 
     # --- возврат к ленте заявок ---
     @bot.on_button_callback(lambda d: d.payload == "back_to_feed")
     async def _back_to_feed(cb: aiomax.Callback, cursor: aiomax.FSMCursor):
         """Обработчик кнопки 'Назад к заявкам' / 'Вернуться к ленте' — возврат к ленте."""
         cb.bot.storage.change_state(cb.user_id, VolunteerStates.MAIN_MENU)
-        await _send_events_feed(cb.user_id, lambda text, keyboard=None: cb.send(text, keyboard=keyboard))
+        await _send_events_feed(cb.user_id, cb.bot.storage, lambda text, keyboard=None: cb.send(text, keyboard=keyboard))
 
     # --- возврат к главному меню волонтёра из ленты ---
     @bot.on_button_callback(lambda d: d.payload == "back_to_main_menu")
@@ -913,49 +1049,51 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             msg.bot.storage.change_state(msg.user_id, CommonStates.IDLE)
             await msg.reply("😕 Откликов на это мероприятие пока нет.", keyboard=kb_back)
             return
-        # Отобразим каждый отклик
-        for app in applications:
-            app_id = app.get("id")
-            status = app.get("status") or "—"
-            rejection_reason = app.get("rejection_reason") or "—"
-            user_id = app.get("user_id")
-            applied_at = app.get("applied_at") or "—"
-            username = app.get("user_username") or "—"
-            user_rating = app.get("user_rating") or 0
-            participation_count = app.get("user_participation_count") or 0
-            user_city_id = app.get("user_city_id")
-            about_me = app.get("user_about_me") or "—"
-            interests = app.get("user_interests") or []
-            interests_joined = ", ".join(interests) if interests else "—"
-            match_pct = app.get("match_percentage") or 0
-            text = (
-                "📨 Отклик волонтёра\n"
-                "────────────────\n"
-                f"🧷 ID отклика: {app_id}\n"
-                f"🧷 ID события: {event_id}\n"
-                f"📌 Статус: {status}\n"
-                f"🚫 Причина отказа: {rejection_reason}\n"
-                f"👤 Волонтёр ID: {user_id}\n"
-                f"👤 Логин: {username}\n"
-                f"⭐ Рейтинг: {user_rating}\n"
-                f"✅ Участий: {participation_count}\n"
-                f"🏙️ Город ID: {user_city_id}\n"
-                f"🗣️ О себе: {about_me}\n"
-                f"🎯 Интересы: {interests_joined}\n"
-                f"🔍 Совпадение: {match_pct}%\n"
-                f"🕒 Дата отклика: {applied_at}\n"
-                "────────────────"
-            )
-            if status == "pending":
-                kb_mod = application_moderation_keyboard(app_id)
-                await msg.reply(text + "\nВыберите действие:", keyboard=kb_mod)
-            else:
-                await msg.reply(text)
+        # Отобразим каждый отклик: пачка сообщений идёт в полосе массовых отправок,
+        # чтобы не задерживать интерактивные ответы другим пользователям
+        with bulk_sends():
+            for app in applications:
+                app_id = app.get("id")
+                status = app.get("status") or "—"
+                rejection_reason = app.get("rejection_reason") or "—"
+                user_id = app.get("user_id")
+                applied_at = app.get("applied_at") or "—"
+                username = app.get("user_username") or "—"
+                user_rating = app.get("user_rating") or 0
+                participation_count = app.get("user_participation_count") or 0
+                user_city_id = app.get("user_city_id")
+                about_me = app.get("user_about_me") or "—"
+                interests = app.get("user_interests") or []
+                interests_joined = ", ".join(interests) if interests else "—"
+                match_pct = app.get("match_percentage") or 0
+                text = (
+                    "📨 Отклик волонтёра\n"
+                    "────────────────\n"
+                    f"🧷 ID отклика: {app_id}\n"
+                    f"🧷 ID события: {event_id}\n"
+                    f"📌 Статус: {status}\n"
+                    f"🚫 Причина отказа: {rejection_reason}\n"
+                    f"👤 Волонтёр ID: {user_id}\n"
+                    f"👤 Логин: {username}\n"
+                    f"⭐ Рейтинг: {user_rating}\n"
+                    f"✅ Участий: {participation_count}\n"
+                    f"🏙️ Город ID: {user_city_id}\n"
+                    f"🗣️ О себе: {about_me}\n"
+                    f"🎯 Интересы: {interests_joined}\n"
+                    f"🔍 Совпадение: {match_pct}%\n"
+                    f"🕒 Дата отклика: {applied_at}\n"
+                    "────────────────"
+                )
+                if status == "pending":
+                    kb_mod = application_moderation_keyboard(app_id)
+                    await msg.reply(text + "\nВыберите действие:", keyboard=kb_mod)
+                else:
+                    await msg.reply(text)
         msg.bot.storage.change_state(msg.user_id, CommonStates.IDLE)
         await msg.reply("📑 Все отклики показаны. Вы можете вернуться в меню.", keyboard=kb_back)
 
     # ===== Модерация отклика: принять =====
-    @bot.on_button_callback(lambda d: d.payload.startswith("app_approve_"))
+    @bot.on_button_callback(lambda d: (d.payload or "").startswith("app_approve_"))
     async def _application_approve(cb: aiomax.Callback, cursor: aiomax.FSMCursor):
         token = get_session_token(cb.user_id)
         if not token:
@@ -985,9 +1123,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         )
 
     # ===== Модерация отклика: инициировать отказ =====
-    _PENDING_REJECTION_APP: dict[int, int] = {}
-
-    @bot.on_button_callback(lambda d: d.payload.startswith("app_reject_"))
+    @bot.on_button_callback(lambda d: (d.payload or "").startswith("app_reject_"))
     async def _application_reject_init(cb: aiomax.Callback, cursor: aiomax.FSMCursor):
         token = get_session_token(cb.user_id)
         if not token:
@@ -998,7 +1134,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             await cb.send("❌ Некорректный ID отклика.")
             return
         app_id = int(app_id_str)
-        _PENDING_REJECTION_APP[cb.user_id] = app_id
+        _update_fsm_data(cb.bot.storage, cb.user_id, pending_rejection_app=app_id)
         cb.bot.storage.change_state(cb.user_id, AdminStates.WAIT_APPLICATION_REJECTION_REASON)
         await cb.send(
             "✏️ Введите причину отказа одним сообщением (кратко). Например: недостаточно опыта."
@@ -1011,7 +1147,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         if not reason_raw:
             await msg.reply("⚠️ Пусто. Введите причину отказа.")
             return
-        app_id = _PENDING_REJECTION_APP.get(msg.user_id)
+        app_id = _fsm_data(msg.bot.storage, msg.user_id).get("pending_rejection_app")
         if app_id is None:
             msg.bot.storage.change_state(msg.user_id, CommonStates.IDLE)
             kb = admin_fund_main_keyboard()
@@ -1032,7 +1168,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             msg.bot.storage.change_state(msg.user_id, CommonStates.IDLE)
             await msg.reply("❌ Не удалось отклонить отклик. Попробуйте позже.", keyboard=kb)
             return
-        _PENDING_REJECTION_APP.pop(msg.user_id, None)
+        _update_fsm_data(msg.bot.storage, msg.user_id, pending_rejection_app=None)
         msg.bot.storage.change_state(msg.user_id, CommonStates.IDLE)
         await msg.reply(
             "🚫 Отклик отклонён. Причина сохранена. Возврат в меню:",
@@ -1113,7 +1249,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             logger.warning("Profile fetch for event create failed user_id=%s error=%s", msg.user_id, e_prof)
         if city_id is None:
             # Сохраняем распарсенные данные и просим ввести город прямо сейчас
-            _PENDING_EVENT_DATA[msg.user_id] = {
+            _update_fsm_data(msg.bot.storage, msg.user_id, pending_event={
                 "title": title,
                 "description": description,
                 "address": address,
@@ -1121,7 +1257,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
                 "what_to_do": what_to_do,
                 "date_iso": date_iso,
                 "tag_ids": tag_ids,
-            }
+            })
             msg.bot.storage.change_state(msg.user_id, AdminStates.WAIT_EVENT_CITY)
             await msg.reply(
                 f"🏙️ У вашего профиля не указан город. Введите название города одним сообщением.\n{CITY_PROMPT_SUFFIX}\nНапример: Москва"
@@ -1171,13 +1307,8 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             return
         matched_city = None
         try:
-            cities = await backend_client.get_cities(page=1, page_size=MAX_CITIES_PAGE_SIZE)
-            lowered = raw_city.lower()
-            for c in cities:
-                name = (c.get("name") or "").strip()
-                if name.lower() == lowered:
-                    matched_city = c
-                    break
+            cities = await backend_client.get_all_cities()
+            matched_city = city_matchers.get(cities).match(raw_city)
         except Exception as e_cities:
             logger.warning("Admin event city: fetch cities failed user_id=%s error=%s", msg.user_id, e_cities)
         if not matched_city:
@@ -1187,11 +1318,6 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         city_name = matched_city.get("name") or raw_city
         saved_ok = True
         try:
-            # ensure profile exists then patch
-            try:
-                await backend_client.get_user_profile(token)
-            except Exception as e_prof_init:
-                logger.warning("Admin event city: profile init failed user_id=%s error=%s", msg.user_id, e_prof_init)
             res_profile = await backend_client.update_user_profile_city(token, city_id)
             if res_profile is None:
                 saved_ok = False
@@ -1201,7 +1327,8 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         if not saved_ok:
             await msg.reply("❌ Не удалось сохранить город. Попробуйте снова или позже.")
             return
-        data = _PENDING_EVENT_DATA.pop(msg.user_id, None)
+        data = _fsm_data(msg.bot.storage, msg.user_id).get("pending_event")
+        _update_fsm_data(msg.bot.storage, msg.user_id, pending_event=None)
         if not data:
             msg.bot.storage.change_state(msg.user_id, VolunteerStates.MAIN_MENU)
             await msg.reply("⚠️ Данные мероприятия потеряны. Начните создание снова через 'Создать новое событие'.")
@@ -1396,13 +1523,9 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         matched_city = None
         try:
             # Используем допустимый page_size. При необходимости можно сделать пагинацию.
-            cities = await backend_client.get_cities(page=1, page_size=MAX_CITIES_PAGE_SIZE)
-            lowered = user_input_raw.lower()
-            for c in cities:
-                name = (c.get("name") or "").strip()
-                if name.lower() == lowered:
-                    matched_city = c
-                    break
+            cities = await backend_client.get_all_cities()
+            # Нормализованный индекс: регистр, ё/е, префикс и опечатки
+            matched_city = city_matchers.get(cities).match(user_input_raw)
         except Exception as e_cities:
             logger.warning("Fetch cities failed user_id=%s error=%s", msg.user_id, e_cities)
 
@@ -1417,11 +1540,6 @@ def setup_handlers(bot: aiomax.Bot) -> None:
 
         saved_ok = True
         try:
-            # Вариант B: гарантируем существование профиля перед PATCH.
-            try:
-                await backend_client.get_user_profile(token)
-            except Exception as e_profile_init:
-                logger.warning("Profile init (pre-city-patch) failed user_id=%s error=%s", msg.user_id, e_profile_init)
             profile_after = await backend_client.update_user_profile_city(token, city_id)
             if profile_after is None:
                 saved_ok = False
@@ -1439,7 +1557,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         if _pop_return_to_feed(msg.user_id):
             msg.bot.storage.change_state(msg.user_id, VolunteerStates.MAIN_MENU)
             await msg.reply(f"✅ Город обновлён: {city_name}")
-            await _send_events_feed(msg.user_id, lambda text, keyboard=None: msg.reply(text, keyboard=keyboard))
+            await _send_events_feed(msg.user_id, msg.bot.storage, lambda text, keyboard=None: msg.reply(text, keyboard=keyboard))
             return
 
         # Профиль редактируется — переходим к интересам
@@ -1477,20 +1595,19 @@ def setup_handlers(bot: aiomax.Bot) -> None:
 
         # Парсим ввод: поддержим разделение запятыми или новой строкой.
         parts = [p.strip() for p in raw_input.replace("\n", ",").split(",") if p.strip()]
-        lowered_set = {p.lower() for p in parts}
 
         matched_tag_ids: list[int] = []
         matched_names: list[str] = []
         try:
-            tags = await backend_client.get_tags(page=1, page_size=100)
-            # Строим индекс по названию (lower) -> id
-            for t in tags:
-                name = (t.get("name") or "").strip()
-                if not name:
+            tags = await backend_client.get_all_tags()
+            # Индекс строится один раз на версию справочника
+            tag_matcher = tag_matchers.get(tags)
+            for part in parts:
+                t = tag_matcher.match(part)
+                if t is None or t.get("id") in matched_tag_ids:
                     continue
-                if name.lower() in lowered_set:
-                    matched_tag_ids.append(t.get("id"))
-                    matched_names.append(name)
+                matched_tag_ids.append(t.get("id"))
+                matched_names.append((t.get("name") or "").strip())
         except Exception as e_tags:
             logger.warning("Fetch tags failed user_id=%s error=%s", msg.user_id, e_tags)
 
@@ -1500,15 +1617,9 @@ def setup_handlers(bot: aiomax.Bot) -> None:
             )
             return  # остаёмся в WAIT_INTERESTS
 
-        # Optionally ensure profile exists like with city update
-        try:
-            await backend_client.get_user_profile(token)
-        except Exception as e_profile_init:
-            logger.warning("Profile init (pre-interests) failed user_id=%s error=%s", msg.user_id, e_profile_init)
-
         saved_ok = True
         try:
-            res = await backend_client.update_user_interests(token, matched_tag_ids)
+            res = await backend_client.update_user_interests(token, matched_tag_ids, matched_names)
             if res is None:
                 saved_ok = False
         except Exception as e_save:
@@ -1526,7 +1637,7 @@ def setup_handlers(bot: aiomax.Bot) -> None:
         if _pop_return_to_feed(msg.user_id):
             msg.bot.storage.change_state(msg.user_id, VolunteerStates.MAIN_MENU)
             await msg.reply(f"✅ Интересы обновлены: {joined_names}")
-            await _send_events_feed(msg.user_id, lambda text, keyboard=None: msg.reply(text, keyboard=keyboard))
+            await _send_events_feed(msg.user_id, msg.bot.storage, lambda text, keyboard=None: msg.reply(text, keyboard=keyboard))
             return
 
         # Завершение редактирования профиля
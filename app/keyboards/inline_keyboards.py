@@ -156,6 +156,49 @@ def my_applications_return_keyboard() -> aiomax.buttons.KeyboardBuilder:
     )
     return kb
 
+def _page_navigation_row(prefix: str, page: int, total_pages: int) -> list:
+    """Кнопки «назад/вперёд» по страницам ленты (payload: <prefix><номер страницы>)."""
+    row = []
+    if page > 1:
+        row.append(aiomax.buttons.CallbackButton(text="◀️ Назад", payload=f"{prefix}{page - 1}"))
+    if page < total_pages:
+        row.append(aiomax.buttons.CallbackButton(text="Вперёд ▶️", payload=f"{prefix}{page + 1}"))
+    return row
+
+def events_page_keyboard(event_ids: list[int], page: int, total_pages: int) -> aiomax.buttons.KeyboardBuilder:
+    """Клавиатура страницы ленты заявок: отклик на каждое событие, листание, фильтры."""
+    kb = aiomax.buttons.KeyboardBuilder()
+    kb.table(2, *[
+        aiomax.buttons.CallbackButton(text=f"Откликнуться #{eid}", payload=f"respond_{eid}")
+        for eid in event_ids
+    ])
+    navigation = _page_navigation_row("feed_page_", page, total_pages)
+    if navigation:
+        kb.row(*navigation)
+    kb.row(
+        aiomax.buttons.CallbackButton(text="Изменить фильтры", payload="change_filters"),
+        aiomax.buttons.CallbackButton(text="Изменить город", payload="change_city"),
+    )
+    kb.row(
+        aiomax.buttons.CallbackButton(text="В меню", payload="back_to_main_menu"),
+    )
+    return kb
+
+def funds_page_keyboard(fund_ids: list[int], page: int, total_pages: int) -> aiomax.buttons.KeyboardBuilder:
+    """Клавиатура страницы ленты фондов: пожертвование в каждый фонд и листание."""
+    kb = aiomax.buttons.KeyboardBuilder()
+    kb.table(2, *[
+        aiomax.buttons.CallbackButton(text=f"Пожертвовать #{fid}", payload=f"donate_{fid}")
+        for fid in fund_ids
+    ])
+    navigation = _page_navigation_row("funds_page_", page, total_pages)
+    if navigation:
+        kb.row(*navigation)
+    kb.row(
+        aiomax.buttons.CallbackButton(text="В меню", payload="back_to_main_menu"),
+    )
+    return kb
+
 __all__ = [
     "role_selection_keyboard", 
     "volunteer_main_menu_keyboard", 
@@ -171,4 +214,6 @@ __all__ = [
     ,"admin_help_keyboard"
     ,"application_moderation_keyboard"
     ,"my_applications_return_keyboard"
+    ,"events_page_keyboard"
+    ,"funds_page_keyboard"
 ]
@@ -3,18 +3,6 @@ import logging
 from pathlib import Path
 import aiomax
 
-# Support both `python -m app.main` (package context) and `python app/main.py` (script execution)
-if __package__ is None or __package__ == "":
-    # Script execution: ensure project root on sys.path then absolute import
-    import sys
-    project_root = Path(__file__).resolve().parent.parent
-    if str(project_root) not in sys.path:
-        sys.path.insert(0, str(project_root))
-    from app.handlers import setup_handlers  # type: ignore
-else:
-    # Package execution: use relative import
-    from .handlers import setup_handlers  # type: ignore
-
 
 def _load_env_from_file() -> None:
     """Minimal .env loader (no external deps).
@@ -42,22 +30,57 @@ def _load_env_from_file() -> None:
         logging.warning("Failed to load .env: %s", e)
 
 
+# Настройки модулей бота (хранилища, клиент бекенда, лимиты) читаются из окружения
+# при их импорте, поэтому app/.env загружается до импорта модулей приложения.
+_load_env_from_file()
+
+# Support both `python -m app.main` (package context) and `python app/main.py` (script execution)
+if __package__ is None or __package__ == "":
+    # Script execution: ensure project root on sys.path then absolute import
+    import sys
+    project_root = Path(__file__).resolve().parent.parent
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    from app.handlers import setup_handlers  # type: ignore
+    from app.services.fsm_storage import create_fsm_storage  # type: ignore
+else:
+    # Package execution: use relative import
+    from .handlers import setup_handlers  # type: ignore
+    from .services.fsm_storage import create_fsm_storage  # type: ignore
+
+
 def create_bot() -> aiomax.Bot:
     """Create and configure bot instance using BOT_TOKEN from .env only."""
     _load_env_from_file()
     token = os.getenv("BOT_TOKEN")
     if not token or not token.strip():
         raise RuntimeError("BOT_TOKEN must be set in app/.env (key BOT_TOKEN=...)")
+    # Импорт после загрузки .env: лимиты отправки читаются при импорте
+    from app.services.send_scheduler import SEND_SCHEDULER, PacedBot
+
+    if SEND_SCHEDULER:
+        # Исходящие запросы с лимитами на чат/бота, приоритетами и повтором на 429
+        return PacedBot(token, default_format="markdown")
     return aiomax.Bot(token, default_format="markdown")
 
 
 def bootstrap() -> aiomax.Bot:
     bot = create_bot()
+    # Состояния FSM в SQLite: переживают перезапуск и общие для всех процессов бота
+    bot.storage = create_fsm_storage()
     setup_handlers(bot)
     return bot
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    bot_instance = bootstrap()
-    bot_instance.run()
+    _load_env_from_file()
+    # Импорт после загрузки .env: настройки шардирования читаются при импорте
+    from app.services.dispatcher import BOT_DISPATCH, run_sharded
+
+    if BOT_DISPATCH == "sharded":
+        # Апдейты раздаются по шардам/процессам по user_id (см. services/dispatcher.py)
+        run_sharded(bootstrap)
+    else:
+        bot_instance = bootstrap()
+        bot_instance.run()
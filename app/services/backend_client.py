@@ -1,23 +1,284 @@
-import os, httpx, logging
+import os, re, httpx, logging, asyncio, time
+import importlib.util
 from typing import Any
 
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3001")
+from app.services.resilience import CircuitBreaker, CircuitOpenError, LatencyHistogram, backoff_delay
+from app.services.session_store import session_user, get_session_token, set_session_token, clear_session_token
+
+# Настройки клиента (BACKEND_URL, пул, таймауты, повторы, breaker, TTL кэшей) читаются
+# из окружения при первом запросе, а не при импорте модуля — к этому моменту app/.env
+# уже загружен. Полный список — в BackendClient._configure и .env.example.
+
+# Повторять можно только идемпотентные запросы; ConnectError/PoolTimeout — любые (запрос не ушёл)
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+_RETRY_STATUSES = {502, 503, 504}
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+_REFERENCE_PAGE_SIZE = 100  # ограничение бекенда (page_size <= 100)
+_REFERENCE_MAX_PAGES = 100
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
     logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(name)s: %(message)s")
 
 
+class _CachedResponse:
+    """Закэшированный ответ справочного эндпоинта."""
+
+    __slots__ = ("data", "etag", "expires_at")
+
+    def __init__(self, data: Any, etag: str | None, expires_at: float):
+        self.data = data
+        self.etag = etag
+        self.expires_at = expires_at
+
+
 class BackendClient:
     def __init__(self):
-        self._client = httpx.AsyncClient(base_url=BACKEND_URL, timeout=10)
+        self._client: httpx.AsyncClient | None = None
+        self._breaker = CircuitBreaker(5, 15)
+        self._latency = LatencyHistogram()
+        self._reference_cache: dict[str, _CachedResponse] = {}
+        self._reference_inflight: dict[str, asyncio.Task] = {}
+        # path -> (страницы, склеенный список) для _get_reference_all
+        self._reference_lists: dict[str, tuple[list[Any], list[dict]]] = {}
+        self._profile_cache: dict[str, tuple[float, dict]] = {}
+        self._relogin_inflight: dict[str, asyncio.Task] = {}
+        self.reference_cache_ttl = 300.0
+        self.profile_cache_ttl = 30.0
+        self.profile_cache_max_entries = 10000
+        self.retries = 2
+        self.retry_base_delay = 0.2
+        self.retry_max_delay = 2.0
+
+    def _configure(self) -> httpx.AsyncClient:
+        """Прочитать настройки из окружения и создать пул соединений (один раз)."""
+        if self._client is not None:
+            return self._client
+        # Сколько секунд считать справочники (города, теги) свежими без обращения к бекенду
+        self.reference_cache_ttl = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+        # Профиль пользователя кэшируется ненадолго: рейтинг меняется и вне бота
+        self.profile_cache_ttl = float(os.getenv("PROFILE_CACHE_TTL", "30"))
+        self.profile_cache_max_entries = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
+        # Повторы и circuit breaker
+        self.retries = int(os.getenv("BACKEND_RETRIES", "2"))
+        self.retry_base_delay = float(os.getenv("BACKEND_RETRY_BASE_DELAY", "0.2"))
+        self.retry_max_delay = float(os.getenv("BACKEND_RETRY_MAX_DELAY", "2"))
+        self._breaker = CircuitBreaker(
+            int(os.getenv("BACKEND_BREAKER_THRESHOLD", "5")),
+            float(os.getenv("BACKEND_BREAKER_COOLDOWN", "15")),
+        )
+        # Пул соединений и таймауты
+        http2 = os.getenv("BACKEND_HTTP2", "false").lower() in ("1", "true", "yes")
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("BACKEND_HTTP2 requested but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+        self._client = httpx.AsyncClient(
+            base_url=os.getenv("BACKEND_URL", "http://localhost:3001"),
+            timeout=httpx.Timeout(
+                float(os.getenv("BACKEND_TIMEOUT", "10")),
+                connect=float(os.getenv("BACKEND_CONNECT_TIMEOUT", "3")),
+                pool=float(os.getenv("BACKEND_POOL_TIMEOUT", "2")),
+            ),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("BACKEND_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("BACKEND_MAX_KEEPALIVE", "20")),
+                keepalive_expiry=float(os.getenv("BACKEND_KEEPALIVE_EXPIRY", "30")),
+            ),
+            http2=http2,
+        )
+        return self._client
+
+    # ===== Транспорт: повторы, circuit breaker, метрики =====
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Выполнить запрос к бекенду (см. _send).
+
+        Если бекенд отверг токен сессии (401 — токен истёк или бекенд перезапущен
+        и сессии удалены), токен сбрасывается, пользователь входит заново и запрос
+        повторяется один раз с новым токеном.
+        """
+        resp = await self._send(method, url, **kwargs)
+        if resp.status_code != 401:
+            return resp
+        headers = kwargs.get("headers") or {}
+        authorization = headers.get("Authorization") or ""
+        if not authorization.startswith("Bearer "):
+            return resp
+        token = await self._renew_session(authorization[len("Bearer "):])
+        if token is None:
+            return resp
+        kwargs["headers"] = {**headers, "Authorization": f"Bearer {token}"}
+        return await self._send(method, url, **kwargs)
+
+    async def _renew_session(self, token: str) -> str | None:
+        """Новый токен вместо отвергнутого (None — токен не из session_store или вход не удался).
+
+        Параллельные запросы с одним отвергнутым токеном ждут один общий вход.
+        """
+        task = self._relogin_inflight.get(token)
+        if task is None:
+            user_id = session_user(token)
+            if user_id is None:
+                return None
+            if get_session_token(user_id) not in (None, token):
+                return get_session_token(user_id)  # уже перевыпущен
+            logger.warning("Session token rejected, logging in again: user_id=%s", user_id)
+            clear_session_token(user_id)
+            self.invalidate_profile(token)
+            task = asyncio.create_task(self._relogin(user_id))
+            self._relogin_inflight[token] = task
+            task.add_done_callback(lambda _: self._relogin_inflight.pop(token, None))
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            logger.error("Re-login failed after 401: error=%s", e)
+            return None
+
+    async def _relogin(self, user_id: int) -> str:
+        # Пользователь уже есть на бекенде (или будет создан заново): имя при входе не меняется
+        data = await self.login(max_user_id=user_id, username=None)
+        token = data["session_token"]
+        set_session_token(user_id, token)
+        return token
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Отправить запрос к бекенду.
+
+        Идемпотентные запросы повторяются при сетевых ошибках и 502/503/504 с
+        jittered backoff; неидемпотентные — только если запрос не был отправлен.
+        Подряд идущие сбои (сетевые ошибки, таймауты, 502/503/504) размыкают
+        circuit breaker: пока он открыт, вызовы сразу завершаются CircuitOpenError
+        вместо ожидания таймаута.
+        """
+        client = self._configure()
+        label = f"{method} {_ID_SEGMENT.sub('/{id}', url.split('?', 1)[0])}"
+        idempotent = method in _IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self._breaker.before_call()
+            started = time.monotonic()
+            try:
+                resp = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                self._latency.observe(label, time.monotonic() - started)
+                self._breaker.record_failure()
+                retryable = idempotent or isinstance(e, _NOT_SENT_ERRORS)
+                if not retryable or attempt >= self.retries:
+                    raise
+                logger.warning("%s failed (attempt %s): %r; retrying", label, attempt + 1, e)
+            except BaseException:
+                self._breaker.release()
+                raise
+            else:
+                self._latency.observe(label, time.monotonic() - started)
+                # Ошибки приложения (4xx, 500 на конкретный запрос) — не признак
+                # недоступности бекенда: breaker считает только 502/503/504
+                if resp.status_code not in _RETRY_STATUSES:
+                    self._breaker.record_success()
+                    return resp
+                self._breaker.record_failure()
+                if not (idempotent and resp.status_code in _RETRY_STATUSES) or attempt >= self.retries:
+                    return resp
+                logger.warning("%s returned %s (attempt %s); retrying", label, resp.status_code, attempt + 1)
+            await asyncio.sleep(backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay))
+            attempt += 1
+
+    def metrics(self) -> dict:
+        """Состояние circuit breaker и гистограмма задержек по эндпоинтам."""
+        return {"circuit": self._breaker.state, "latency": self._latency.snapshot()}
+
+    async def aclose(self) -> None:
+        """Закрыть пул соединений."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ===== Кэш справочников (города, теги) =====
+    async def _get_reference(self, path: str, params: dict[str, str], label: str) -> Any:
+        """GET справочного эндпоинта через кэш.
+
+        Свежий ответ (моложе REFERENCE_CACHE_TTL) отдаётся из памяти. Устаревший
+        перепроверяется с If-None-Match, и 304 продлевает его жизнь. Параллельные
+        запросы одного ключа ждут один общий запрос к бекенду (single-flight).
+        """
+        key = path + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        entry = self._reference_cache.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry.data
+
+        task = self._reference_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_reference(key, path, params, label))
+            self._reference_inflight[key] = task
+            task.add_done_callback(lambda _: self._reference_inflight.pop(key, None))
+        # shield: отмена одного ожидающего не должна отменять общий запрос
+        return await asyncio.shield(task)
+
+    async def _fetch_reference(self, key: str, path: str, params: dict[str, str], label: str) -> Any:
+        entry = self._reference_cache.get(key)
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+        try:
+            resp = await self._request("GET", path, params=params, headers=headers)
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            if entry is not None:
+                logger.warning("%s revalidation failed, serving stale: error=%s", label, e)
+                return entry.data
+            raise
+
+        if resp.status_code == 304 and entry is not None:
+            entry.expires_at = time.monotonic() + self.reference_cache_ttl
+            return entry.data
+
+        if resp.status_code >= 400:
+            try:
+                err = resp.json()
+            except Exception:
+                err = resp.text
+            logger.error("%s failed: status=%s error=%s", label, resp.status_code, err)
+            if entry is not None:
+                return entry.data
+        resp.raise_for_status()
+
+        data = resp.json()
+        self._reference_cache[key] = _CachedResponse(
+            data, resp.headers.get("ETag"), time.monotonic() + self.reference_cache_ttl
+        )
+        return data
+
+    async def _get_reference_all(self, path: str, label: str) -> list[dict]:
+        """Все страницы справочника одним списком (каждая страница кэшируется через _get_reference).
+
+        Пока ни одна страница не поменялась, возвращается тот же объект списка,
+        поэтому MatcherCache не перестраивает индекс.
+        """
+        pages = []
+        for page in range(1, _REFERENCE_MAX_PAGES + 1):
+            params = {"page": str(page), "page_size": str(_REFERENCE_PAGE_SIZE)}
+            items = await self._get_reference(path, params, label)
+            pages.append(items)
+            if len(items) < _REFERENCE_PAGE_SIZE:
+                break
+        else:
+            logger.warning("%s: stopped after %s pages", label, _REFERENCE_MAX_PAGES)
+
+        cached = self._reference_lists.get(path)
+        if cached is not None and len(cached[0]) == len(pages) and all(a is b for a, b in zip(cached[0], pages)):
+            return cached[1]
+        combined = [item for items in pages for item in items]
+        self._reference_lists[path] = (pages, combined)
+        return combined
+
+    def invalidate_reference_cache(self) -> None:
+        """Сбросить кэш справочников (следующий запрос пойдёт в бекенд)."""
+        self._reference_cache.clear()
+        self._reference_lists.clear()
 
     async def login(self, max_user_id: int, username: str | None) -> dict:
         payload = {
             "max_user_id": str(max_user_id),  # backend expects string
             "username": (username or f"user_{max_user_id}")
         }
-        resp = await self._client.post("/auth/login", json=payload)
+        resp = await self._request("POST", "/auth/login", json=payload)
         if resp.status_code >= 400:
             # Логируем тело ошибки для диагностики (422 валидация схемы)
             try:
@@ -32,17 +293,48 @@ class BackendClient:
 
     async def get_feed(self, token: str):
         # пример: защищённый вызов
-        resp = await self._client.get("/applications/", headers={"Authorization": f"Bearer {token}"})
+        resp = await self._request("GET", "/applications/", headers={"Authorization": f"Bearer {token}"})
         resp.raise_for_status()
         return resp.json()
 
+    # ===== Кэш профилей (по токену сессии) =====
+    def _cached_profile(self, token: str) -> dict | None:
+        cached = self._profile_cache.get(token)
+        if cached is None:
+            return None
+        expires_at, profile = cached
+        if expires_at <= time.monotonic():
+            self._profile_cache.pop(token, None)
+            return None
+        return profile
+
+    def _store_profile(self, token: str, profile: dict) -> None:
+        self._profile_cache.pop(token, None)
+        if len(self._profile_cache) >= self.profile_cache_max_entries:
+            now = time.monotonic()
+            for key in [k for k, (expires_at, _) in self._profile_cache.items() if expires_at <= now]:
+                del self._profile_cache[key]
+            while len(self._profile_cache) >= self.profile_cache_max_entries:
+                self._profile_cache.pop(next(iter(self._profile_cache)))
+        self._profile_cache[token] = (time.monotonic() + self.profile_cache_ttl, profile)
+
+    def invalidate_profile(self, token: str) -> None:
+        """Сбросить закэшированный профиль пользователя."""
+        self._profile_cache.pop(token, None)
+
     # ===== Профиль пользователя / интерфейс сначала, потом бизнес-логика =====
     async def get_user_profile(self, token: str) -> dict:
         """Получить профиль текущего пользователя (список интересов — строки).
 
+        Ответ кэшируется на PROFILE_CACHE_TTL секунд и обновляется при изменении
+        города/интересов через этот клиент (write-through).
+
         Интерфейсный слой: ошибки логируем и пробрасываем наружу, чтобы хендлер
         мог показать user-friendly сообщение. """
-        resp = await self._client.get("/user/profile", headers={"Authorization": f"Bearer {token}"})
+        cached = self._cached_profile(token)
+        if cached is not None:
+            return {**cached, "interests": list(cached.get("interests") or [])}
+        resp = await self._request("GET", "/user/profile", headers={"Authorization": f"Bearer {token}"})
         if resp.status_code >= 400:
             try:
                 err = resp.json()
@@ -50,11 +342,13 @@ class BackendClient:
                 err = resp.text
             logger.error("Get profile failed: status=%s error=%s", resp.status_code, err)
         resp.raise_for_status()
-        return resp.json()
+        profile = resp.json()
+        self._store_profile(token, profile)
+        return {**profile, "interests": list(profile.get("interests") or [])}
 
     async def get_city(self, city_id: int) -> dict:
         """Получить данные города по ID. Эндпоинт не требует авторизации."""
-        resp = await self._client.get(f"/cities/{city_id}")
+        resp = await self._request("GET", f"/cities/{city_id}")
         if resp.status_code >= 400:
             try:
                 err = resp.json()
@@ -65,21 +359,18 @@ class BackendClient:
         return resp.json()
 
     async def get_cities(self, page: int = 1, page_size: int = 100) -> list[dict]:
-        """Получить список городов (для сопоставления ввода пользователя)."""
-        resp = await self._client.get(f"/cities?page={page}&page_size={page_size}")
-        if resp.status_code >= 400:
-            try:
-                err = resp.json()
-            except Exception:
-                err = resp.text
-            logger.error("Get cities failed: status=%s error=%s", resp.status_code, err)
-        resp.raise_for_status()
-        return resp.json()
+        """Получить список городов (для сопоставления ввода пользователя). Кэшируется."""
+        params = {"page": str(page), "page_size": str(page_size)}
+        return await self._get_reference("/cities", params, "Get cities")
+
+    async def get_all_cities(self) -> list[dict]:
+        """Все города (все страницы) — для сопоставления ввода пользователя. Кэшируется."""
+        return await self._get_reference_all("/cities", "Get cities")
 
     async def update_user_profile_city(self, token: str, city_id: int) -> dict | None:
         """Частично обновить профиль: только city_id. Возвращает профиль или None при ошибке."""
         payload = {"city_id": city_id}
-        resp = await self._client.patch(
+        resp = await self._request("PATCH", 
             "/user/profile/update",
             json=payload,
             headers={"Authorization": f"Bearer {token}"}
@@ -90,28 +381,91 @@ class BackendClient:
             except Exception:
                 err = resp.text
             logger.error("Update city failed: city_id=%s status=%s error=%s", city_id, resp.status_code, err)
+            self.invalidate_profile(token)
             return None
-        return resp.json()
+        profile = resp.json()
+        cached = self._cached_profile(token)
+        if cached is not None:
+            self._store_profile(token, {**cached, **profile, "interests": cached.get("interests") or []})
+        else:
+            self.invalidate_profile(token)
+        return profile
 
     # ===== Теги (интересы) пользователя =====
     async def get_tags(self, page: int = 1, page_size: int = 100) -> list[dict]:
-        """Получить список тегов-интересов."""
-        resp = await self._client.get(f"/tags?page={page}&page_size={page_size}")
+        """Получить список тегов-интересов. Кэшируется."""
+        params = {"page": str(page), "page_size": str(page_size)}
+        return await self._get_reference("/tags", params, "Get tags")
+
+    async def get_all_tags(self) -> list[dict]:
+        """Все теги-интересы (все страницы) — для сопоставления ввода пользователя. Кэшируется."""
+        return await self._get_reference_all("/tags", "Get tags")
+
+    async def update_user_interests(self, token: str, tag_ids: list[int], tag_names: list[str] | None = None) -> dict | None:
+        """Обновить интересы пользователя (перезапись списка). Возвращает dict результата или None.
+
+        tag_names — названия тех же тегов: если переданы, закэшированный профиль
+        обновляется без повторного запроса, иначе сбрасывается.
+        """
+        payload = {"tag_ids": tag_ids}
+        resp = await self._request("POST", 
+            "/user/interests",
+            json=payload,
+            headers={"Authorization": f"Bearer {token}"}
+        )
         if resp.status_code >= 400:
             try:
                 err = resp.json()
             except Exception:
                 err = resp.text
-            logger.error("Get tags failed: status=%s error=%s", resp.status_code, err)
-        resp.raise_for_status()
+            logger.error("Update interests failed: tag_ids=%s status=%s error=%s", tag_ids, resp.status_code, err)
+            self.invalidate_profile(token)
+            return None
+        cached = self._cached_profile(token)
+        if cached is not None and tag_names is not None:
+            self._store_profile(token, {**cached, "interests": list(tag_names)})
+        else:
+            self.invalidate_profile(token)
         return resp.json()
 
-    async def update_user_interests(self, token: str, tag_ids: list[int]) -> dict | None:
-        """Обновить интересы пользователя (перезапись списка). Возвращает dict результата или None."""
-        payload = {"tag_ids": tag_ids}
-        resp = await self._client.post(
-            "/user/interests",
-            json=payload,
+    # ===== Экраны бота (BFF): всё для экрана одним запросом =====
+    async def get_profile_screen(self, token: str) -> dict:
+        """Экран профиля: {"profile": {...}, "city": {"id", "name"} | null}.
+
+        Профиль из ответа заодно кладётся в кэш профилей.
+        """
+        resp = await self._request("GET", "/bot/screen/profile", headers={"Authorization": f"Bearer {token}"})
+        if resp.status_code >= 400:
+            try:
+                err = resp.json()
+            except Exception:
+                err = resp.text
+            logger.error("Get profile screen failed: status=%s error=%s", resp.status_code, err)
+        resp.raise_for_status()
+        screen = resp.json()
+        profile = screen.get("profile")
+        if profile:
+            self._store_profile(token, {**profile, "interests": list(profile.get("interests") or [])})
+        return screen
+
+    async def get_feed_screen(
+        self,
+        token: str,
+        page: int = 1,
+        page_size: int = 5,
+        after: str | None = None,
+    ) -> dict:
+        """Экран ленты: {"city": ... | null, "interests": [...], "feed": {"events": [...], "next_cursor": ...}}.
+
+        after — next_cursor предыдущей страницы: с ним бэкенд листает по курсору, page только для подписи.
+        """
+        params = {"page": str(page), "page_size": str(page_size)}
+        if after:
+            params["after"] = after
+        resp = await self._request(
+            "GET",
+            "/bot/screen/feed",
+            params=params,
             headers={"Authorization": f"Bearer {token}"}
         )
         if resp.status_code >= 400:
@@ -119,8 +473,13 @@ class BackendClient:
                 err = resp.json()
             except Exception:
                 err = resp.text
-            logger.error("Update interests failed: tag_ids=%s status=%s error=%s", tag_ids, resp.status_code, err)
-            return None
+            logger.error(
+                "Get feed screen failed: status=%s params=%s error=%s",
+                resp.status_code,
+                params,
+                err,
+            )
+        resp.raise_for_status()
         return resp.json()
 
     # ===== Лента событий =====
@@ -130,15 +489,20 @@ class BackendClient:
         include_tag_ids: list[int] | None = None,
         page: int = 1,
         page_size: int = 5,
+        personalized: bool = False,
     ) -> dict:
         """Получить ленту событий. Возвращает dict с ключами events, total_count и т.д.
 
         include_tag_ids: если список не пуст — передаём как include_tags=1,2,3.
+        personalized: бекенд сам фильтрует по всем интересам пользователя и
+        сортирует по числу совпадений.
         """
         params = {"page": str(page), "page_size": str(page_size)}
+        if personalized:
+            params["personalized"] = "true"
         if include_tag_ids:
             params["include_tags"] = ",".join(str(tid) for tid in include_tag_ids)
-        resp = await self._client.get(
+        resp = await self._request("GET", 
             "/events/feed",
             params=params,
             headers={"Authorization": f"Bearer {token}"}
@@ -160,7 +524,7 @@ class BackendClient:
     async def create_application(self, token: str, event_id: int) -> dict:
         """Создать отклик на событие."""
         payload = {"event_id": event_id}
-        resp = await self._client.post(
+        resp = await self._request("POST", 
             "/applications/create",
             json=payload,
             headers={"Authorization": f"Bearer {token}"}
@@ -176,7 +540,7 @@ class BackendClient:
 
     async def get_event_details(self, token: str, event_id: int) -> dict:
         """Получить детали события для подтверждения отклика."""
-        resp = await self._client.get(
+        resp = await self._request("GET", 
             f"/events/{event_id}",
             headers={"Authorization": f"Bearer {token}"}
         )
@@ -198,7 +562,7 @@ class BackendClient:
     ) -> dict:
         """Получить ленту фондов (активные фонды). Возвращает dict с ключами funds, total_count и т.д."""
         params = {"page": str(page), "page_size": str(page_size)}
-        resp = await self._client.get(
+        resp = await self._request("GET", 
             "/funds/feed",
             params=params,
             headers={"Authorization": f"Bearer {token}"}
@@ -220,11 +584,16 @@ class BackendClient:
     async def donate_to_fund(self, token: str, fund_id: int, amount: int) -> dict:
         """Сделать донат в фонд."""
         payload = {"fund_id": fund_id, "amount": amount}
-        resp = await self._client.post(
-            "/funds/donate",
-            json=payload,
-            headers={"Authorization": f"Bearer {token}"}
-        )
+        try:
+            resp = await self._request("POST", 
+                "/funds/donate",
+                json=payload,
+                headers={"Authorization": f"Bearer {token}"}
+            )
+        finally:
+            # Донат меняет рейтинг. Сбрасываем профиль после ответа: чтение,
+            # выполненное параллельно с донатом, могло закэшировать старый рейтинг
+            self.invalidate_profile(token)
         if resp.status_code >= 400:
             try:
                 err = resp.json()
@@ -243,7 +612,7 @@ class BackendClient:
     # ===== Админ: роль и создание =====
     async def check_user_role(self, token: str) -> dict | None:
         """Проверить текущую роль пользователя (user/admin)."""
-        resp = await self._client.get(
+        resp = await self._request("GET", 
             "/admin/check-role",
             headers={"Authorization": f"Bearer {token}"}
         )
@@ -259,7 +628,7 @@ class BackendClient:
     async def create_admin(self, token: str, max_user_id: int) -> dict | None:
         """Создать администратора (если бекенд разрешит)."""
         payload = {"max_user_id": str(max_user_id)}
-        resp = await self._client.post(
+        resp = await self._request("POST", 
             "/admin/admins/create",
             json=payload,
             headers={"Authorization": f"Bearer {token}"}
@@ -276,7 +645,7 @@ class BackendClient:
     # ===== Создание фонда (админ) =====
     async def create_fund(self, token: str, payload: dict) -> dict | None:
         """Создать фонд. payload должен соответствовать SFundCreate."""
-        resp = await self._client.post(
+        resp = await self._request("POST", 
             "/funds/create",
             json=payload,
             headers={"Authorization": f"Bearer {token}"}
@@ -293,7 +662,7 @@ class BackendClient:
     # ===== Создание события (админ) =====
     async def create_event(self, token: str, payload: dict) -> dict | None:
         """Создать новое мероприятие. payload соответствует SEventCreate."""
-        resp = await self._client.post(
+        resp = await self._request("POST", 
             "/events/create",
             json=payload,
             headers={"Authorization": f"Bearer {token}"}
@@ -325,7 +694,7 @@ class BackendClient:
         Возвращает dict или None при ошибке.
         """
         params = {"page": str(page), "page_size": str(page_size)}
-        resp = await self._client.get(
+        resp = await self._request("GET", 
             "/events/my-events",
             params=params,
             headers={"Authorization": f"Bearer {token}"}
@@ -361,7 +730,7 @@ class BackendClient:
         Возвращаем исходную структуру или None при ошибке.
         """
         params = {"page": str(page), "page_size": str(page_size)}
-        resp = await self._client.get(
+        resp = await self._request("GET", 
             f"/applications/event/{event_id}",
             params=params,
             headers={"Authorization": f"Bearer {token}"}
@@ -396,7 +765,7 @@ class BackendClient:
         payload: dict[str, Any] = {"status": status}
         if rejection_reason is not None and rejection_reason.strip():
             payload["rejection_reason"] = rejection_reason.strip()
-        resp = await self._client.put(
+        resp = await self._request("PUT", 
             f"/applications/{application_id}/update",
             json=payload,
             headers={"Authorization": f"Bearer {token}"}
@@ -438,7 +807,7 @@ class BackendClient:
         Возвращаем dict или None при ошибке.
         """
         params = {"page": str(page), "page_size": str(page_size)}
-        resp = await self._client.get(
+        resp = await self._request("GET", 
             "/applications/my-applications",
             params=params,
             headers={"Authorization": f"Bearer {token}"}
@@ -482,7 +851,7 @@ class BackendClient:
         Возвращаем dict или None при ошибке.
         """
         params = {"top_n": str(top_n)}
-        resp = await self._client.get(
+        resp = await self._request("GET", 
             "/user/leaderboard",
             params=params,
             headers={"Authorization": f"Bearer {token}"}
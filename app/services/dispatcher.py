@@ -0,0 +1,321 @@
+"""Шардированная обработка апдейтов MAX по user_id.
+
+Стандартный bot.run() получает апдейты и для каждого запускает хендлеры через
+asyncio.create_task, не дожидаясь их: два быстрых нажатия одного пользователя
+обрабатываются наперегонки, а весь бот живёт в одном процессе.
+
+ShardedDispatcher получает апдейты сам и раскладывает их по очередям шардов
+(user_id % shards). Воркер шарда обрабатывает апдейт и дожидается запущенных
+им хендлеров, поэтому апдейты одного пользователя идут строго по порядку,
+а разные пользователи обрабатываются параллельно.
+
+Задачи хендлеров перехватывает фабрика задач цикла событий: bot.handle_update
+создаёт их через asyncio.create_task, и фабрика записывает каждую в список
+текущего апдейта (ContextVar), пока тот обрабатывается.
+
+Медленный хендлер задерживает все апдейты своего шарда (head-of-line blocking),
+включая апдейты других пользователей этого шарда. Поэтому шард ждёт хендлеры не
+дольше BOT_UPDATE_TIMEOUT секунд: после этого он переходит к следующему апдейту,
+а хендлер дорабатывает в фоне (порядок для этого пользователя уже не гарантирован,
+в лог пишется предупреждение).
+
+При BOT_WORKER_PROCESSES > 0 апдейты по user_id уходят в дочерние процессы,
+каждый со своим экземпляром бота и своими шардами: хендлеры распределяются
+по ядрам. Состояния FSM и токены сессий общие (SQLite, см. persistence.py).
+"""
+import os
+import asyncio
+import logging
+import multiprocessing
+from contextvars import ContextVar
+from typing import Any, Callable
+
+BOT_DISPATCH = os.getenv("BOT_DISPATCH", "default").lower()  # default | sharded
+BOT_SHARDS = int(os.getenv("BOT_SHARDS", "32"))
+BOT_SHARD_QUEUE_SIZE = int(os.getenv("BOT_SHARD_QUEUE_SIZE", "1000"))
+BOT_WORKER_PROCESSES = int(os.getenv("BOT_WORKER_PROCESSES", "0"))
+BOT_UPDATE_TIMEOUT = float(os.getenv("BOT_UPDATE_TIMEOUT", "30"))  # 0 — ждать без ограничения
+
+logger = logging.getLogger(__name__)
+
+
+class _HandlerTasks(list):
+    """Задачи, созданные во время bot.handle_update одного апдейта."""
+
+    collecting = True
+
+
+_handler_tasks: ContextVar[_HandlerTasks | None] = ContextVar("handler_tasks", default=None)
+
+
+def _collecting_task_factory(previous):
+    """Фабрика задач, которая записывает новые задачи в список текущего апдейта."""
+
+    def factory(loop, coro, **kwargs):
+        task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+        # Задачи хендлеров наследуют контекст, но их собственные задачи
+        # (например, фоновые) уже не относятся к апдейту: список к тому времени закрыт
+        tasks = _handler_tasks.get()
+        if tasks is not None and tasks.collecting:
+            tasks.append(task)
+        return task
+
+    factory.collects_handler_tasks = True
+    return factory
+
+
+def _install_task_factory() -> None:
+    loop = asyncio.get_running_loop()
+    current = loop.get_task_factory()
+    if not getattr(current, "collects_handler_tasks", False):
+        loop.set_task_factory(_collecting_task_factory(current))
+
+
+def _log_handler_result(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Handler failed: %r", task.exception())
+
+
+def update_user_id(update: dict) -> int | None:
+    """user_id автора апдейта (None — апдейт не привязан к пользователю)."""
+    update_type = update.get("update_type")
+    try:
+        if update_type in ("message_created", "message_edited"):
+            return update["message"]["sender"]["user_id"]
+        if update_type == "message_callback":
+            return update["callback"]["user"]["user_id"]
+        if update_type == "message_removed":
+            return update.get("user_id")
+        user = update.get("user")
+        if isinstance(user, dict):
+            return user.get("user_id")
+    except (KeyError, TypeError):
+        pass
+    return None
+
+
+def shard_for(update: dict, shards: int) -> int:
+    """Номер шарда апдейта: одинаковый для всех апдейтов одного пользователя."""
+    user_id = update_user_id(update)
+    if user_id is None:
+        return 0
+    return int(user_id) % shards
+
+
+def process_for(update: dict, processes: int, shards: int) -> int:
+    """Номер процесса апдейта: тоже по user_id, но по старшей части, чтобы
+    внутри процесса пользователи расходились по всем его шардам."""
+    user_id = update_user_id(update)
+    if user_id is None:
+        return 0
+    return (int(user_id) // shards) % processes
+
+
+class ShardedDispatcher:
+    """Очереди и воркеры шардов поверх aiomax.Bot."""
+
+    def __init__(
+        self,
+        bot,
+        shards: int = BOT_SHARDS,
+        queue_size: int = BOT_SHARD_QUEUE_SIZE,
+        update_timeout: float = BOT_UPDATE_TIMEOUT,
+    ):
+        self.bot = bot
+        self.shards = max(1, shards)
+        self.queue_size = queue_size
+        self.update_timeout = update_timeout
+        self._queues: list[asyncio.Queue] = []
+        self._workers: list[asyncio.Task] = []
+        self.processed = 0
+        self.timed_out = 0
+
+    async def start(self) -> None:
+        _install_task_factory()
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.shards)]
+        self._workers = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+
+    async def stop(self) -> None:
+        """Дождаться обработки уже принятых апдейтов и остановить воркеры."""
+        for queue in self._queues:
+            await queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def dispatch(self, update: dict) -> None:
+        """Поставить апдейт в очередь его шарда (ждёт, если очередь заполнена)."""
+        await self._queues[shard_for(update, self.shards)].put(update)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            update = await queue.get()
+            try:
+                await self._handle(update)
+            except Exception as e:
+                logger.exception("Update handling failed: %s", e)
+            finally:
+                self.processed += 1
+                queue.task_done()
+
+    async def _handle(self, update: dict) -> None:
+        handlers = _HandlerTasks()
+        marker = _handler_tasks.set(handlers)
+        try:
+            await self.bot.handle_update(update)
+        finally:
+            handlers.collecting = False
+            _handler_tasks.reset(marker)
+        if not handlers:
+            return
+
+        _, pending = await asyncio.wait(handlers, timeout=self.update_timeout or None)
+        for task in handlers:
+            if task in pending:
+                task.add_done_callback(_log_handler_result)
+            else:
+                _log_handler_result(task)
+        if pending:
+            self.timed_out += 1
+            logger.warning(
+                "Update %s handlers still running after %gs, shard moves on",
+                update.get("update_type"), self.update_timeout,
+            )
+
+    async def run_polling(self, forward: Callable[[dict], Any] | None = None) -> None:
+        """Цикл получения апдейтов (как aiomax.Bot.start_polling), но с раздачей по шардам.
+
+        forward — альтернативный получатель апдейтов (раздача по процессам).
+        """
+        bot = self.bot
+        bot.polling = True
+        async with _create_session(bot) as session:
+            bot.session = session
+            await bot.get_me()
+            logger.info("Started sharded polling with bot @%s (%s shards)", bot.username, self.shards)
+
+            for handler in bot.handlers["on_ready"]:
+                asyncio.create_task(handler())
+
+            if forward is None:
+                await self.start()
+            try:
+                while bot.polling:
+                    try:
+                        updates = await bot.get_updates()
+                        for update in updates["updates"]:
+                            if forward is None:
+                                await self.dispatch(update)
+                            else:
+                                await forward(update)
+                    except asyncio.CancelledError:
+                        break
+                    except Exception as e:
+                        logger.exception(e)
+                        await asyncio.sleep(3)
+            finally:
+                if forward is None:
+                    await self.stop()
+        bot.session = None
+        bot.polling = False
+
+
+def _create_session(bot):
+    """aiohttp-сессия бота, собранная так же, как в aiomax.Bot.start_polling.
+
+    С aiomax 2.12.5 запросы идут по относительным путям ("me", "updates"): сессии нужны
+    base_url=bot.api_url, заголовок Authorization и, при use_certificate, сертификат
+    из пакета aiomax. В aiomax 2.12.2 api_url нет: URL полные, а токен уходит в параметрах.
+    """
+    import aiohttp
+
+    api_url = getattr(bot, "api_url", None)
+    if api_url is None:
+        return aiohttp.ClientSession()
+    connector = None
+    if getattr(bot, "use_certificate", False):
+        import ssl
+        import aiomax
+
+        ssl_context = ssl.create_default_context()
+        ssl_context.load_verify_locations(
+            cafile=os.path.join(os.path.dirname(aiomax.__file__), "russian_trusted_root_ca.cer")
+        )
+        connector = aiohttp.TCPConnector(ssl=ssl_context)
+    return aiohttp.ClientSession(
+        headers={"Authorization": bot.access_token},
+        connector=connector,
+        base_url=api_url,
+    )
+
+
+async def _serve_worker(bot_factory: Callable[[], Any], inbox, shards: int) -> None:
+    """Дочерний процесс: бот без поллинга, апдейты приходят из inbox."""
+    bot = bot_factory()
+    dispatcher = ShardedDispatcher(bot, shards)
+    loop = asyncio.get_running_loop()
+    async with _create_session(bot) as session:
+        bot.session = session
+        await bot.get_me()
+        await dispatcher.start()
+        while True:
+            update = await loop.run_in_executor(None, inbox.get)
+            if update is None:
+                break
+            await dispatcher.dispatch(update)
+        await dispatcher.stop()
+    bot.session = None
+
+
+def _worker_main(bot_factory: Callable[[], Any], inbox, shards: int) -> None:
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve_worker(bot_factory, inbox, shards))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_sharded(
+    bot_factory: Callable[[], Any],
+    processes: int = BOT_WORKER_PROCESSES,
+    shards: int = BOT_SHARDS,
+    queue_size: int = BOT_SHARD_QUEUE_SIZE,
+) -> None:
+    """Запустить бота в шардированном режиме.
+
+    bot_factory — функция уровня модуля, создающая настроенный бот (в дочерних
+    процессах вызывается заново, поэтому должна сериализоваться pickle).
+    """
+    receiver = bot_factory()
+    dispatcher = ShardedDispatcher(receiver, shards, queue_size)
+    if processes <= 0:
+        asyncio.run(dispatcher.run_polling())
+        return
+
+    context = multiprocessing.get_context("spawn")
+    inboxes = [context.Queue(maxsize=queue_size) for _ in range(processes)]
+    workers = [
+        context.Process(target=_worker_main, args=(bot_factory, inbox, shards), daemon=True)
+        for inbox in inboxes
+    ]
+    for worker in workers:
+        worker.start()
+
+    async def forward(update: dict) -> None:
+        # Пользователь всегда попадает в один процесс, а значит, и в одну очередь шарда
+        inbox = inboxes[process_for(update, processes, shards)]
+        await asyncio.get_running_loop().run_in_executor(None, inbox.put, update)
+
+    try:
+        asyncio.run(dispatcher.run_polling(forward))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for inbox in inboxes:
+            try:
+                inbox.put(None, timeout=5)
+            except Exception:
+                pass
+        for worker in workers:
+            worker.join(timeout=30)
@@ -0,0 +1,139 @@
+"""Персистентное хранилище FSM для aiomax.
+
+PersistentFSMStorage повторяет API aiomax.fsm.FSMStorage (get/change/clear для
+state и data), но пишет в SQLite (write-through) и держит копию в памяти процесса.
+Состояния переживают перезапуск, а несколько процессов бота видят одни и те же
+состояния: запись чужого процесса становится видна не позже FSM_CACHE_TTL секунд.
+Если БД занята дольше BOT_DB_BUSY_TIMEOUT, запись остаётся в памяти и повторяется
+при следующем обращении к этому пользователю, а цикл событий не ждёт блокировку.
+"""
+import os
+import json
+import time
+import logging
+from typing import Any
+
+from aiomax.fsm import FSMStorage
+
+from app.services.persistence import get_connection, execute_write
+
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class PersistentFSMStorage(FSMStorage):
+    def __init__(self, path: str | None = None, cache_ttl: float | None = None):
+        super().__init__()
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv("FSM_CACHE_TTL", "1"))
+        self._conn = get_connection(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fsm ("
+            " user_id INTEGER PRIMARY KEY,"
+            " state TEXT,"
+            " data TEXT,"
+            " updated_at REAL NOT NULL"
+            ")"
+        )
+        # user_id -> момент, до которого копия в self.states/self.data считается свежей
+        self._fresh_until: dict[int, float] = {}
+        # user_id, чья запись не попала в БД: копия в памяти новее БД
+        self._unsaved: set[int] = set()
+
+    # ----- чтение -----
+    def _load(self, user_id: int) -> None:
+        if user_id in self._unsaved:
+            self._save(user_id, self.states.get(user_id), self.data.get(user_id))
+            return
+        if self._fresh_until.get(user_id, 0) > time.monotonic():
+            return
+        row = self._conn.execute("SELECT state, data FROM fsm WHERE user_id = ?", (user_id,)).fetchone()
+        self.states.pop(user_id, None)
+        self.data.pop(user_id, None)
+        if row is not None:
+            state, data = row
+            if state is not None:
+                self.states[user_id] = json.loads(state)
+            if data is not None:
+                self.data[user_id] = json.loads(data)
+        self._fresh_until[user_id] = time.monotonic() + self.cache_ttl
+
+    def get_state(self, user_id: int) -> Any:
+        self._load(user_id)
+        return super().get_state(user_id)
+
+    def get_data(self, user_id: int) -> Any:
+        self._load(user_id)
+        return super().get_data(user_id)
+
+    # ----- запись (сначала БД, потом память) -----
+    def _save(self, user_id: int, state: Any, data: Any) -> None:
+        if state is None and data is None:
+            saved = execute_write(self._conn, "DELETE FROM fsm WHERE user_id = ?", (user_id,))
+        else:
+            saved = execute_write(
+                self._conn,
+                "INSERT INTO fsm (user_id, state, data, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(user_id) DO UPDATE SET state = excluded.state, data = excluded.data,"
+                " updated_at = excluded.updated_at",
+                (
+                    user_id,
+                    json.dumps(state, ensure_ascii=False) if state is not None else None,
+                    json.dumps(data, ensure_ascii=False) if data is not None else None,
+                    time.time(),
+                ),
+            )
+        if saved:
+            self._unsaved.discard(user_id)
+        else:
+            self._unsaved.add(user_id)
+
+    def _write(self, user_id: int, state: Any = _MISSING, data: Any = _MISSING) -> None:
+        if user_id not in self._unsaved:
+            self._load(user_id)
+        if state is _MISSING:
+            state = self.states.get(user_id)
+        if data is _MISSING:
+            data = self.data.get(user_id)
+        self._save(user_id, state, data)
+        self.states.pop(user_id, None)
+        self.data.pop(user_id, None)
+        if state is not None:
+            self.states[user_id] = state
+        if data is not None:
+            self.data[user_id] = data
+        self._fresh_until[user_id] = time.monotonic() + self.cache_ttl
+
+    def change_state(self, user_id: int, new: Any):
+        self._write(user_id, state=new)
+
+    def change_data(self, user_id: int, new: Any):
+        self._write(user_id, data=new)
+
+    def clear_state(self, user_id: int) -> Any:
+        old = self.get_state(user_id)
+        self._write(user_id, state=None)
+        return old
+
+    def clear_data(self, user_id: int) -> Any:
+        old = self.get_data(user_id)
+        self._write(user_id, data=None)
+        return old
+
+    def clear(self, user_id: int):
+        self._write(user_id, state=None, data=None)
+
+
+def create_fsm_storage() -> FSMStorage:
+    """Хранилище FSM по настройке FSM_STORAGE (sqlite по умолчанию, memory — как раньше).
+
+    Настройки читаются при вызове, а не при импорте: к этому моменту app/.env уже загружен.
+    """
+    if os.getenv("FSM_STORAGE", "sqlite").lower() == "memory":
+        return FSMStorage()
+    try:
+        return PersistentFSMStorage()
+    except Exception as e:
+        logger.error("Persistent FSM storage unavailable, falling back to memory: %s", e)
+        return FSMStorage()
@@ -0,0 +1,144 @@
+"""Сопоставление пользовательского ввода с названиями городов и тегов.
+
+Индекс строится один раз на список справочника (см. MatcherCache) и отвечает
+без обращения к бекенду: точное совпадение после нормализации, однозначный
+префикс и нечёткий поиск с опечатками (триграммы + расстояние Левенштейна).
+"""
+from typing import Any
+
+
+def normalize_name(value: str) -> str:
+    """casefold, ё→е, схлопывание пробелов."""
+    return " ".join(str(value).casefold().replace("ё", "е").split())
+
+
+def _trigrams(value: str) -> set[str]:
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Расстояние Левенштейна; при превышении limit возвращает limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class _TrieNode:
+    __slots__ = ("children", "items")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        self.items: list[int] = []
+
+
+class NameMatcher:
+    """Индекс по списку записей вида {"id": ..., "name": ...}."""
+
+    MIN_PREFIX_LENGTH = 3
+
+    def __init__(self, items: list[dict]):
+        self._items: list[dict] = []
+        self._names: list[str] = []
+        self._exact: dict[str, int] = {}
+        self._trie = _TrieNode()
+        self._trigram_index: dict[str, set[int]] = {}
+
+        for item in items:
+            name = normalize_name(item.get("name") or "")
+            if not name or name in self._exact:
+                continue
+            index = len(self._items)
+            self._items.append(item)
+            self._names.append(name)
+            self._exact[name] = index
+
+            node = self._trie
+            for char in name:
+                node = node.children.setdefault(char, _TrieNode())
+                node.items.append(index)
+
+            for trigram in _trigrams(name):
+                self._trigram_index.setdefault(trigram, set()).add(index)
+
+    def exact(self, text: str) -> dict | None:
+        """Точное совпадение после нормализации."""
+        index = self._exact.get(normalize_name(text))
+        return self._items[index] if index is not None else None
+
+    def by_prefix(self, text: str) -> list[dict]:
+        """Все записи, название которых начинается с text."""
+        node = self._trie
+        for char in normalize_name(text):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [self._items[index] for index in node.items]
+
+    def fuzzy(self, text: str) -> dict | None:
+        """Ближайшая запись с учётом опечаток (однозначный лучший вариант или None)."""
+        query = normalize_name(text)
+        if not query:
+            return None
+        limit = 1 if len(query) <= 5 else 2
+
+        candidates: dict[int, int] = {}
+        for trigram in _trigrams(query):
+            for index in self._trigram_index.get(trigram, ()):
+                candidates[index] = candidates.get(index, 0) + 1
+
+        best_index, best_distance, ambiguous = None, limit + 1, False
+        for index in candidates:
+            distance = _edit_distance(query, self._names[index], limit)
+            if distance < best_distance:
+                best_index, best_distance, ambiguous = index, distance, False
+            elif distance == best_distance and distance <= limit:
+                ambiguous = True
+        if best_index is None or ambiguous:
+            return None
+        return self._items[best_index]
+
+    def match(self, text: str) -> dict | None:
+        """Точное совпадение → однозначный префикс → нечёткий поиск."""
+        found = self.exact(text)
+        if found is not None:
+            return found
+        if len(normalize_name(text)) >= self.MIN_PREFIX_LENGTH:
+            prefixed = self.by_prefix(text)
+            if len(prefixed) == 1:
+                return prefixed[0]
+        return self.fuzzy(text)
+
+
+class MatcherCache:
+    """Держит NameMatcher для последнего списка справочника.
+
+    BackendClient возвращает один и тот же объект списка, пока кэш справочника
+    не обновился, поэтому индекс перестраивается только при смене данных.
+    """
+
+    def __init__(self):
+        self._source: Any = None
+        self._matcher: NameMatcher | None = None
+
+    def get(self, items: list[dict]) -> NameMatcher:
+        if self._matcher is None or items is not self._source:
+            self._matcher = NameMatcher(items)
+            self._source = items
+        return self._matcher
+
+
+city_matchers = MatcherCache()
+tag_matchers = MatcherCache()
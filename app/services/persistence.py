@@ -0,0 +1,50 @@
+"""Общее локальное хранилище бота (SQLite) для состояний FSM и сессий.
+
+Один файл БД на хост: несколько процессов бота открывают его одновременно,
+WAL-журнал позволяет читать во время записи другого процесса.
+Запросы синхронные и выполняются в цикле событий, поэтому ожидание чужой блокировки
+ограничено BOT_DB_BUSY_TIMEOUT секунд (по умолчанию 0.05), а не 5 с по умолчанию
+sqlite3: запись, которая не дождалась блокировки, пропускается (execute_write вернёт
+False), и вызывающий оставляет данные в памяти до следующей попытки.
+"""
+import os
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BOT_DB_PATH = str(Path(__file__).resolve().parent.parent / "bot_state.sqlite3")
+
+_connections: dict[str, sqlite3.Connection] = {}
+_lock = threading.Lock()
+
+
+def get_connection(path: str | None = None) -> sqlite3.Connection:
+    """Соединение с БД бота (одно на процесс и путь), таблицы создаются модулями-пользователями."""
+    path = path or os.getenv("BOT_DB_PATH", DEFAULT_BOT_DB_PATH)
+    with _lock:
+        conn = _connections.get(path)
+        if conn is None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                path,
+                timeout=float(os.getenv("BOT_DB_BUSY_TIMEOUT", "0.05")),
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _connections[path] = conn
+        return conn
+
+
+def execute_write(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> bool:
+    """Выполнить запись; False, если БД занята другим процессом дольше BOT_DB_BUSY_TIMEOUT."""
+    try:
+        conn.execute(sql, params)
+    except sqlite3.OperationalError as e:
+        logger.warning("Bot DB write skipped: %s", e)
+        return False
+    return True
@@ -0,0 +1,107 @@
+"""Устойчивость HTTP-вызовов к бекенду: backoff, circuit breaker, гистограмма задержек."""
+import random
+import time
+from bisect import bisect_left
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Экспоненциальная задержка с full jitter: случайно в [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitOpenError(Exception):
+    """Бекенд временно считается недоступным — запрос не отправлялся."""
+
+
+class CircuitBreaker:
+    """Размыкается после threshold подряд неудачных вызовов на cooldown секунд.
+
+    После паузы пропускает один пробный вызов (half-open): успех замыкает цепь,
+    неудача снова размыкает её.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Бросает CircuitOpenError, если вызов сейчас делать нельзя."""
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError("Backend circuit is open")
+        if state == "half_open":
+            if self._trial_in_progress:
+                raise CircuitOpenError("Backend circuit is half-open, trial call in progress")
+            self._trial_in_progress = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+
+    def release(self) -> None:
+        """Вызов прерван без результата (например, отменён) — освободить пробный слот."""
+        self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial_in_progress or self._failures >= self.threshold:
+            self._opened_at = time.monotonic()
+        self._trial_in_progress = False
+
+
+class LatencyHistogram:
+    """Гистограмма задержек (мс) по меткам вызовов с фиксированными границами корзин."""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._counts: dict[str, list[int]] = {}
+        self._totals: dict[str, float] = {}
+
+    def observe(self, label: str, seconds: float) -> None:
+        ms = seconds * 1000
+        counts = self._counts.get(label)
+        if counts is None:
+            counts = self._counts[label] = [0] * (len(self.BUCKETS_MS) + 1)
+            self._totals[label] = 0.0
+        counts[bisect_left(self.BUCKETS_MS, ms)] += 1
+        self._totals[label] += ms
+
+    def snapshot(self) -> dict[str, dict]:
+        """{label: {"count", "avg_ms", "p50_ms", "p95_ms", "p99_ms", "buckets": {"<=5": n, ..., "+inf": n}}}"""
+        result = {}
+        for label, counts in self._counts.items():
+            total = sum(counts)
+            bounds = [f"<={b}" for b in self.BUCKETS_MS] + ["+inf"]
+            result[label] = {
+                "count": total,
+                "avg_ms": round(self._totals[label] / total, 2) if total else 0.0,
+                "p50_ms": self._quantile(counts, total, 0.50),
+                "p95_ms": self._quantile(counts, total, 0.95),
+                "p99_ms": self._quantile(counts, total, 0.99),
+                "buckets": dict(zip(bounds, counts)),
+            }
+        return result
+
+    def _quantile(self, counts: list[int], total: int, q: float) -> float | None:
+        """Верхняя граница корзины, в которую попадает квантиль (None — выше последней)."""
+        if not total:
+            return None
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= q * total:
+                return self.BUCKETS_MS[index] if index < len(self.BUCKETS_MS) else None
+        return None
@@ -0,0 +1,287 @@
+"""Планировщик исходящих запросов бота к MAX API.
+
+Все изменяющие запросы (отправка/редактирование сообщений, ответы на callback)
+проходят через SendScheduler:
+
+* token bucket на чат (SEND_CHAT_RATE/SEND_CHAT_BURST) и общий (SEND_RATE/SEND_BURST);
+* приоритетные полосы: интерактивные ответы обгоняют массовые рассылки
+  (рассылки оборачиваются в `with bulk_sends(): ...`);
+* на 429 весь поток отправки встаёт на паузу (Retry-After или backoff с jitter),
+  запрос повторяется до SEND_MAX_RETRIES раз;
+* metrics(): глубина очередей по полосам, число 429/повторов, время ожидания;
+  раз в SEND_METRICS_LOG_SECONDS снимок пишется в лог (если была активность).
+
+Лимиты SEND_RATE/SEND_CHAT_RATE заданы на бота целиком. В шардированном режиме
+с BOT_WORKER_PROCESSES = N (см. dispatcher.py) каждый процесс держит свои bucket'ы,
+поэтому скорость и burst делятся на N: в сумме процессы не превышают лимит
+платформы. Общее хранилище токенов не используется — деление проще и не добавляет
+обращения к БД на каждую отправку.
+
+PacedBot — aiomax.Bot, у которого post/put/patch/delete идут через планировщик.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import aiomax
+from aiomax import utils
+
+from app.services.resilience import backoff_delay, LatencyHistogram
+
+SEND_SCHEDULER = os.getenv("SEND_SCHEDULER", "on").lower() in ("1", "true", "yes", "on")
+SEND_RATE = float(os.getenv("SEND_RATE", "25"))  # запросов в секунду на бота
+SEND_BURST = float(os.getenv("SEND_BURST", "25"))
+SEND_CHAT_RATE = float(os.getenv("SEND_CHAT_RATE", "1"))  # запросов в секунду на чат
+SEND_CHAT_BURST = float(os.getenv("SEND_CHAT_BURST", "5"))
+SEND_CHAT_BUCKETS_MAX = int(os.getenv("SEND_CHAT_BUCKETS_MAX", "10000"))
+SEND_MAX_RETRIES = int(os.getenv("SEND_MAX_RETRIES", "3"))
+SEND_BACKOFF_BASE = float(os.getenv("SEND_BACKOFF_BASE", "0.5"))
+SEND_BACKOFF_MAX = float(os.getenv("SEND_BACKOFF_MAX", "10"))
+SEND_METRICS_LOG_SECONDS = float(os.getenv("SEND_METRICS_LOG_SECONDS", "60"))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+_LANE_NAMES = ("interactive", "bulk")
+
+logger = logging.getLogger(__name__)
+
+_send_priority: ContextVar[int] = ContextVar("send_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def bulk_sends():
+    """Отправки внутри блока идут в полосе массовых рассылок (после интерактивных)."""
+    marker = _send_priority.set(PRIORITY_BULK)
+    try:
+        yield
+    finally:
+        _send_priority.reset(marker)
+
+
+class TokenBucket:
+    """Token bucket с резервированием: reserve() списывает токен и возвращает, сколько ждать."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Занять токен (баланс может уйти в минус) и вернуть задержку до его появления."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def delay(self) -> float:
+        """Через сколько секунд появится токен (без списания)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(time.monotonic())
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill(time.monotonic())
+        self._tokens -= 1
+
+
+def sending_processes() -> int:
+    """Сколько процессов бота отправляют сообщения одновременно (воркеры шардирования)."""
+    if os.getenv("BOT_DISPATCH", "default").lower() != "sharded":
+        return 1
+    return max(1, int(os.getenv("BOT_WORKER_PROCESSES", "0")))
+
+
+class SendScheduler:
+    def __init__(
+        self,
+        rate: float = SEND_RATE,
+        burst: float = SEND_BURST,
+        chat_rate: float = SEND_CHAT_RATE,
+        chat_burst: float = SEND_CHAT_BURST,
+        max_chat_buckets: int = SEND_CHAT_BUCKETS_MAX,
+        processes: int | None = None,
+    ):
+        # Доля лимитов этого процесса (лимиты платформы — на бота целиком)
+        processes = processes or sending_processes()
+        rate, burst = rate / processes, burst / processes
+        self.chat_rate = chat_rate / processes
+        self.chat_burst = chat_burst / processes
+        self.max_chat_buckets = max_chat_buckets
+        self._global = TokenBucket(rate, burst)
+        self._chats: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self._lanes: list[deque] = [deque() for _ in _LANE_NAMES]
+        self._wakeup: asyncio.Event | None = None
+        self._pump_task: asyncio.Task | None = None
+        self._paused_until = 0.0
+        self._max_depth = [0] * len(_LANE_NAMES)
+        self._sent = 0
+        self._rate_limited = 0
+        self._retries = 0
+        self._waits = LatencyHistogram()
+        self._report_task: asyncio.Task | None = None
+        self._reported_sent = 0
+
+    # ----- ожидание очереди -----
+    def _chat_bucket(self, chat_key: int) -> TokenBucket:
+        bucket = self._chats.get(chat_key)
+        if bucket is None:
+            bucket = self._chats[chat_key] = TokenBucket(self.chat_rate, self.chat_burst)
+            if len(self._chats) > self.max_chat_buckets:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_key)
+        return bucket
+
+    async def acquire(self, chat_key: int | None = None) -> None:
+        """Дождаться права на запрос: сначала лимит чата, затем общий лимит в порядке приоритета."""
+        started = time.monotonic()
+        priority = _send_priority.get()
+        if chat_key is not None:
+            delay = self._chat_bucket(chat_key).reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if self._pump_task is None or self._pump_task.done():
+            self._wakeup = asyncio.Event()
+            self._pump_task = asyncio.create_task(self._pump())
+        if SEND_METRICS_LOG_SECONDS > 0 and (self._report_task is None or self._report_task.done()):
+            self._report_task = asyncio.create_task(self._report())
+        ticket = asyncio.get_running_loop().create_future()
+        lane = self._lanes[priority]
+        lane.append(ticket)
+        self._max_depth[priority] = max(self._max_depth[priority], len(lane))
+        self._wakeup.set()
+        try:
+            await ticket
+        except asyncio.CancelledError:
+            if not ticket.done():
+                lane.remove(ticket)
+            raise
+        self._waits.observe(_LANE_NAMES[priority], time.monotonic() - started)
+
+    async def _pump(self) -> None:
+        """Выдаёт токены общего bucket ожидающим: сначала интерактивной полосе, потом bulk."""
+        while True:
+            lane = next((lane for lane in self._lanes if lane), None)
+            if lane is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            delay = max(self._paused_until - time.monotonic(), self._global.delay())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            ticket = lane.popleft()
+            if ticket.done():
+                continue
+            self._global.take()
+            ticket.set_result(None)
+
+    async def _report(self) -> None:
+        """Периодически пишет metrics() в лог, если с прошлого раза что-то отправлялось."""
+        while True:
+            await asyncio.sleep(SEND_METRICS_LOG_SECONDS)
+            if self._sent == self._reported_sent and not any(self._lanes):
+                continue
+            self._reported_sent = self._sent
+            logger.info("Send scheduler metrics: %s", self.metrics())
+
+    # ----- 429 -----
+    def pause(self, seconds: float) -> None:
+        """Остановить выдачу токенов на seconds (ответ 429 от платформы)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def run(self, chat_key: int | None, call):
+        """Выполнить call() (корутина, возвращающая aiohttp-ответ) с лимитами и повтором при 429."""
+        for attempt in range(SEND_MAX_RETRIES + 1):
+            await self.acquire(chat_key)
+            response = await call()
+            if response.status != 429:
+                self._sent += 1
+                return response
+            self._rate_limited += 1
+            if attempt == SEND_MAX_RETRIES:
+                return response
+            retry_after = response.headers.get("Retry-After")
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = backoff_delay(attempt, SEND_BACKOFF_BASE, SEND_BACKOFF_MAX)
+            response.release()
+            self._retries += 1
+            self.pause(delay)
+            logger.warning("MAX API rate limit (429), retry in %.2fs (attempt %s)", delay, attempt + 1)
+        return response
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": {name: len(lane) for name, lane in zip(_LANE_NAMES, self._lanes)},
+            "max_queue_depth": dict(zip(_LANE_NAMES, self._max_depth)),
+            "sent": self._sent,
+            "rate_limited": self._rate_limited,
+            "retries": self._retries,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "chat_buckets": len(self._chats),
+            "wait": self._waits.snapshot(),
+        }
+
+
+def _chat_key(params: dict) -> int | None:
+    """Ключ лимита чата из параметров запроса MAX API (chat_id или user_id)."""
+    for key in ("chat_id", "user_id"):
+        value = params.get(key)
+        if value is not None:
+            return int(value)
+    return None
+
+
+class PacedBot(aiomax.Bot):
+    """aiomax.Bot, у которого изменяющие запросы идут через SendScheduler.
+
+    GET (в т.ч. long polling /updates) не ограничиваются.
+    """
+
+    def __init__(self, *args, scheduler: SendScheduler | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.send_scheduler = scheduler or SendScheduler()
+
+    async def _paced(self, method: str, *args, **kwargs):
+        if self.session is None:
+            raise Exception("Session is not initialized")
+
+        params = kwargs.pop("params", None) or {}
+        chat_key = _chat_key(params)
+        params["access_token"] = self.access_token
+        request = getattr(self.session, method)
+        response = await self.send_scheduler.run(
+            chat_key, lambda: request(*args, params=dict(params), **kwargs)
+        )
+
+        exception = await utils.get_exception(response)
+        if not exception:
+            return response
+        raise exception
+
+    async def post(self, *args, **kwargs):
+        return await self._paced("post", *args, **kwargs)
+
+    async def put(self, *args, **kwargs):
+        return await self._paced("put", *args, **kwargs)
+
+    async def patch(self, *args, **kwargs):
+        return await self._paced("patch", *args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        return await self._paced("delete", *args, **kwargs)
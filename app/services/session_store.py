@@ -1,10 +1,110 @@
-_session_tokens: dict[int, str] = {}
+"""Токены сессий бекенда по user_id.
+
+Токены хранятся в SQLite (общая БД бота, см. persistence.py) и в индексе в
+памяти, который загружается лениво при первом обращении. После перезапуска бот
+продолжает работать со старыми токенами вместо массового /auth/login. Токен
+считается истёкшим через SESSION_TOKEN_TTL_DAYS (чуть меньше срока сессии на
+бекенде) — тогда get_session_token вернёт None и хендлер выполнит вход заново.
+Токен, который бекенд отверг (401, например после его перезапуска), BackendClient
+сбрасывает сам и перевыпускает через повторный вход (см. session_user).
+"""
+import os
+import time
+import logging
+
+from app.services.persistence import get_connection, execute_write
+
+logger = logging.getLogger(__name__)
+
+# user_id -> (token, expires_at: unix time)
+_session_tokens: dict[int, tuple[str, float]] = {}
+# token -> user_id (обратный индекс для сброса отвергнутого токена)
+_token_users: dict[str, int] = {}
+_conn = None
+_loaded = False
+
+
+def _db():
+    """Соединение с БД (None — режим memory или БД недоступна)."""
+    global _conn, _loaded
+    if _loaded:
+        return _conn
+    _loaded = True
+    # Настройки читаются при первом обращении, когда app/.env уже загружен
+    if os.getenv("SESSION_STORE", "sqlite").lower() == "memory":  # sqlite | memory
+        return None
+    try:
+        _conn = get_connection()
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_tokens ("
+            " user_id INTEGER PRIMARY KEY,"
+            " token TEXT NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ")"
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS ix_session_tokens_token ON session_tokens (token)")
+        now = time.time()
+        _conn.execute("DELETE FROM session_tokens WHERE expires_at <= ?", (now,))
+        for user_id, token, expires_at in _conn.execute("SELECT user_id, token, expires_at FROM session_tokens"):
+            _session_tokens[user_id] = (token, expires_at)
+            _token_users[token] = user_id
+        logger.info("Session store loaded: %s tokens", len(_session_tokens))
+    except Exception as e:
+        logger.error("Persistent session store unavailable, using memory only: %s", e)
+        _conn = None
+    return _conn
+
 
 def set_session_token(user_id: int, token: str):
-    _session_tokens[user_id] = token
+    conn = _db()
+    expires_at = time.time() + float(os.getenv("SESSION_TOKEN_TTL_DAYS", "29")) * 86400
+    if conn is not None:
+        # Если БД занята, токен остаётся только в памяти этого процесса
+        execute_write(
+            conn,
+            "INSERT INTO session_tokens (user_id, token, expires_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(user_id) DO UPDATE SET token = excluded.token, expires_at = excluded.expires_at",
+            (user_id, token, expires_at),
+        )
+    previous = _session_tokens.get(user_id)
+    if previous is not None:
+        _token_users.pop(previous[0], None)
+    _session_tokens[user_id] = (token, expires_at)
+    _token_users[token] = user_id
 
 def get_session_token(user_id: int) -> str | None:
-    return _session_tokens.get(user_id)
+    conn = _db()
+    entry = _session_tokens.get(user_id)
+    if entry is None and conn is not None:
+        # Токен мог выдать другой процесс бота после нашей загрузки
+        row = conn.execute(
+            "SELECT token, expires_at FROM session_tokens WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is not None:
+            entry = _session_tokens[user_id] = (row[0], row[1])
+            _token_users[row[0]] = user_id
+    if entry is None:
+        return None
+    token, expires_at = entry
+    if expires_at <= time.time():
+        clear_session_token(user_id)
+        return None
+    return token
 
 def clear_session_token(user_id: int):
-    _session_tokens.pop(user_id, None)
\ No newline at end of file
+    conn = _db()
+    if conn is not None:
+        execute_write(conn, "DELETE FROM session_tokens WHERE user_id = ?", (user_id,))
+    entry = _session_tokens.pop(user_id, None)
+    if entry is not None:
+        _token_users.pop(entry[0], None)
+
+def session_user(token: str) -> int | None:
+    """user_id, которому выдан token (None — токен неизвестен боту)."""
+    conn = _db()
+    user_id = _token_users.get(token)
+    if user_id is None and conn is not None:
+        row = conn.execute("SELECT user_id FROM session_tokens WHERE token = ?", (token,)).fetchone()
+        if row is not None:
+            user_id = row[0]
+    return user_id
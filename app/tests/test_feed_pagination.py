@@ -0,0 +1,73 @@
+"""Листание ленты заявок: кнопки несут номер страницы, а бэкенду уходит курсор этой страницы."""
+import asyncio
+
+import pytest
+
+aiomax = pytest.importorskip("aiomax")
+pytest.importorskip("httpx")
+
+from aiomax.fsm import FSMStorage
+
+from app import handlers
+
+
+class FakeFeedBackend:
+    """Лента из total событий, которая отдаёт next_cursor и запоминает, с чем её просили."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.calls: list[tuple[int, str | None]] = []
+
+    async def get_feed_screen(self, token: str, page: int = 1, page_size: int = 5, after: str | None = None) -> dict:
+        self.calls.append((page, after))
+        start = int(after.removeprefix("after-")) if after else (page - 1) * page_size
+        ids = list(range(start + 1, min(start + page_size, self.total) + 1))
+        return {
+            "city": {"id": 1, "name": "Москва"},
+            "interests": [],
+            "feed": {
+                "events": [{"id": event_id, "title": f"Событие {event_id}"} for event_id in ids],
+                "total_pages": -(-self.total // page_size),
+                "next_cursor": f"after-{ids[-1]}" if ids and ids[-1] < self.total else None,
+            },
+        }
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    backend = FakeFeedBackend(total=12)
+    monkeypatch.setenv("FEED_RENDER_MODE", "page")
+    monkeypatch.setattr(handlers, "backend_client", backend)
+    monkeypatch.setattr(handlers, "get_session_token", lambda user_id: "token")
+    return backend
+
+
+def show(storage: FSMStorage, page: int) -> None:
+    async def send(text, keyboard=None):
+        return None
+
+    asyncio.run(handlers._send_events_feed(7, storage, send, page=page))
+
+
+def test_pages_after_first_are_fetched_by_cursor(feed):
+    storage = FSMStorage()
+
+    show(storage, 1)
+    show(storage, 2)
+    show(storage, 3)
+    show(storage, 2)
+
+    assert feed.calls == [(1, None), (2, "after-5"), (3, "after-10"), (2, "after-5")]
+    assert storage.get_data(7)["feed_cursors"] == {"2": "after-5", "3": "after-10"}
+
+
+def test_first_page_resets_cursors(feed):
+    storage = FSMStorage()
+    show(storage, 1)
+    show(storage, 2)
+    storage.change_data(7, {**storage.get_data(7), "other": 1})
+
+    show(storage, 1)
+
+    assert feed.calls[-1] == (1, None)
+    assert storage.get_data(7) == {"feed_cursors": {"2": "after-5"}, "other": 1}
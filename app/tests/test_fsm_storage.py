@@ -0,0 +1,39 @@
+"""Запись FSM при занятой БД: цикл событий не ждёт блокировку, данные не теряются."""
+import json
+import time
+import sqlite3
+
+import pytest
+
+pytest.importorskip("aiomax")
+
+from app.services.fsm_storage import PersistentFSMStorage
+
+
+def stored_data(path, user_id: int):
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute("SELECT data FROM fsm WHERE user_id = ?", (user_id,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row and row[0] else None
+
+
+def test_write_to_locked_db_stays_in_memory_and_is_flushed_later(tmp_path, monkeypatch):
+    path = str(tmp_path / "bot.sqlite3")
+    monkeypatch.setenv("BOT_DB_BUSY_TIMEOUT", "0.05")
+    storage = PersistentFSMStorage(path, cache_ttl=0)
+
+    # Другой процесс держит блокировку записи
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    started = time.monotonic()
+    storage.change_data(7, {"selected_fund": 3})
+    elapsed = time.monotonic() - started
+    assert elapsed < 1
+    assert storage.get_data(7) == {"selected_fund": 3}
+
+    other.execute("COMMIT")
+    other.close()
+    assert storage.get_data(7) == {"selected_fund": 3}
+    assert stored_data(path, 7) == {"selected_fund": 3}
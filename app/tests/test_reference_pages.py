@@ -0,0 +1,43 @@
+"""Справочник городов длиннее одной страницы: индекс сопоставления строится по всем страницам."""
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.services.backend_client import BackendClient
+from app.services.name_matcher import MatcherCache
+
+CITIES = [{"id": city_id, "name": f"Город {city_id}"} for city_id in range(1, 251)]
+
+
+def make_client(requests: list[int]) -> BackendClient:
+    def backend(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        page_size = int(request.url.params["page_size"])
+        requests.append(page)
+        return httpx.Response(200, json=CITIES[(page - 1) * page_size:page * page_size])
+
+    client = BackendClient()
+    client._client = httpx.AsyncClient(base_url="http://backend", transport=httpx.MockTransport(backend))
+    return client
+
+
+def test_city_index_covers_every_page():
+    requests: list[int] = []
+    client = make_client(requests)
+    matchers = MatcherCache()
+
+    async def scenario():
+        first = await client.get_all_cities()
+        second = await client.get_all_cities()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert requests == [1, 2, 3]
+    assert len(first) == len(CITIES)
+    # Пока страницы в кэше, список тот же, и индекс не перестраивается
+    assert second is first
+    assert matchers.get(first) is matchers.get(second)
+    assert matchers.get(first).match("город 250")["id"] == 250
@@ -0,0 +1,80 @@
+"""Отвергнутый или истёкший токен сессии: бот входит заново, а не застревает со старым токеном."""
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.services import session_store
+from app.services.backend_client import BackendClient
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """session_store на отдельной БД в tmp_path, с пустым индексом в памяти."""
+    monkeypatch.setenv("BOT_DB_PATH", str(tmp_path / "bot.sqlite3"))
+    monkeypatch.setenv("SESSION_STORE", "sqlite")
+    monkeypatch.setattr(session_store, "_session_tokens", {})
+    monkeypatch.setattr(session_store, "_token_users", {})
+    monkeypatch.setattr(session_store, "_conn", None)
+    monkeypatch.setattr(session_store, "_loaded", False)
+    return session_store
+
+
+class FakeBackend:
+    """Бекенд, который принимает только выданные им после своего «перезапуска» токены."""
+
+    def __init__(self):
+        self.valid_tokens: set[str] = set()
+        self.logins = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/auth/login":
+            self.logins += 1
+            token = f"fresh-{self.logins}"
+            self.valid_tokens.add(token)
+            return httpx.Response(200, json={"session_token": token, "user": {}})
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in self.valid_tokens:
+            return httpx.Response(401, json={"detail": "Недействительный токен"})
+        return httpx.Response(200, json={"id": 1, "city_id": None, "interests": []})
+
+
+def make_client(backend: FakeBackend) -> BackendClient:
+    client = BackendClient()
+    client._client = httpx.AsyncClient(base_url="http://backend", transport=httpx.MockTransport(backend))
+    return client
+
+
+def test_rejected_token_is_replaced_and_request_retried(store):
+    backend = FakeBackend()
+    client = make_client(backend)
+    store.set_session_token(42, "stale")
+
+    async def scenario():
+        # Несколько параллельных запросов с одним мёртвым токеном — один повторный вход
+        return await asyncio.gather(*[client.get_user_profile("stale") for _ in range(5)])
+
+    profiles = asyncio.run(scenario())
+
+    assert all(profile["id"] == 1 for profile in profiles)
+    assert backend.logins == 1
+    assert store.get_session_token(42) == "fresh-1"
+    assert store.session_user("stale") is None
+
+
+def test_unknown_token_is_not_renewed(store):
+    backend = FakeBackend()
+    client = make_client(backend)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.get_user_profile("not-from-store"))
+    assert backend.logins == 0
+
+
+def test_expired_token_is_dropped(store, monkeypatch):
+    monkeypatch.setenv("SESSION_TOKEN_TTL_DAYS", "-1")
+    store.set_session_token(42, "expired")
+
+    assert store.get_session_token(42) is None
+    assert store.session_user("expired") is None
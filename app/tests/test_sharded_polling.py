@@ -0,0 +1,82 @@
+"""ShardedDispatcher.run_polling против заглушки MAX API: сессия собрана как в aiomax."""
+import asyncio
+
+import pytest
+
+aiomax = pytest.importorskip("aiomax")
+web = pytest.importorskip("aiohttp.web")
+
+from aiohttp.test_utils import TestServer
+
+from app.services.dispatcher import ShardedDispatcher
+
+TOKEN = "stub-token"
+
+
+def make_update(user_id: int, text: str) -> dict:
+    return {
+        "update_type": "message_created",
+        "timestamp": 0,
+        "message": {
+            "sender": {"user_id": user_id, "first_name": "user", "name": "user", "is_bot": False, "last_activity_time": 0},
+            "recipient": {"chat_id": user_id, "chat_type": "dialog"},
+            "body": {"mid": f"{user_id}-{text}", "seq": 0, "text": text},
+            "timestamp": 0,
+        },
+    }
+
+
+class StubMaxApi:
+    """MAX API на aiohttp.web: /me, /updates (одна пачка апдейтов) и учёт заголовков."""
+
+    def __init__(self, updates: list[dict]):
+        self.updates = updates
+        self.authorization: list[str | None] = []
+        self.app = web.Application()
+        self.app.router.add_get("/me", self.me)
+        self.app.router.add_get("/updates", self.get_updates)
+
+    def _check(self, request):
+        self.authorization.append(request.headers.get("Authorization"))
+        if request.headers.get("Authorization") != TOKEN and request.query.get("access_token") != TOKEN:
+            raise web.HTTPUnauthorized()
+
+    async def me(self, request):
+        self._check(request)
+        return web.json_response({
+            "user_id": 1, "first_name": "stub", "name": "stub", "username": "stub_bot",
+            "is_bot": True, "last_activity_time": 0,
+        })
+
+    async def get_updates(self, request):
+        self._check(request)
+        updates, self.updates = self.updates, []
+        if not updates:
+            await asyncio.sleep(0.05)
+        return web.json_response({"updates": updates, "marker": 1})
+
+
+def test_run_polling_talks_to_api_with_bot_session():
+    api = StubMaxApi([make_update(user_id, "hello") for user_id in (1, 2, 3)])
+    received: list[int] = []
+
+    async def scenario():
+        async with TestServer(api.app) as server:
+            bot = aiomax.Bot(TOKEN, api_url=str(server.make_url("/")))
+
+            @bot.on_message()
+            async def on_message(message: aiomax.Message):
+                received.append(message.sender.user_id)
+                if len(received) == 3:
+                    bot.polling = False
+
+            dispatcher = ShardedDispatcher(bot, shards=2)
+            await asyncio.wait_for(dispatcher.run_polling(), timeout=10)
+            return bot
+
+    bot = asyncio.run(scenario())
+
+    assert sorted(received) == [1, 2, 3]
+    assert bot.username == "stub_bot"
+    assert bot.session is None
+    assert set(api.authorization) == {TOKEN}
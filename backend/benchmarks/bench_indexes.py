@@ -0,0 +1,161 @@
+"""Бенчмарк индексов: лента мероприятий и поиск заявок на большом объёме данных
+
+Запуск из каталога backend/ (таблицы в указанной БД пересоздаются):
+BENCH_DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_indexes.py --events 1000000
+
+Скрипт заполняет events/event_tags/applications через generate_series, делает ANALYZE
+и выводит EXPLAIN ANALYZE горячих запросов. Для каждого запроса проверяется, что в плане
+есть Index Scan / Index Only Scan / Bitmap Index Scan по ожидаемому индексу.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+
+
+
+BENCH_DATABASE_URL = os.getenv('BENCH_DATABASE_URL')
+if not BENCH_DATABASE_URL:
+    sys.exit('Укажите BENCH_DATABASE_URL (таблицы в этой БД будут пересозданы)')
+os.environ['DATABASE_URL'] = BENCH_DATABASE_URL
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+from database import engine, create_tables, delete_tables
+import models.admin, models.application, models.auth, models.city  # noqa: F401,E402 — регистрация таблиц
+import models.event, models.fund, models.tag, models.user_profile  # noqa: F401,E402
+
+
+CITIES = 100
+TAGS = 50
+TAGS_PER_EVENT = 3
+APPLICATIONS_PER_EVENT = 2
+USERS = 100000
+
+SEED = [
+    ("cities", "INSERT INTO cities (name) SELECT 'Город ' || i FROM generate_series(1, :cities) AS i"),
+    ("tags", "INSERT INTO tags (name) SELECT 'Тег ' || i FROM generate_series(1, :tags) AS i"),
+    (
+        "events",
+        "INSERT INTO events (title, description, address, contact, what_to_do, date, city_id, created_by, created_at)"
+        " SELECT 'Мероприятие ' || i, 'Описание', 'Адрес', 'Контакт', 'Задачи',"
+        "  now() + (i % 365) * interval '1 day' + (i % 1440) * interval '1 minute',"
+        "  1 + i % :cities, 1 + i % :users, now()"
+        " FROM generate_series(1, :events) AS i"
+    ),
+    (
+        "event_tags",
+        "INSERT INTO event_tags (event_id, tag_id)"
+        " SELECT e, 1 + (e + k * 7) % :tags FROM generate_series(1, :events) AS e, generate_series(0, :tags_per_event - 1) AS k"
+    ),
+    (
+        "applications",
+        "INSERT INTO applications (user_id, event_id, status, applied_at)"
+        " SELECT 1 + (e * 31 + k) % :users, e, CASE WHEN k = 0 THEN 'pending' ELSE 'approved' END, now()"
+        " FROM generate_series(1, :events) AS e, generate_series(0, :applications_per_event - 1) AS k"
+    ),
+    (
+        "user_interests",
+        "INSERT INTO user_interests (user_id, tag_id)"
+        " SELECT u, 1 + (u + k) % :tags FROM generate_series(1, :users) AS u, generate_series(0, 2) AS k"
+    ),
+]
+
+# (название, ожидаемый индекс, запрос) — те же условия, что строят репозитории
+QUERIES = [
+    (
+        "лента: город + порядок (date, id), keyset",
+        "ix_events_city_id_date_id",
+        "SELECT id FROM events WHERE city_id = 7 AND (date, id) > (now(), 0)"
+        " ORDER BY date, id LIMIT 20"
+    ),
+    (
+        "лента: теги страницы",
+        "uq_event_tags_event_id_tag_id",
+        "SELECT event_id, tag_id FROM event_tags WHERE event_id IN (10, 20, 30, 40, 50, 60, 70, 80, 90, 100)"
+    ),
+    (
+        "лента: мероприятия с интересами пользователя",
+        "ix_event_tags_tag_id",
+        "SELECT event_id FROM event_tags WHERE tag_id IN (SELECT tag_id FROM user_interests WHERE user_id = 42)"
+    ),
+    (
+        "интересы пользователя",
+        "uq_user_interests_user_id_tag_id",
+        "SELECT tag_id FROM user_interests WHERE user_id = 42"
+    ),
+    (
+        "мероприятия организатора",
+        "ix_events_created_by",
+        "SELECT id FROM events WHERE created_by = 42 ORDER BY id LIMIT 20"
+    ),
+    (
+        "заявка пользователя на мероприятие",
+        "uq_applications_user_id_event_id",
+        "SELECT id FROM applications WHERE user_id = 1303 AND event_id = 42"
+    ),
+    (
+        "одобренные заявки мероприятия",
+        "ix_applications_event_id_status",
+        "SELECT user_id FROM applications WHERE event_id = 42 AND status = 'approved'"
+    ),
+]
+
+
+async def seed(params: dict):
+    await delete_tables()
+    await create_tables()
+    async with engine.begin() as conn:
+        for table, statement in SEED:
+            started = time.perf_counter()
+            await conn.execute(text(statement), params)
+            print(f'{table}: {time.perf_counter() - started:.1f} с')
+    async with engine.begin() as conn:
+        await conn.execute(text('ANALYZE'))
+
+
+async def explain():
+    failed = []
+    async with engine.connect() as conn:
+        for title, index_name, statement in QUERIES:
+            result = await conn.execute(text('EXPLAIN (ANALYZE, BUFFERS) ' + statement))
+            plan = [row[0] for row in result]
+            uses_index = any('Index' in line and index_name in line for line in plan)
+            print(f'\n=== {title} — {"индекс " + index_name if uses_index else "НЕТ индекса " + index_name}')
+            print('\n'.join(plan))
+            if not uses_index:
+                failed.append(title)
+    return failed
+
+
+async def main(args):
+    params = {
+        'cities': CITIES,
+        'tags': TAGS,
+        'users': USERS,
+        'events': args.events,
+        'tags_per_event': TAGS_PER_EVENT,
+        'applications_per_event': APPLICATIONS_PER_EVENT
+    }
+    try:
+        if not args.skip_seed:
+            await seed(params)
+        failed = await explain()
+    finally:
+        await engine.dispose()
+    
+    if failed:
+        print('\nБез индекса: ' + ', '.join(failed))
+        return 1
+    print('\nВсе запросы используют индексы')
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='EXPLAIN горячих запросов на больших таблицах')
+    parser.add_argument('--events', type=int, default=1000000, help='сколько мероприятий создать')
+    parser.add_argument('--skip-seed', action='store_true', help='не пересоздавать данные')
+    sys.exit(asyncio.run(main(parser.parse_args())))
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""Бенчмарк подсчёта городов и тегов: COUNT(*) в БД и счётчик справочника в памяти
+
+Запуск из каталога backend/ (таблицы в указанной БД пересоздаются):
+BENCH_DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_reference_counts.py --sizes 1000 10000 100000
+
+Для каждого размера заполняются cities и tags, затем замеряется get_total_count
+без справочника (SELECT count(*)) и со справочником (len() словаря, без запросов к БД).
+Время подсчёта из справочника не зависит от размера таблиц.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+
+
+
+BENCH_DATABASE_URL = os.getenv('BENCH_DATABASE_URL')
+if not BENCH_DATABASE_URL:
+    sys.exit('Укажите BENCH_DATABASE_URL (таблицы в этой БД будут пересозданы)')
+os.environ['DATABASE_URL'] = BENCH_DATABASE_URL
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+from database import engine, create_tables, delete_tables
+from repositories.city import CityRepository
+from repositories.tag import TagRepository
+from utils.reference_cache import reference_cache
+import models.city, models.tag  # noqa: F401,E402 — регистрация таблиц
+
+
+async def seed(size: int):
+    await delete_tables()
+    await create_tables()
+    async with engine.begin() as conn:
+        for table, prefix in (('cities', 'Город '), ('tags', 'Тег ')):
+            await conn.execute(
+                text(f"INSERT INTO {table} (name) SELECT :prefix || i FROM generate_series(1, :n) AS i"),
+                {'prefix': prefix, 'n': size}
+            )
+        await conn.execute(text('ANALYZE cities, tags'))
+
+
+async def measure(repeat: int):
+    """Среднее время пары get_total_count (города + теги) в микросекундах"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        cities = await CityRepository.get_total_count()
+        tags = await TagRepository.get_total_count()
+    return (time.perf_counter() - started) / repeat * 1e6, cities, tags
+
+
+async def main(args):
+    print(f'{"строк":>10} {"COUNT(*), мкс":>15} {"справочник, мкс":>17}')
+    try:
+        for size in args.sizes:
+            await seed(size)
+            sql_time, cities, tags = await measure(args.repeat)
+            
+            await reference_cache.start(CityRepository.get_all_city_rows, TagRepository.get_all_tag_rows)
+            try:
+                cache_time, cached_cities, cached_tags = await measure(args.repeat)
+            finally:
+                await reference_cache.stop()
+            
+            assert (cities, tags) == (cached_cities, cached_tags) == (size, size)
+            print(f'{size:>10} {sql_time:>15.1f} {cache_time:>17.3f}')
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Время подсчёта городов и тегов в зависимости от размера таблиц')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='размеры таблиц')
+    parser.add_argument('--repeat', type=int, default=200, help='повторов на замер')
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
@@ -1,15 +1,69 @@
 import os
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 
 
 
 load_dotenv()
 
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+
+
+class PoolWaitStats:
+    """Накопленная статистика ожидания соединения из пула"""
+    
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    
+    def record(self, wait: float):
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+    
+    
+    def as_dict(self):
+        return {
+            "checkouts": self.checkouts,
+            "total_wait_seconds": round(self.total_wait, 6),
+            "avg_wait_seconds": round(self.total_wait / self.checkouts, 6) if self.checkouts else 0.0,
+            "max_wait_seconds": round(self.max_wait, 6)
+        }
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class MeasuredQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который замеряет время получения соединения"""
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.record(time.perf_counter() - started)
+
+
 engine = create_async_engine(
-    os.getenv('DATABASE_URL')
+    os.getenv('DATABASE_URL'),
+    poolclass=MeasuredQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
 )
 
 new_session = async_sessionmaker(engine, expire_on_commit=False)
@@ -18,10 +72,47 @@ class Model(DeclarativeBase):
     pass
 
 
+async def get_session():
+    """FastAPI-зависимость: одна сессия БД на весь запрос"""
+    async with new_session() as session:
+        yield session
+
+
+@asynccontextmanager
+async def session_scope(session: AsyncSession = None):
+    """Использовать переданную сессию запроса или открыть собственную"""
+    if session is not None:
+        yield session
+        return
+    
+    async with new_session() as own_session:
+        yield own_session
+
+
+def get_pool_metrics():
+    """Текущее состояние пула соединений"""
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "wait": pool_wait_stats.as_dict()
+    }
+
+
 async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Model.metadata.create_all)
 
+async def create_indexes():
+    """Досоздать индексы моделей в уже существующих таблицах (create_all не трогает существующие таблицы)"""
+    async with engine.begin() as conn:
+        for table in Model.metadata.sorted_tables:
+            for index in table.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
+
 async def delete_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Model.metadata.drop_all)
\ No newline at end of file
@@ -3,7 +3,7 @@ from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from database import create_tables, delete_tables
+from database import create_tables, create_indexes, delete_tables
 from router.auth import router as auth_router
 from router.city import router as city_router
 from router.tag import router as tag_router
@@ -12,7 +12,16 @@ from router.event import router as event_router
 from router.application import router as application_router
 from router.admin import router as admin_router
 from router.fund import router as fund_router
+from router.internal import router as internal_router
+from router.bot import router as bot_router
 from init_test_data import init_all_test_data
+from repositories.admin import AdminRepository
+from repositories.user import UserProfileRepository
+from repositories.city import CityRepository
+from repositories.tag import TagRepository
+from utils.admin_cache import admin_cache
+from utils.leaderboard import leaderboard, leaderboard_snapshot
+from utils.reference_cache import reference_cache
 
 
 
@@ -22,9 +31,18 @@ async def lifespan(app: FastAPI):
     await delete_tables()
     print('База очищена')
     await create_tables()
+    await create_indexes()
     print('База готова к работе')
     await init_all_test_data()
+    await reference_cache.start(CityRepository.get_all_city_rows, TagRepository.get_all_tag_rows)
+    await admin_cache.start(AdminRepository.get_all_admin_ids)
+    await leaderboard.start(UserProfileRepository.get_leaderboard_rows)
+    await leaderboard_snapshot.start(UserProfileRepository.get_leaderboard_snapshot)
     yield
+    await leaderboard_snapshot.stop()
+    await leaderboard.stop()
+    await admin_cache.stop()
+    await reference_cache.stop()
     print('Выключение')
 
 
@@ -83,6 +101,8 @@ def custom_openapi():
         {"path": "/funds/{fund_id}/delete", "method": "delete", "security": [{"Bearer": []}]},
         {"path": "/funds/donate", "method": "post", "security": [{"Bearer": []}]},
         {"path": "/funds/my-donations", "method": "get", "security": [{"Bearer": []}]},
+        {"path": "/bot/screen/profile", "method": "get", "security": [{"Bearer": []}]},
+        {"path": "/bot/screen/feed", "method": "get", "security": [{"Bearer": []}]},
     ]
     
     for item in secured_paths:
@@ -108,6 +128,8 @@ app.include_router(event_router)
 app.include_router(application_router)
 app.include_router(admin_router)
 app.include_router(fund_router)
+app.include_router(internal_router)
+app.include_router(bot_router)
 
 
 app.add_middleware(
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from database import Model
 
@@ -8,6 +8,10 @@ from database import Model
 
 class ApplicationOrm(Model):
     __tablename__ = "applications"
+    __table_args__ = (
+        Index("uq_applications_user_id_event_id", "user_id", "event_id", unique=True),
+        Index("ix_applications_event_id_status", "event_id", "status"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(nullable=False)
@@ -22,4 +22,4 @@ class UserSessionOrm(Model):
     user_id: Mapped[int] = mapped_column(nullable=False)
     session_token: Mapped[str] = mapped_column(unique=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
\ No newline at end of file
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
\ No newline at end of file
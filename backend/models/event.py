@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from database import Model
 
@@ -8,6 +8,10 @@ from database import Model
 
 class EventOrm(Model):
     __tablename__ = "events"
+    __table_args__ = (
+        # лента: фильтр по городу + порядок (date, id) для keyset-пагинации
+        Index("ix_events_city_id_date_id", "city_id", "date", "id"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(nullable=False)
@@ -17,13 +21,16 @@ class EventOrm(Model):
     what_to_do: Mapped[str] = mapped_column(nullable=False)
     date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     city_id: Mapped[int] = mapped_column(nullable=False)
-    created_by: Mapped[int] = mapped_column(nullable=False)
+    created_by: Mapped[int] = mapped_column(nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now())
 
 
 class EventTagOrm(Model):
     __tablename__ = "event_tags"
+    __table_args__ = (
+        Index("uq_event_tags_event_id_tag_id", "event_id", "tag_id", unique=True),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     event_id: Mapped[int] = mapped_column(nullable=False)
-    tag_id: Mapped[int] = mapped_column(nullable=False)
\ No newline at end of file
+    tag_id: Mapped[int] = mapped_column(nullable=False, index=True)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from database import Model
 
@@ -24,6 +24,9 @@ class FundOrm(Model):
 
 class FundTagOrm(Model):
     __tablename__ = "fund_tags"
+    __table_args__ = (
+        Index("uq_fund_tags_fund_id_tag_id", "fund_id", "tag_id", unique=True),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     fund_id: Mapped[int] = mapped_column(nullable=False)
@@ -34,8 +37,8 @@ class DonationOrm(Model):
     __tablename__ = "donations"
     
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(nullable=False)
-    fund_id: Mapped[int] = mapped_column(nullable=False)
+    user_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    fund_id: Mapped[int] = mapped_column(nullable=False, index=True)
     amount: Mapped[int] = mapped_column(nullable=False)  # сумма доната
     rating_earned: Mapped[int] = mapped_column(nullable=False)  # полученный рейтинг
     donated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now())
\ No newline at end of file
@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from database import Model
 
@@ -6,6 +7,9 @@ from database import Model
 
 class UserProfileOrm(Model):
     __tablename__ = "user_profiles"
+    __table_args__ = (
+        Index("ix_user_profiles_rating_user_id", "rating", "user_id"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(nullable=False, unique=True)
@@ -17,6 +21,9 @@ class UserProfileOrm(Model):
 
 class UserInterestOrm(Model):
     __tablename__ = "user_interests"
+    __table_args__ = (
+        Index("uq_user_interests_user_id_tag_id", "user_id", "tag_id", unique=True),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(nullable=False)
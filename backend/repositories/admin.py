@@ -2,8 +2,9 @@ from database import new_session
 from models.admin import AdminOrm
 from models.auth import UserOrm
 from schemas.admin import SAdminCreate
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func
 from sqlalchemy.exc import IntegrityError
+from utils.admin_cache import admin_cache, ADMIN_NOTIFY_CHANNEL
 
 
 
@@ -12,6 +13,9 @@ class AdminRepository:
     @classmethod
     async def is_user_admin(cls, max_user_id: str):
         """Проверить, является ли пользователь админом по max_user_id"""
+        if admin_cache.loaded:
+            return max_user_id in admin_cache
+        
         async with new_session() as session:
             query = select(AdminOrm).where(AdminOrm.max_user_id == max_user_id)
             result = await session.execute(query)
@@ -25,8 +29,11 @@ class AdminRepository:
             admin = AdminOrm(max_user_id=admin_data.max_user_id)
             session.add(admin)
             try:
+                await session.flush()
+                await session.execute(select(func.pg_notify(ADMIN_NOTIFY_CHANNEL, admin.max_user_id)))
                 await session.commit()
                 await session.refresh(admin)
+                admin_cache.add(admin.max_user_id)
                 return admin
             except IntegrityError:
                 await session.rollback()
@@ -39,10 +46,21 @@ class AdminRepository:
         async with new_session() as session:
             query = delete(AdminOrm).where(AdminOrm.max_user_id == max_user_id)
             result = await session.execute(query)
+            await session.execute(select(func.pg_notify(ADMIN_NOTIFY_CHANNEL, max_user_id)))
             await session.commit()
+            admin_cache.discard(max_user_id)
             return result.rowcount > 0
     
     
+    @classmethod
+    async def get_all_admin_ids(cls):
+        """Получить max_user_id всех администраторов (для кэша ролей)"""
+        async with new_session() as session:
+            query = select(AdminOrm.max_user_id)
+            result = await session.execute(query)
+            return result.scalars().all()
+    
+    
     @classmethod
     async def get_all_admins(cls):
         """Получить всех администраторов"""
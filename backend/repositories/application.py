@@ -1,21 +1,24 @@
-from database import new_session
+from database import session_scope
 from models.application import ApplicationOrm
 from models.event import EventOrm, EventTagOrm
 from models.auth import UserOrm
 from models.user_profile import UserProfileOrm, UserInterestOrm
-from models.tag import TagOrm
+from repositories.tag import TagRepository
 from schemas.application import SApplicationCreate, SApplicationUpdate
 from sqlalchemy import select, delete, update, and_, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.leaderboard import leaderboard
 
 
 
 
 class ApplicationRepository:
     @classmethod
-    async def create_application(cls, application_data: SApplicationCreate, user_id: int):
+    async def create_application(cls, application_data: SApplicationCreate, user_id: int, session: AsyncSession = None):
         """Создать отклик на событие"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             event_query = select(EventOrm).where(EventOrm.id == application_data.event_id)
             event_result = await session.execute(event_query)
             event = event_result.scalars().first()
@@ -41,24 +44,28 @@ class ApplicationRepository:
                 status="pending"
             )
             session.add(application)
-            await session.commit()
-            await session.refresh(application)
-            return application
+            try:
+                await session.commit()
+                await session.refresh(application)
+                return application
+            except IntegrityError:
+                await session.rollback()
+                raise ValueError("Вы уже подали заявку на это событие")
     
     
     @classmethod
-    async def get_application_by_id(cls, application_id: int):
+    async def get_application_by_id(cls, application_id: int, session: AsyncSession = None):
         """Получить отклик по ID"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             query = select(ApplicationOrm).where(ApplicationOrm.id == application_id)
             result = await session.execute(query)
             return result.scalars().first()
     
     
     @classmethod
-    async def get_user_applications(cls, user_id: int, page: int, page_size: int):
+    async def get_user_applications(cls, user_id: int, page: int, page_size: int, session: AsyncSession = None):
         """Получить отклики пользователя с пагинацией"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             base_query = (
                 select(ApplicationOrm, EventOrm.title, EventOrm.date, EventOrm.address, UserOrm.username)
                 .join(EventOrm, ApplicationOrm.event_id == EventOrm.id)
@@ -89,9 +96,9 @@ class ApplicationRepository:
     
     
     @classmethod
-    async def get_event_applications(cls, event_id: int, user_id: int):
+    async def get_event_applications(cls, event_id: int, user_id: int, session: AsyncSession = None):
         """Получить отклики на событие (только для создателя события)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             event_query = select(EventOrm).where(EventOrm.id == event_id)
             event_result = await session.execute(event_query)
             event = event_result.scalars().first()
@@ -110,9 +117,9 @@ class ApplicationRepository:
     
     
     @classmethod
-    async def get_approved_applications_for_event(cls, event_id: int, user_id: int):
+    async def get_approved_applications_for_event(cls, event_id: int, user_id: int, session: AsyncSession = None):
         """Получить подтвержденные отклики на событие (для подтверждения участия)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             event_query = select(EventOrm).where(EventOrm.id == event_id)
             event_result = await session.execute(event_query)
             event = event_result.scalars().first()
@@ -153,9 +160,9 @@ class ApplicationRepository:
     
     
     @classmethod
-    async def confirm_participation(cls, event_id: int, user_ids: list[int], rating_points: int, admin_user_id: int):
+    async def confirm_participation(cls, event_id: int, user_ids: list[int], rating_points: int, admin_user_id: int, session: AsyncSession = None):
         """Подтвердить участие волонтеров в событии"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             event_query = select(EventOrm).where(EventOrm.id == event_id)
             event_result = await session.execute(event_query)
             event = event_result.scalars().first()
@@ -163,49 +170,52 @@ class ApplicationRepository:
             if not event or event.created_by != admin_user_id:
                 raise ValueError("Недостаточно прав для подтверждения участия в этом событии")
             
-            updated_users = []
+            if not user_ids:
+                return []
             
-            for user_id in user_ids:
-                application_query = select(ApplicationOrm).where(
+            # Одним UPDATE переводим все подтверждённые заявки в participated
+            applications_update = (
+                update(ApplicationOrm)
+                .where(
                     and_(
                         ApplicationOrm.event_id == event_id,
-                        ApplicationOrm.user_id == user_id,
+                        ApplicationOrm.user_id.in_(set(user_ids)),
                         ApplicationOrm.status == "approved"
                     )
                 )
-                application_result = await session.execute(application_query)
-                application = application_result.scalars().first()
-                
-                if not application:
-                    continue
-                
-                application.status = "participated"
-                
-                user_profile_query = select(UserProfileOrm).where(UserProfileOrm.user_id == user_id)
-                user_profile_result = await session.execute(user_profile_query)
-                user_profile = user_profile_result.scalars().first()
-                
-                if user_profile:
-                    user_profile.participation_count += 1
-                    user_profile.rating += rating_points
-                else:
-                    user_profile = UserProfileOrm(
-                        user_id=user_id,
-                        participation_count=1,
-                        rating=rating_points
-                    )
-                    session.add(user_profile)
-                
-                updated_users.append(user_id)
+                .values(status="participated")
+                .returning(ApplicationOrm.user_id)
+            )
+            applications_result = await session.execute(applications_update)
+            updated_users = list(applications_result.scalars().all())
+            
+            updated_profiles = []
+            if updated_users:
+                profiles_upsert = insert(UserProfileOrm).values([
+                    {"user_id": user_id, "participation_count": 1, "rating": rating_points}
+                    for user_id in updated_users
+                ])
+                profiles_upsert = profiles_upsert.on_conflict_do_update(
+                    index_elements=[UserProfileOrm.user_id],
+                    set_={
+                        "participation_count": UserProfileOrm.participation_count + 1,
+                        "rating": UserProfileOrm.rating + rating_points
+                    }
+                ).returning(UserProfileOrm.user_id, UserProfileOrm.rating, UserProfileOrm.participation_count)
+                profiles_result = await session.execute(profiles_upsert)
+                updated_profiles = profiles_result.all()
             
             await session.commit()
+            
+            for profile in updated_profiles:
+                leaderboard.update(profile.user_id, profile.rating, profile.participation_count)
             return updated_users
     
     
     @classmethod
-    async def get_application_with_details(cls, application_id: int, current_user_id: int):
+    async def get_application_with_details(cls, application_id: int, current_user_id: int, session: AsyncSession = None):
         """Получить отклик с деталями (для админа)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             application_query = select(ApplicationOrm).where(ApplicationOrm.id == application_id)
             application_result = await session.execute(application_query)
             application = application_result.scalars().first()
@@ -228,23 +238,13 @@ class ApplicationRepository:
             user_profile_result = await session.execute(user_profile_query)
             user_profile = user_profile_result.scalars().first()
             
-            user_interests_query = (
-                select(TagOrm.name)
-                .select_from(UserInterestOrm)
-                .join(TagOrm, UserInterestOrm.tag_id == TagOrm.id)
-                .where(UserInterestOrm.user_id == application.user_id)
-            )
+            user_interests_query = select(UserInterestOrm.tag_id).where(UserInterestOrm.user_id == application.user_id)
             user_interests_result = await session.execute(user_interests_query)
-            user_interests = user_interests_result.scalars().all()
+            user_interests = await TagRepository.get_tag_names(user_interests_result.scalars().all(), session=session)
             
-            event_tags_query = (
-                select(TagOrm.name)
-                .select_from(EventTagOrm)
-                .join(TagOrm, EventTagOrm.tag_id == TagOrm.id)
-                .where(EventTagOrm.event_id == application.event_id)
-            )
+            event_tags_query = select(EventTagOrm.tag_id).where(EventTagOrm.event_id == application.event_id)
             event_tags_result = await session.execute(event_tags_query)
-            event_tags = event_tags_result.scalars().all()
+            event_tags = await TagRepository.get_tag_names(event_tags_result.scalars().all(), session=session)
             
             user_interest_set = set(user_interests)
             event_tag_set = set(event_tags)
@@ -264,10 +264,10 @@ class ApplicationRepository:
     
     
     @classmethod
-    async def update_application(cls, application_id: int, application_data: SApplicationUpdate, current_user_id: int):
+    async def update_application(cls, application_id: int, application_data: SApplicationUpdate, current_user_id: int, session: AsyncSession = None):
         """Обновить отклик (только создатель события)"""
-        async with new_session() as session:
-            application = await cls.get_application_by_id(application_id)
+        async with session_scope(session) as session:
+            application = await cls.get_application_by_id(application_id, session=session)
             if not application:
                 raise ValueError("Отклик не найден")
             
@@ -293,14 +293,14 @@ class ApplicationRepository:
                 await session.execute(stmt)
                 await session.commit()
             
-            return await cls.get_application_by_id(application_id)
+            return await cls.get_application_by_id(application_id, session=session)
     
     
     @classmethod
-    async def delete_application(cls, application_id: int, user_id: int):
+    async def delete_application(cls, application_id: int, user_id: int, session: AsyncSession = None):
         """Удалить отклик (только владелец отклика)"""
-        async with new_session() as session:
-            application = await cls.get_application_by_id(application_id)
+        async with session_scope(session) as session:
+            application = await cls.get_application_by_id(application_id, session=session)
             if not application:
                 raise ValueError("Отклик не найден")
             
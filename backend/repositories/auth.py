@@ -6,6 +6,7 @@ from models.auth import UserOrm, UserSessionOrm
 from schemas.auth import SUserAuth
 from sqlalchemy import select, delete
 from datetime import datetime, timezone, timedelta
+from utils.session_cache import session_cache
 
 
 
@@ -46,16 +47,29 @@ class UserRepository:
     
     @classmethod
     async def get_user_by_session_token(cls, session_token: str):
-        """Получить пользователя по токену сессии"""
+        """Получить пользователя по токену сессии (с кэшированием в памяти процесса)"""
+        cached_user = session_cache.get(session_token)
+        if cached_user is not None:
+            return cached_user
+        
         async with new_session() as session:
-            query = select(UserSessionOrm).where(UserSessionOrm.session_token == session_token)
+            query = (
+                select(UserOrm, UserSessionOrm.expires_at)
+                .join(UserSessionOrm, UserSessionOrm.user_id == UserOrm.id)
+                .where(UserSessionOrm.session_token == session_token)
+            )
             result = await session.execute(query)
-            session_obj = result.scalars().first()
+            row = result.first()
+            
+            if not row:
+                return None
             
-            if not session_obj or session_obj.expires_at < datetime.now(timezone.utc):
+            user, expires_at = row
+            if expires_at < datetime.now(timezone.utc):
                 return None
             
-            return await cls.get_user_by_id(session_obj.user_id)
+            session_cache.set(session_token, user, expires_at)
+            return user
     
     
     @classmethod
@@ -81,4 +95,6 @@ class UserRepository:
         async with new_session() as session:
             query = delete(UserSessionOrm).where(UserSessionOrm.session_token == session_token)
             await session.execute(query)
-            await session.commit()
\ No newline at end of file
+            await session.commit()
+        
+        session_cache.invalidate(session_token)
\ No newline at end of file
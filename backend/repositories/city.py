@@ -1,28 +1,37 @@
-from database import new_session
+from database import session_scope
 from models.city import CityOrm
 from schemas.city import SCityCreate
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.reference_cache import reference_cache
 
 
 
 
 class CityRepository:
     @classmethod
-    async def get_all_cities(cls, page: int, page_size: int):
+    async def get_all_cities(cls, page: int, page_size: int, session: AsyncSession = None):
         """Получить список городов с пагинацией"""
-        async with new_session() as session:
+        if reference_cache.loaded:
+            return reference_cache.cities.page(page, page_size)
+        
+        async with session_scope(session) as session:
             offset = (page - 1) * page_size
-            query = select(CityOrm).offset(offset).limit(page_size)
+            query = select(CityOrm).order_by(CityOrm.id).offset(offset).limit(page_size)
             result = await session.execute(query)
             cities = result.scalars().all()
             return cities
     
     
     @classmethod
-    async def get_city_by_id(cls, city_id: int):
+    async def get_city_by_id(cls, city_id: int, session: AsyncSession = None):
         """Получить город по ID"""
-        async with new_session() as session:
+        if reference_cache.loaded:
+            name = reference_cache.cities.name(city_id)
+            return {"id": city_id, "name": name} if name is not None else None
+        
+        async with session_scope(session) as session:
             query = select(CityOrm).where(CityOrm.id == city_id)
             result = await session.execute(query)
             city = result.scalars().first()
@@ -30,14 +39,23 @@ class CityRepository:
     
     
     @classmethod
-    async def create_city(cls, city_data: SCityCreate):
+    async def get_all_city_rows(cls, session: AsyncSession = None):
+        """Получить пары (id, name) всех городов (для справочника в памяти)"""
+        async with session_scope(session) as session:
+            result = await session.execute(select(CityOrm.id, CityOrm.name))
+            return result.all()
+    
+    
+    @classmethod
+    async def create_city(cls, city_data: SCityCreate, session: AsyncSession = None):
         """Создать новый город"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             city = CityOrm(name=city_data.name)
             session.add(city)
             try:
                 await session.commit()
                 await session.refresh(city)
+                reference_cache.add_city(city.id, city.name)
                 return city
             except IntegrityError:
                 await session.rollback()
@@ -45,9 +63,12 @@ class CityRepository:
     
     
     @classmethod
-    async def get_total_count(cls):
+    async def get_total_count(cls, session: AsyncSession = None):
         """Получить общее количество городов"""
-        async with new_session() as session:
-            query = select(CityOrm)
+        if reference_cache.loaded:
+            return len(reference_cache.cities)
+        
+        async with session_scope(session) as session:
+            query = select(func.count()).select_from(CityOrm)
             result = await session.execute(query)
-            return len(result.scalars().all())
\ No newline at end of file
+            return result.scalar()
\ No newline at end of file
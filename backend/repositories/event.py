@@ -1,20 +1,23 @@
-from database import new_session
+from datetime import datetime
+from database import session_scope
 from models.event import EventOrm, EventTagOrm
 from models.auth import UserOrm
-from models.user_profile import UserProfileOrm
-from models.tag import TagOrm
+from models.user_profile import UserProfileOrm, UserInterestOrm
+from repositories.tag import TagRepository
 from schemas.event import SEventCreate, SEventUpdate, SEventFilter
-from sqlalchemy import select, delete, update, and_, func, distinct, not_
+from sqlalchemy import select, delete, update, and_, or_, func, distinct, not_, tuple_
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.pagination import encode_cursor, decode_cursor
 
 
 
 
 class EventRepository:
     @classmethod
-    async def create_event(cls, event_data: SEventCreate, user_id: int):
+    async def create_event(cls, event_data: SEventCreate, user_id: int, session: AsyncSession = None):
         """Создать новое событие"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             event = EventOrm(
                 title=event_data.title,
                 description=event_data.description,
@@ -28,7 +31,7 @@ class EventRepository:
             session.add(event)
             await session.flush()
             
-            for tag_id in event_data.tag_ids:
+            for tag_id in dict.fromkeys(event_data.tag_ids):
                 event_tag = EventTagOrm(
                     event_id=event.id,
                     tag_id=tag_id
@@ -41,18 +44,18 @@ class EventRepository:
     
     
     @classmethod
-    async def get_event_by_id(cls, event_id: int):
+    async def get_event_by_id(cls, event_id: int, session: AsyncSession = None):
         """Получить событие по ID"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             query = select(EventOrm).where(EventOrm.id == event_id)
             result = await session.execute(query)
             return result.scalars().first()
     
     
     @classmethod
-    async def get_event_with_details(cls, event_id: int):
+    async def get_event_with_details(cls, event_id: int, session: AsyncSession = None):
         """Получить событие с деталями (теги, имя создателя)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             event_query = select(EventOrm).where(EventOrm.id == event_id)
             event_result = await session.execute(event_query)
             event = event_result.scalars().first()
@@ -64,7 +67,7 @@ class EventRepository:
             creator_result = await session.execute(creator_query)
             creator_username = creator_result.scalar()
             
-            tags = await cls.get_event_tags(event_id)
+            tags = await cls.get_event_tags(event_id, session=session)
             
             return {
                 "event": event,
@@ -74,9 +77,9 @@ class EventRepository:
     
     
     @classmethod
-    async def update_event(cls, event_id: int, event_data: SEventUpdate):
+    async def update_event(cls, event_id: int, event_data: SEventUpdate, session: AsyncSession = None):
         """Обновить событие"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             update_data = {}
             if event_data.title is not None:
                 update_data["title"] = event_data.title
@@ -105,7 +108,7 @@ class EventRepository:
                 delete_query = delete(EventTagOrm).where(EventTagOrm.event_id == event_id)
                 await session.execute(delete_query)
                 
-                for tag_id in event_data.tag_ids:
+                for tag_id in dict.fromkeys(event_data.tag_ids):
                     event_tag = EventTagOrm(
                         event_id=event_id,
                         tag_id=tag_id
@@ -113,13 +116,13 @@ class EventRepository:
                     session.add(event_tag)
             
             await session.commit()
-            return await cls.get_event_by_id(event_id)
+            return await cls.get_event_by_id(event_id, session=session)
     
     
     @classmethod
-    async def delete_event(cls, event_id: int):
+    async def delete_event(cls, event_id: int, session: AsyncSession = None):
         """Удалить событие"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             delete_tags_query = delete(EventTagOrm).where(EventTagOrm.event_id == event_id)
             await session.execute(delete_tags_query)
             
@@ -131,38 +134,115 @@ class EventRepository:
     
     
     @classmethod
-    async def get_event_tags(cls, event_id: int):
+    async def get_event_tags(cls, event_id: int, session: AsyncSession = None):
         """Получить теги события"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
+            query = select(EventTagOrm.tag_id).where(EventTagOrm.event_id == event_id)
+            result = await session.execute(query)
+            return await TagRepository.get_tag_names(result.scalars().all(), session=session)
+    
+    
+    @classmethod
+    async def get_tags_for_events(cls, event_ids: list[int], session: AsyncSession = None):
+        """Получить теги сразу для нескольких событий одним запросом"""
+        if not event_ids:
+            return {}
+        
+        async with session_scope(session) as session:
             query = (
-                select(TagOrm.name)
-                .select_from(EventTagOrm)
-                .join(TagOrm, EventTagOrm.tag_id == TagOrm.id)
-                .where(EventTagOrm.event_id == event_id)
+                select(EventTagOrm.event_id, func.array_agg(EventTagOrm.tag_id))
+                .where(EventTagOrm.event_id.in_(event_ids))
+                .group_by(EventTagOrm.event_id)
             )
             result = await session.execute(query)
-            return result.scalars().all()
+            tag_ids_by_event = dict(result.all())
+            
+            tag_names = await TagRepository.get_tag_names_by_id(
+                [tag_id for tag_ids in tag_ids_by_event.values() for tag_id in tag_ids],
+                session=session
+            )
+            return {
+                event_id: [tag_names[tag_id] for tag_id in tag_ids if tag_id in tag_names]
+                for event_id, tag_ids in tag_ids_by_event.items()
+            }
     
     
     @classmethod
-    async def get_events_feed(cls, user_id: int, page: int, page_size: int, event_filter: SEventFilter = None):
-        """Получить ленту событий для пользователя с пагинацией и фильтрацией"""
-        async with new_session() as session:
+    async def get_events_feed(
+        cls,
+        user_id: int,
+        page: int,
+        page_size: int,
+        event_filter: SEventFilter = None,
+        sort: str = None,
+        after: str = None,
+        personalized: bool = False,
+        session: AsyncSession = None
+    ):
+        """Получить ленту событий для пользователя с пагинацией и фильтрацией
+        
+        Без sort/after — классическая пагинация OFFSET/LIMIT (порядок по дате и ID).
+        С sort=match|date или after — keyset-пагинация по курсору, next_cursor указывает на следующую страницу.
+        personalized — только события с тегами из интересов пользователя, по умолчанию sort=match.
+        """
+        cursor = decode_cursor(after) if after else None
+        if cursor:
+            if sort and cursor.get("s") != sort:
+                raise ValueError("Курсор не соответствует режиму сортировки")
+            sort = cursor.get("s")
+        if personalized and sort is None:
+            sort = "match"
+        if sort is not None and sort not in ("match", "date"):
+            raise ValueError("Некорректный режим сортировки")
+        
+        async with session_scope(session) as session:
             user_profile_query = select(UserProfileOrm).where(UserProfileOrm.user_id == user_id)
             user_profile_result = await session.execute(user_profile_query)
             user_profile = user_profile_result.scalars().first()
             
             if not user_profile or not user_profile.city_id:
-                return [], 0
+                return [], 0, None
+            
+            user_tag_ids = select(UserInterestOrm.tag_id).where(UserInterestOrm.user_id == user_id)
+            
+            overlap = None
+            columns = [EventOrm, UserOrm.username]
+            if sort == "match":
+                overlap = (
+                    select(func.count(EventTagOrm.id))
+                    .where(
+                        and_(
+                            EventTagOrm.event_id == EventOrm.id,
+                            EventTagOrm.tag_id.in_(user_tag_ids)
+                        )
+                    )
+                    .correlate(EventOrm)
+                    .scalar_subquery()
+                )
+                columns.append(overlap.label("overlap"))
             
             base_query = (
-                select(EventOrm, UserOrm.username)
+                select(*columns)
+                .select_from(EventOrm)
                 .join(UserOrm, EventOrm.created_by == UserOrm.id)
                 .where(EventOrm.city_id == user_profile.city_id)
             )
             
             count_query = select(func.count()).select_from(EventOrm).where(EventOrm.city_id == user_profile.city_id)
             
+            if personalized:
+                user_tag_ids_result = await session.execute(user_tag_ids)
+                interest_tag_ids = user_tag_ids_result.scalars().all()
+                # Без интересов персонализировать нечего — показываем всю ленту города
+                if interest_tag_ids:
+                    events_with_interests = (
+                        select(EventTagOrm.event_id)
+                        .where(EventTagOrm.tag_id.in_(interest_tag_ids))
+                        .distinct()
+                    )
+                    base_query = base_query.where(EventOrm.id.in_(events_with_interests))
+                    count_query = count_query.where(EventOrm.id.in_(events_with_interests))
+            
             if event_filter:
                 if event_filter.include_tags:
                     events_with_include_tags = (
@@ -185,27 +265,66 @@ class EventRepository:
             total_count_result = await session.execute(count_query)
             total_count = total_count_result.scalar()
             
-            offset = (page - 1) * page_size
-            events_query = base_query.offset(offset).limit(page_size)
+            if sort is None:
+                offset = (page - 1) * page_size
+                events_query = base_query.order_by(EventOrm.date, EventOrm.id).offset(offset).limit(page_size)
+            else:
+                if cursor:
+                    try:
+                        after_date = datetime.fromisoformat(cursor["d"])
+                        after_id = int(cursor["i"])
+                        after_overlap = int(cursor["o"]) if sort == "match" else None
+                    except (KeyError, TypeError, ValueError):
+                        raise ValueError("Некорректный курсор пагинации")
+                    
+                    after_position = tuple_(EventOrm.date, EventOrm.id) > tuple_(after_date, after_id)
+                    if sort == "match":
+                        after_position = or_(
+                            overlap < after_overlap,
+                            and_(overlap == after_overlap, after_position)
+                        )
+                    base_query = base_query.where(after_position)
+                
+                order_by = [EventOrm.date, EventOrm.id]
+                if sort == "match":
+                    order_by.insert(0, overlap.desc())
+                # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+                events_query = base_query.order_by(*order_by).limit(page_size + 1)
+                if not cursor:
+                    events_query = events_query.offset((page - 1) * page_size)
+            
             events_result = await session.execute(events_query)
             events_data = events_result.all()
             
+            next_cursor = None
+            if sort is not None and len(events_data) > page_size:
+                events_data = events_data[:page_size]
+                last_row = events_data[-1]
+                next_cursor = encode_cursor({
+                    "s": sort,
+                    "o": last_row[2] if sort == "match" else None,
+                    "d": last_row[0].date.isoformat(),
+                    "i": last_row[0].id
+                })
+            
+            tags_by_event = await cls.get_tags_for_events([row[0].id for row in events_data], session=session)
+            
             events_with_details = []
-            for event, creator_username in events_data:
-                tags = await cls.get_event_tags(event.id)
+            for row in events_data:
+                event, creator_username = row[0], row[1]
                 events_with_details.append({
                     "event": event,
                     "creator_username": creator_username,
-                    "tags": tags
+                    "tags": tags_by_event.get(event.id, [])
                 })
             
-            return events_with_details, total_count
+            return events_with_details, total_count, next_cursor
     
     
     @classmethod
-    async def get_user_events(cls, user_id: int, page: int, page_size: int):
+    async def get_user_events(cls, user_id: int, page: int, page_size: int, session: AsyncSession = None):
         """Получить события созданные пользователем"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             base_query = (
                 select(EventOrm, UserOrm.username)
                 .join(UserOrm, EventOrm.created_by == UserOrm.id)
@@ -221,22 +340,23 @@ class EventRepository:
             events_result = await session.execute(events_query)
             events_data = events_result.all()
             
+            tags_by_event = await cls.get_tags_for_events([event.id for event, _ in events_data], session=session)
+            
             events_with_details = []
             for event, creator_username in events_data:
-                tags = await cls.get_event_tags(event.id)
                 events_with_details.append({
                     "event": event,
                     "creator_username": creator_username,
-                    "tags": tags
+                    "tags": tags_by_event.get(event.id, [])
                 })
             
             return events_with_details, total_count
     
     
     @classmethod
-    async def is_event_owner(cls, event_id: int, user_id: int):
+    async def is_event_owner(cls, event_id: int, user_id: int, session: AsyncSession = None):
         """Проверить, является ли пользователь создателем события"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             query = select(EventOrm).where(
                 and_(EventOrm.id == event_id, EventOrm.created_by == user_id)
             )
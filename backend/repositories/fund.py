@@ -1,20 +1,23 @@
-from database import new_session
+from database import session_scope
 from models.fund import FundOrm, FundTagOrm, DonationOrm
 from models.auth import UserOrm
 from models.user_profile import UserProfileOrm
-from models.tag import TagOrm
+from repositories.tag import TagRepository
 from schemas.fund import SFundCreate, SFundUpdate, SDonationCreate
-from sqlalchemy import select, delete, update, and_, func
+from sqlalchemy import select, delete, update, and_, func, case
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.leaderboard import leaderboard
 
 
 
 
 class FundRepository:
     @classmethod
-    async def create_fund(cls, fund_data: SFundCreate, user_id: int):
+    async def create_fund(cls, fund_data: SFundCreate, user_id: int, session: AsyncSession = None):
         """Создать новый фонд"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             fund = FundOrm(
                 title=fund_data.title,
                 description=fund_data.description,
@@ -27,7 +30,7 @@ class FundRepository:
             session.add(fund)
             await session.flush()
             
-            for tag_id in fund_data.tag_ids:
+            for tag_id in dict.fromkeys(fund_data.tag_ids):
                 fund_tag = FundTagOrm(
                     fund_id=fund.id,
                     tag_id=tag_id
@@ -40,18 +43,18 @@ class FundRepository:
     
     
     @classmethod
-    async def get_fund_by_id(cls, fund_id: int):
+    async def get_fund_by_id(cls, fund_id: int, session: AsyncSession = None):
         """Получить фонд по ID"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             query = select(FundOrm).where(FundOrm.id == fund_id)
             result = await session.execute(query)
             return result.scalars().first()
     
     
     @classmethod
-    async def get_fund_with_details(cls, fund_id: int):
+    async def get_fund_with_details(cls, fund_id: int, session: AsyncSession = None):
         """Получить фонд с деталями (теги, имя создателя)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             fund_query = select(FundOrm).where(FundOrm.id == fund_id)
             fund_result = await session.execute(fund_query)
             fund = fund_result.scalars().first()
@@ -63,7 +66,7 @@ class FundRepository:
             creator_result = await session.execute(creator_query)
             creator_username = creator_result.scalar()
             
-            tags = await cls.get_fund_tags(fund_id)
+            tags = await cls.get_fund_tags(fund_id, session=session)
             
             return {
                 "fund": fund,
@@ -73,9 +76,9 @@ class FundRepository:
     
     
     @classmethod
-    async def update_fund(cls, fund_id: int, fund_data: SFundUpdate):
+    async def update_fund(cls, fund_id: int, fund_data: SFundUpdate, session: AsyncSession = None):
         """Обновить фонд"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             update_data = {}
             if fund_data.title is not None:
                 update_data["title"] = fund_data.title
@@ -106,7 +109,7 @@ class FundRepository:
                 delete_query = delete(FundTagOrm).where(FundTagOrm.fund_id == fund_id)
                 await session.execute(delete_query)
                 
-                for tag_id in fund_data.tag_ids:
+                for tag_id in dict.fromkeys(fund_data.tag_ids):
                     fund_tag = FundTagOrm(
                         fund_id=fund_id,
                         tag_id=tag_id
@@ -114,13 +117,13 @@ class FundRepository:
                     session.add(fund_tag)
             
             await session.commit()
-            return await cls.get_fund_by_id(fund_id)
+            return await cls.get_fund_by_id(fund_id, session=session)
     
     
     @classmethod
-    async def delete_fund(cls, fund_id: int):
+    async def delete_fund(cls, fund_id: int, session: AsyncSession = None):
         """Удалить фонд"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             delete_tags_query = delete(FundTagOrm).where(FundTagOrm.fund_id == fund_id)
             await session.execute(delete_tags_query)
             
@@ -135,23 +138,43 @@ class FundRepository:
     
     
     @classmethod
-    async def get_fund_tags(cls, fund_id: int):
+    async def get_fund_tags(cls, fund_id: int, session: AsyncSession = None):
         """Получить теги фонда"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
+            query = select(FundTagOrm.tag_id).where(FundTagOrm.fund_id == fund_id)
+            result = await session.execute(query)
+            return await TagRepository.get_tag_names(result.scalars().all(), session=session)
+    
+    
+    @classmethod
+    async def get_tags_for_funds(cls, fund_ids: list[int], session: AsyncSession = None):
+        """Получить теги сразу для нескольких фондов одним запросом"""
+        if not fund_ids:
+            return {}
+        
+        async with session_scope(session) as session:
             query = (
-                select(TagOrm.name)
-                .select_from(FundTagOrm)
-                .join(TagOrm, FundTagOrm.tag_id == TagOrm.id)
-                .where(FundTagOrm.fund_id == fund_id)
+                select(FundTagOrm.fund_id, func.array_agg(FundTagOrm.tag_id))
+                .where(FundTagOrm.fund_id.in_(fund_ids))
+                .group_by(FundTagOrm.fund_id)
             )
             result = await session.execute(query)
-            return result.scalars().all()
+            tag_ids_by_fund = dict(result.all())
+            
+            tag_names = await TagRepository.get_tag_names_by_id(
+                [tag_id for tag_ids in tag_ids_by_fund.values() for tag_id in tag_ids],
+                session=session
+            )
+            return {
+                fund_id: [tag_names[tag_id] for tag_id in tag_ids if tag_id in tag_names]
+                for fund_id, tag_ids in tag_ids_by_fund.items()
+            }
     
     
     @classmethod
-    async def get_active_funds_feed(cls, user_id: int, page: int, page_size: int):
+    async def get_active_funds_feed(cls, user_id: int, page: int, page_size: int, session: AsyncSession = None):
         """Получить ленту активных фондов с пагинацией"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             base_query = (
                 select(FundOrm, UserOrm.username)
                 .join(UserOrm, FundOrm.created_by == UserOrm.id)
@@ -167,22 +190,23 @@ class FundRepository:
             funds_result = await session.execute(funds_query)
             funds_data = funds_result.all()
             
+            tags_by_fund = await cls.get_tags_for_funds([fund.id for fund, _ in funds_data], session=session)
+            
             funds_with_details = []
             for fund, creator_username in funds_data:
-                tags = await cls.get_fund_tags(fund.id)
                 funds_with_details.append({
                     "fund": fund,
                     "creator_username": creator_username,
-                    "tags": tags
+                    "tags": tags_by_fund.get(fund.id, [])
                 })
             
             return funds_with_details, total_count
     
     
     @classmethod
-    async def get_user_funds(cls, user_id: int, page: int, page_size: int):
+    async def get_user_funds(cls, user_id: int, page: int, page_size: int, session: AsyncSession = None):
         """Получить фонды созданные пользователем"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             base_query = (
                 select(FundOrm, UserOrm.username)
                 .join(UserOrm, FundOrm.created_by == UserOrm.id)
@@ -198,22 +222,23 @@ class FundRepository:
             funds_result = await session.execute(funds_query)
             funds_data = funds_result.all()
             
+            tags_by_fund = await cls.get_tags_for_funds([fund.id for fund, _ in funds_data], session=session)
+            
             funds_with_details = []
             for fund, creator_username in funds_data:
-                tags = await cls.get_fund_tags(fund.id)
                 funds_with_details.append({
                     "fund": fund,
                     "creator_username": creator_username,
-                    "tags": tags
+                    "tags": tags_by_fund.get(fund.id, [])
                 })
             
             return funds_with_details, total_count
     
     
     @classmethod
-    async def is_fund_owner(cls, fund_id: int, user_id: int):
+    async def is_fund_owner(cls, fund_id: int, user_id: int, session: AsyncSession = None):
         """Проверить, является ли пользователь создателем фонда"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             query = select(FundOrm).where(
                 and_(FundOrm.id == fund_id, FundOrm.created_by == user_id)
             )
@@ -222,24 +247,46 @@ class FundRepository:
     
     
     @classmethod
-    async def make_donation(cls, donation_data: SDonationCreate, user_id: int):
+    async def make_donation(cls, donation_data: SDonationCreate, user_id: int, session: AsyncSession = None):
         """Сделать донат в фонд"""
-        async with new_session() as session:
-            fund_query = select(FundOrm).where(FundOrm.id == donation_data.fund_id)
-            fund_result = await session.execute(fund_query)
-            fund = fund_result.scalars().first()
-            
-            if not fund:
-                raise ValueError("Фонд не найден")
-            
-            if fund.status != "active":
-                raise ValueError("Фонд закрыт для донатов")
+        async with session_scope(session) as session:
+            new_collected_amount = FundOrm.collected_amount + donation_data.amount
+            # Проверка остатка и начисление в одном условном UPDATE — без гонок между донатами
+            fund_update = (
+                update(FundOrm)
+                .where(
+                    and_(
+                        FundOrm.id == donation_data.fund_id,
+                        FundOrm.status == "active",
+                        new_collected_amount <= FundOrm.target_amount
+                    )
+                )
+                .values(
+                    collected_amount=new_collected_amount,
+                    status=case(
+                        (new_collected_amount >= FundOrm.target_amount, "completed"),
+                        else_=FundOrm.status
+                    )
+                )
+                .returning(FundOrm.rating_per_100)
+                .execution_options(synchronize_session=False)
+            )
+            fund_update_result = await session.execute(fund_update)
+            rating_per_100 = fund_update_result.scalar()
             
-            remaining_amount = fund.target_amount - fund.collected_amount
-            if donation_data.amount > remaining_amount:
+            if rating_per_100 is None:
+                fund = await cls.get_fund_by_id(donation_data.fund_id, session=session)
+                
+                if not fund:
+                    raise ValueError("Фонд не найден")
+                
+                if fund.status != "active":
+                    raise ValueError("Фонд закрыт для донатов")
+                
+                remaining_amount = fund.target_amount - fund.collected_amount
                 raise ValueError(f"Сумма доната превышает оставшуюся сумму для сбора. Максимум: {remaining_amount} руб.")
             
-            rating_earned = (donation_data.amount // 100) * fund.rating_per_100
+            rating_earned = (donation_data.amount // 100) * rating_per_100
             
             donation = DonationOrm(
                 user_id=user_id,
@@ -249,34 +296,28 @@ class FundRepository:
             )
             session.add(donation)
             
-            fund.collected_amount += donation_data.amount
-            
-            if fund.collected_amount >= fund.target_amount:
-                fund.status = "completed"
-            
-            user_profile_query = select(UserProfileOrm).where(UserProfileOrm.user_id == user_id)
-            user_profile_result = await session.execute(user_profile_query)
-            user_profile = user_profile_result.scalars().first()
-            
-            if user_profile:
-                user_profile.rating += rating_earned
-            else:
-                user_profile = UserProfileOrm(
-                    user_id=user_id,
-                    rating=rating_earned,
-                    participation_count=0
+            profile_upsert = (
+                insert(UserProfileOrm)
+                .values(user_id=user_id, rating=rating_earned, participation_count=0)
+                .on_conflict_do_update(
+                    index_elements=[UserProfileOrm.user_id],
+                    set_={"rating": UserProfileOrm.rating + rating_earned}
                 )
-                session.add(user_profile)
+                .returning(UserProfileOrm.rating, UserProfileOrm.participation_count)
+            )
+            profile_result = await session.execute(profile_upsert)
+            profile = profile_result.first()
             
             await session.commit()
+            leaderboard.update(user_id, profile.rating, profile.participation_count)
             await session.refresh(donation)
             return donation
     
     
     @classmethod
-    async def get_user_donations(cls, user_id: int, page: int, page_size: int):
+    async def get_user_donations(cls, user_id: int, page: int, page_size: int, session: AsyncSession = None):
         """Получить донаты пользователя с пагинацией"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             base_query = (
                 select(DonationOrm, FundOrm.title, FundOrm.status)
                 .join(FundOrm, DonationOrm.fund_id == FundOrm.id)
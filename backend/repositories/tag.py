@@ -1,28 +1,37 @@
-from database import new_session
+from database import session_scope
 from models.tag import TagOrm
 from schemas.tag import STagCreate
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.reference_cache import reference_cache
 
 
 
 
 class TagRepository:
     @classmethod
-    async def get_all_tags(cls, page: int, page_size: int):
+    async def get_all_tags(cls, page: int, page_size: int, session: AsyncSession = None):
         """Получить список тегов с пагинацией"""
-        async with new_session() as session:
+        if reference_cache.loaded:
+            return reference_cache.tags.page(page, page_size)
+        
+        async with session_scope(session) as session:
             offset = (page - 1) * page_size
-            query = select(TagOrm).offset(offset).limit(page_size)
+            query = select(TagOrm).order_by(TagOrm.id).offset(offset).limit(page_size)
             result = await session.execute(query)
             tags = result.scalars().all()
             return tags
     
     
     @classmethod
-    async def get_tag_by_id(cls, tag_id: int):
+    async def get_tag_by_id(cls, tag_id: int, session: AsyncSession = None):
         """Получить тег по ID"""
-        async with new_session() as session:
+        if reference_cache.loaded:
+            name = reference_cache.tags.name(tag_id)
+            return {"id": tag_id, "name": name} if name is not None else None
+        
+        async with session_scope(session) as session:
             query = select(TagOrm).where(TagOrm.id == tag_id)
             result = await session.execute(query)
             tag = result.scalars().first()
@@ -30,14 +39,23 @@ class TagRepository:
     
     
     @classmethod
-    async def create_tag(cls, tag_data: STagCreate):
+    async def get_all_tag_rows(cls, session: AsyncSession = None):
+        """Получить пары (id, name) всех тегов (для справочника в памяти)"""
+        async with session_scope(session) as session:
+            result = await session.execute(select(TagOrm.id, TagOrm.name))
+            return result.all()
+    
+    
+    @classmethod
+    async def create_tag(cls, tag_data: STagCreate, session: AsyncSession = None):
         """Создать новый тег"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             tag = TagOrm(name=tag_data.name)
             session.add(tag)
             try:
                 await session.commit()
                 await session.refresh(tag)
+                reference_cache.add_tag(tag.id, tag.name)
                 return tag
             except IntegrityError:
                 await session.rollback()
@@ -45,9 +63,37 @@ class TagRepository:
     
     
     @classmethod
-    async def get_total_count(cls):
+    async def get_total_count(cls, session: AsyncSession = None):
         """Получить общее количество тегов"""
-        async with new_session() as session:
-            query = select(TagOrm)
+        if reference_cache.loaded:
+            return len(reference_cache.tags)
+        
+        async with session_scope(session) as session:
+            query = select(func.count()).select_from(TagOrm)
             result = await session.execute(query)
-            return len(result.scalars().all())
\ No newline at end of file
+            return result.scalar()
+    
+    
+    @classmethod
+    async def get_tag_names_by_id(cls, tag_ids, session: AsyncSession = None):
+        """Получить словарь ID тега → название (из справочника в памяти, если он загружен)"""
+        tag_ids = set(tag_ids)
+        if not tag_ids:
+            return {}
+        if reference_cache.loaded:
+            return reference_cache.tags.names_by_id(tag_ids)
+        
+        async with session_scope(session) as session:
+            result = await session.execute(select(TagOrm.id, TagOrm.name).where(TagOrm.id.in_(tag_ids)))
+            return dict(result.all())
+    
+    
+    @classmethod
+    async def get_tag_names(cls, tag_ids, session: AsyncSession = None):
+        """Получить названия тегов по списку ID (в порядке переданных ID)"""
+        tag_ids = list(tag_ids)
+        if reference_cache.loaded:
+            return reference_cache.tags.names(tag_ids)
+        
+        names_by_id = await cls.get_tag_names_by_id(tag_ids, session=session)
+        return [names_by_id[tag_id] for tag_id in tag_ids if tag_id in names_by_id]
\ No newline at end of file
@@ -1,29 +1,49 @@
-from database import new_session
+from database import session_scope
 from models.user_profile import UserProfileOrm, UserInterestOrm
 from models.auth import UserOrm
-from models.tag import TagOrm
+from repositories.tag import TagRepository
 from schemas.user import SUserProfileCreate, SUserProfileUpdate, SUserProfileFullUpdate, SUserInterestCreate
-from sqlalchemy import select, delete, update, func, and_
+from sqlalchemy import select, delete, update, func, and_, or_
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.leaderboard import leaderboard
 
 
 
 
 class UserProfileRepository:
     @classmethod
-    async def get_profile_by_user_id(cls, user_id: int):
+    async def get_profile_by_user_id(cls, user_id: int, session: AsyncSession = None):
         """Получить профиль пользователя по user_id"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             query = select(UserProfileOrm).where(UserProfileOrm.user_id == user_id)
             result = await session.execute(query)
             return result.scalars().first()
     
     
     @classmethod
-    async def create_or_update_profile(cls, profile_data: SUserProfileCreate):
+    async def get_or_create_profile(cls, user_id: int, session: AsyncSession = None):
+        """Получить профиль пользователя, создав пустой при первом обращении"""
+        async with session_scope(session) as session:
+            profile = await cls.get_profile_by_user_id(user_id, session=session)
+            if profile:
+                return profile
+            
+            profile_data = SUserProfileCreate(
+                user_id=user_id,
+                city_id=None,
+                about_me=None,
+                rating=0,
+                participation_count=0
+            )
+            return await cls.create_or_update_profile(profile_data, session=session)
+    
+    
+    @classmethod
+    async def create_or_update_profile(cls, profile_data: SUserProfileCreate, session: AsyncSession = None):
         """Создать или обновить профиль пользователя"""
-        async with new_session() as session:
-            existing_profile = await cls.get_profile_by_user_id(profile_data.user_id)
+        async with session_scope(session) as session:
+            existing_profile = await cls.get_profile_by_user_id(profile_data.user_id, session=session)
             
             if existing_profile:
                 stmt = (
@@ -49,14 +69,15 @@ class UserProfileRepository:
             
             if not existing_profile:
                 await session.refresh(profile)
+                leaderboard.update(profile.user_id, profile.rating, profile.participation_count)
                 return profile
-            return await cls.get_profile_by_user_id(profile_data.user_id)
+            return await cls.get_profile_by_user_id(profile_data.user_id, session=session)
     
     
     @classmethod
-    async def update_profile(cls, user_id: int, profile_data: SUserProfileUpdate):
+    async def update_profile(cls, user_id: int, profile_data: SUserProfileUpdate, session: AsyncSession = None):
         """Обновить профиль пользователя (только разрешенные поля)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             update_data = {}
             if profile_data.city_id is not None:
                 update_data["city_id"] = profile_data.city_id
@@ -69,22 +90,32 @@ class UserProfileRepository:
                     .where(UserProfileOrm.user_id == user_id)
                     .values(**update_data)
                 )
-                await session.execute(stmt)
+                result = await session.execute(stmt)
+                if result.rowcount == 0:
+                    # Профиля ещё нет (первое обновление) — создаём его сразу с новыми значениями
+                    profile_data = SUserProfileCreate(
+                        user_id=user_id,
+                        city_id=profile_data.city_id,
+                        about_me=profile_data.about_me,
+                        rating=0,
+                        participation_count=0
+                    )
+                    return await cls.create_or_update_profile(profile_data, session=session)
                 await session.commit()
             
-            return await cls.get_profile_by_user_id(user_id)
+            return await cls.get_profile_by_user_id(user_id, session=session)
     
     
     @classmethod
-    async def partial_update_profile(cls, user_id: int, profile_data: SUserProfileUpdate):
+    async def partial_update_profile(cls, user_id: int, profile_data: SUserProfileUpdate, session: AsyncSession = None):
         """Частичное обновление профиля пользователя"""
-        return await cls.update_profile(user_id, profile_data)
+        return await cls.update_profile(user_id, profile_data, session=session)
     
     
     @classmethod
-    async def full_update_profile(cls, user_id: int, profile_data: SUserProfileFullUpdate):
+    async def full_update_profile(cls, user_id: int, profile_data: SUserProfileFullUpdate, session: AsyncSession = None):
         """Полное обновление профиля пользователя (все поля)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             update_data = {}
             
             if profile_data.city_id is not None:
@@ -105,17 +136,20 @@ class UserProfileRepository:
                 await session.execute(stmt)
                 await session.commit()
             
-            return await cls.get_profile_by_user_id(user_id)
+            profile = await cls.get_profile_by_user_id(user_id, session=session)
+            if profile:
+                leaderboard.update(profile.user_id, profile.rating, profile.participation_count)
+            return profile
     
     
     @classmethod
-    async def update_user_interests(cls, user_id: int, interest_data: SUserInterestCreate):
+    async def update_user_interests(cls, user_id: int, interest_data: SUserInterestCreate, session: AsyncSession = None):
         """Обновить интересы пользователя"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             delete_query = delete(UserInterestOrm).where(UserInterestOrm.user_id == user_id)
             await session.execute(delete_query)
             
-            for tag_id in interest_data.tag_ids:
+            for tag_id in dict.fromkeys(interest_data.tag_ids):
                 interest = UserInterestOrm(user_id=user_id, tag_id=tag_id)
                 session.add(interest)
             
@@ -123,39 +157,69 @@ class UserProfileRepository:
     
     
     @classmethod
-    async def get_user_interests(cls, user_id: int):
+    async def get_user_interests(cls, user_id: int, session: AsyncSession = None):
         """Получить интересы пользователя"""
-        async with new_session() as session:
-            query = (
-                select(TagOrm.name)
-                .select_from(UserInterestOrm)
-                .join(TagOrm, UserInterestOrm.tag_id == TagOrm.id)
-                .where(UserInterestOrm.user_id == user_id)
-            )
+        async with session_scope(session) as session:
+            query = select(UserInterestOrm.tag_id).where(UserInterestOrm.user_id == user_id)
             result = await session.execute(query)
-            return result.scalars().all()
+            return await TagRepository.get_tag_names(result.scalars().all(), session=session)
     
     
     @classmethod
-    async def get_profile_with_interests(cls, user_id: int):
+    async def get_profile_with_interests(cls, user_id: int, session: AsyncSession = None):
         """Получить профиль пользователя с интересами"""
-        profile = await cls.get_profile_by_user_id(user_id)
-        interests = await cls.get_user_interests(user_id)
+        profile = await cls.get_profile_by_user_id(user_id, session=session)
+        interests = await cls.get_user_interests(user_id, session=session)
         
         return profile, interests
     
     
     @classmethod
-    async def get_leaderboard(cls, top_n: int, current_user_id: int = None):
+    async def get_leaderboard_rows(cls, session: AsyncSession = None):
+        """Получить рейтинг и число участий всех пользователей (для сборки лидерборда в памяти)"""
+        async with session_scope(session) as session:
+            query = (
+                select(UserProfileOrm.user_id, UserProfileOrm.rating, UserProfileOrm.participation_count)
+                .join(UserOrm, UserProfileOrm.user_id == UserOrm.id)
+            )
+            result = await session.execute(query)
+            return result.all()
+    
+    
+    @classmethod
+    async def get_leaderboard(cls, top_n: int, current_user_id: int = None, session: AsyncSession = None):
         """Получить лидерборд пользователей"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
+            if leaderboard.loaded:
+                top_users = leaderboard.top(top_n)
+                current_user_position = leaderboard.get(current_user_id) if current_user_id else None
+                
+                user_ids = {user["user_id"] for user in top_users}
+                if current_user_position:
+                    user_ids.add(current_user_id)
+                
+                usernames = {}
+                if user_ids:
+                    usernames_query = select(UserOrm.id, UserOrm.username).where(UserOrm.id.in_(user_ids))
+                    usernames_result = await session.execute(usernames_query)
+                    usernames = dict(usernames_result.all())
+                
+                for user in top_users:
+                    user["username"] = usernames.get(user["user_id"])
+                if current_user_position:
+                    current_user_position["username"] = usernames.get(current_user_id)
+                
+                return top_users, current_user_position
+            
             subquery = (
                 select(
                     UserOrm.id.label("user_id"),
                     UserOrm.username,
                     UserProfileOrm.rating,
                     UserProfileOrm.participation_count,
-                    func.row_number().over(order_by=UserProfileOrm.rating.desc()).label("position")
+                    func.row_number().over(
+                        order_by=(UserProfileOrm.rating.desc(), UserProfileOrm.user_id)
+                    ).label("position")
                 )
                 .select_from(UserProfileOrm)
                 .join(UserOrm, UserProfileOrm.user_id == UserOrm.id)
@@ -164,12 +228,12 @@ class UserProfileRepository:
             
             top_users_query = (
                 select(subquery)
-                .order_by(subquery.c.rating.desc())
+                .order_by(subquery.c.position)
                 .limit(top_n)
             )
             
             result = await session.execute(top_users_query)
-            top_users = result.mappings().all()
+            top_users = [dict(user) for user in result.mappings().all()]
             
             current_user_position = None
             if current_user_id:
@@ -181,38 +245,81 @@ class UserProfileRepository:
                 current_user_data = result.mappings().first()
                 
                 if current_user_data:
-                    current_user_position = {
-                        "user_id": current_user_data.user_id,
-                        "username": current_user_data.username,
-                        "rating": current_user_data.rating,
-                        "participation_count": current_user_data.participation_count,
-                        "position": current_user_data.position
-                    }
+                    current_user_position = dict(current_user_data)
             
             return top_users, current_user_position
     
     
     @classmethod
-    async def update_rating(cls, user_id: int, rating_change: int):
+    async def get_leaderboard_snapshot(cls, size: int, session: AsyncSession = None):
+        """Собрать топ лидерборда для снимка в памяти"""
+        top_users, _ = await cls.get_leaderboard(size, session=session)
+        return top_users
+    
+    
+    @classmethod
+    async def get_leaderboard_position(cls, user_id: int, session: AsyncSession = None):
+        """Получить позицию пользователя в лидерборде (без имени пользователя)"""
+        if leaderboard.loaded:
+            return leaderboard.get(user_id)
+        
+        async with session_scope(session) as session:
+            profile = await cls.get_profile_by_user_id(user_id, session=session)
+            if not profile:
+                return None
+            
+            # Порядок тот же, что у лидерборда: рейтинг по убыванию, затем user_id
+            position_query = (
+                select(func.count())
+                .select_from(UserProfileOrm)
+                .where(
+                    or_(
+                        UserProfileOrm.rating > profile.rating,
+                        and_(UserProfileOrm.rating == profile.rating, UserProfileOrm.user_id < user_id)
+                    )
+                )
+            )
+            position_result = await session.execute(position_query)
+            
+            return {
+                "user_id": user_id,
+                "rating": profile.rating,
+                "participation_count": profile.participation_count,
+                "position": position_result.scalar() + 1
+            }
+    
+    
+    @classmethod
+    async def update_rating(cls, user_id: int, rating_change: int, session: AsyncSession = None):
         """Обновить рейтинг пользователя (внутренний метод)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             stmt = (
                 update(UserProfileOrm)
                 .where(UserProfileOrm.user_id == user_id)
                 .values(rating=UserProfileOrm.rating + rating_change)
+                .returning(UserProfileOrm.rating, UserProfileOrm.participation_count)
             )
-            await session.execute(stmt)
+            result = await session.execute(stmt)
+            updated = result.first()
             await session.commit()
+            
+            if updated:
+                leaderboard.update(user_id, updated.rating, updated.participation_count)
     
     
     @classmethod
-    async def increment_participation_count(cls, user_id: int):
+    async def increment_participation_count(cls, user_id: int, session: AsyncSession = None):
         """Увеличить счетчик участий пользователя (внутренний метод)"""
-        async with new_session() as session:
+        async with session_scope(session) as session:
             stmt = (
                 update(UserProfileOrm)
                 .where(UserProfileOrm.user_id == user_id)
                 .values(participation_count=UserProfileOrm.participation_count + 1)
+                .returning(UserProfileOrm.rating, UserProfileOrm.participation_count)
             )
-            await session.execute(stmt)
-            await session.commit()
\ No newline at end of file
+            result = await session.execute(stmt)
+            updated = result.first()
+            await session.commit()
+            
+            if updated:
+                leaderboard.update(user_id, updated.rating, updated.participation_count)
\ No newline at end of file
@@ -1,4 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_session
 from repositories.admin import AdminRepository
 from repositories.admin_application import AdminApplicationRepository
 from repositories.event import EventRepository
@@ -39,12 +41,14 @@ async def get_applications_statistics(current_admin: UserOrm = Depends(get_curre
 async def get_admin_events(
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
-    current_admin: UserOrm = Depends(get_current_admin)
+    current_admin: UserOrm = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить события администратора"""
     try:
         events_with_details, total_count = await EventRepository.get_user_events(
-            current_admin.id, page, page_size
+            current_admin.id, page, page_size,
+            session=session
         )
         
         events_with_tags = []
@@ -81,11 +85,12 @@ async def get_admin_events(
 @router.get("/events/{event_id}/approved-volunteers")
 async def get_approved_volunteers(
     event_id: int,
-    current_admin: UserOrm = Depends(get_current_admin)
+    current_admin: UserOrm = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить список подтвержденных волонтеров для события"""
     try:
-        approved_applications = await ApplicationRepository.get_approved_applications_for_event(event_id, current_admin.id)
+        approved_applications = await ApplicationRepository.get_approved_applications_for_event(event_id, current_admin.id, session=session)
         
         volunteers = []
         for app_data in approved_applications:
@@ -113,7 +118,8 @@ async def get_approved_volunteers(
 async def confirm_participation(
     event_id: int,
     participation_data: SParticipationConfirm,
-    current_admin: UserOrm = Depends(get_current_admin)
+    current_admin: UserOrm = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
 ):
     """Подтвердить участие волонтеров в событии и начислить рейтинг"""
     try:
@@ -124,7 +130,8 @@ async def confirm_participation(
             event_id, 
             participation_data.user_ids, 
             participation_data.rating_points,
-            current_admin.id
+            current_admin.id,
+            session=session
         )
         
         return {
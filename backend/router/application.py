@@ -1,4 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_session
 from repositories.application import ApplicationRepository
 from schemas.application import SApplicationCreate, SApplicationUpdate, SApplication, SApplicationWithEvent, SApplicationWithUser, SApplicationListResponse
 from models.auth import UserOrm
@@ -16,11 +18,12 @@ router = APIRouter(
 @router.post("/create", response_model=SApplication)
 async def create_application(
     application_data: SApplicationCreate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Создать отклик на событие"""
     try:
-        application = await ApplicationRepository.create_application(application_data, current_user.id)
+        application = await ApplicationRepository.create_application(application_data, current_user.id, session=session)
         return application
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -32,11 +35,12 @@ async def create_application(
 async def get_my_applications(
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить мои отклики"""
     try:
-        applications_with_details, total_count = await ApplicationRepository.get_user_applications(current_user.id, page, page_size)
+        applications_with_details, total_count = await ApplicationRepository.get_user_applications(current_user.id, page, page_size, session=session)
         
         applications = []
         for app_data in applications_with_details:
@@ -70,15 +74,16 @@ async def get_my_applications(
 @router.get("/event/{event_id}", response_model=list[SApplicationWithUser])
 async def get_event_applications(
     event_id: int,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить отклики на событие (только для создателя события)"""
     try:
-        applications = await ApplicationRepository.get_event_applications(event_id, current_user.id)
+        applications = await ApplicationRepository.get_event_applications(event_id, current_user.id, session=session)
         
         applications_with_user = []
         for application in applications:
-            application_details = await ApplicationRepository.get_application_with_details(application.id, current_user.id)
+            application_details = await ApplicationRepository.get_application_with_details(application.id, current_user.id, session=session)
             if application_details:
                 application_response = SApplicationWithUser(
                     id=application_details["application"].id,
@@ -107,11 +112,12 @@ async def get_event_applications(
 @router.get("/{application_id}", response_model=SApplicationWithUser)
 async def get_application_details(
     application_id: int,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить подробную информацию об отклике (только для создателя события)"""
     try:
-        application_details = await ApplicationRepository.get_application_with_details(application_id, current_user.id)
+        application_details = await ApplicationRepository.get_application_with_details(application_id, current_user.id, session=session)
         if not application_details:
             raise HTTPException(status_code=404, detail="Отклик не найден")
         
@@ -144,7 +150,8 @@ async def get_application_details(
 async def update_application(
     application_id: int,
     application_data: SApplicationUpdate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Обновить отклик (только создатель события) \n
     Возможные статусы откликов:
@@ -154,7 +161,7 @@ async def update_application(
     - participated (принял участие | после ивента админ подтверждает что волонтер принял участие)
     """
     try:
-        application = await ApplicationRepository.update_application(application_id, application_data, current_user.id)
+        application = await ApplicationRepository.update_application(application_id, application_data, current_user.id, session=session)
         return application
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -165,11 +172,12 @@ async def update_application(
 @router.delete("/{application_id}/delete")
 async def delete_application(
     application_id: int,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Удалить отклик (только владелец отклика)"""
     try:
-        success = await ApplicationRepository.delete_application(application_id, current_user.id)
+        success = await ApplicationRepository.delete_application(application_id, current_user.id, session=session)
         if not success:
             raise HTTPException(status_code=404, detail="Отклик не найден")
         
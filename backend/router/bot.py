@@ -0,0 +1,74 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query
+from repositories.user import UserProfileRepository
+from repositories.event import EventRepository
+from repositories.city import CityRepository
+from schemas.bot import SBotProfileScreen, SBotFeedScreen
+from schemas.user import SUserProfile, SUserProfileWithInterests
+from models.auth import UserOrm
+from utils.security import get_current_user
+from utils.event_feed import build_events_feed_response
+
+
+
+
+router = APIRouter(
+    prefix="/bot",
+    tags=["Экраны бота"]
+)
+
+
+@router.get("/screen/profile", response_model=SBotProfileScreen)
+async def get_profile_screen(current_user: UserOrm = Depends(get_current_user)):
+    """Всё для экрана профиля в боте одним ответом: профиль, интересы и город"""
+    try:
+        # Независимые запросы идут параллельно, каждый в своей сессии
+        profile, interests = await asyncio.gather(
+            UserProfileRepository.get_or_create_profile(current_user.id),
+            UserProfileRepository.get_user_interests(current_user.id)
+        )
+        city = await CityRepository.get_city_by_id(profile.city_id) if profile.city_id is not None else None
+        
+        profile_dict = SUserProfile.model_validate(profile).model_dump()
+        profile_dict["interests"] = interests
+        
+        return SBotProfileScreen(
+            profile=SUserProfileWithInterests(**profile_dict),
+            city=city
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Ошибка при получении экрана профиля")
+
+
+@router.get("/screen/feed", response_model=SBotFeedScreen)
+async def get_feed_screen(
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    page_size: int = Query(5, ge=1, le=100, description="Размер страницы"),
+    after: str = Query(None, description="Курсор страницы (next_cursor из предыдущего ответа)"),
+    current_user: UserOrm = Depends(get_current_user)
+):
+    """Всё для экрана ленты в боте одним ответом: персональная лента, город и интересы
+    
+    С after лента листается по курсору, page нужен только для подписи «страница N из M».
+    """
+    try:
+        (events_with_details, total_count, next_cursor), profile, interests = await asyncio.gather(
+            EventRepository.get_events_feed(current_user.id, page, page_size, after=after, personalized=True),
+            UserProfileRepository.get_profile_by_user_id(current_user.id),
+            UserProfileRepository.get_user_interests(current_user.id)
+        )
+        city = None
+        if profile and profile.city_id is not None:
+            city = await CityRepository.get_city_by_id(profile.city_id)
+        
+        return SBotFeedScreen(
+            city=city,
+            interests=interests,
+            feed=build_events_feed_response(
+                events_with_details, total_count, page, page_size, next_cursor, interests
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Ошибка при получении экрана ленты")
\ No newline at end of file
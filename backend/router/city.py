@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Header, Response
 from repositories.city import CityRepository
 from schemas.city import SCity, SCityCreate
+from utils.etag import make_etag, etag_matches
+from utils.reference_cache import REFERENCE_CACHE_MAX_AGE
 
 
 
@@ -13,12 +16,20 @@ router = APIRouter(
 
 @router.get("", response_model=list[SCity])
 async def get_cities(
+    response: Response,
     page: int = Query(1, ge=1, description="Номер страницы"),
-    page_size: int = Query(20, ge=1, le=100, description="Размер страницы")
+    page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Получить список городов с пагинацией"""
     try:
-        cities = await CityRepository.get_all_cities(page, page_size)
+        cities = [SCity.model_validate(city) for city in await CityRepository.get_all_cities(page, page_size)]
+        
+        cache_headers = {"ETag": make_etag(cities), "Cache-Control": f"public, max-age={REFERENCE_CACHE_MAX_AGE}"}
+        if etag_matches(if_none_match, cache_headers["ETag"]):
+            return Response(status_code=304, headers=cache_headers)
+        
+        response.headers.update(cache_headers)
         return cities
     except Exception as e:
         raise HTTPException(status_code=500, detail="Ошибка при получении списка городов")
@@ -1,4 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_session
 from repositories.event import EventRepository
 from repositories.user import UserProfileRepository
 from schemas.event import (
@@ -8,6 +10,7 @@ from schemas.event import (
 from models.auth import UserOrm
 from utils.security import get_current_user
 from utils.matching import calculate_tag_match_percentage
+from utils.event_feed import build_events_feed_response
 
 
 
@@ -21,13 +24,14 @@ router = APIRouter(
 @router.post("/create", response_model=SEventWithTags)
 async def create_event(
     event_data: SEventCreate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Создать новое событие"""
     try:
-        event = await EventRepository.create_event(event_data, current_user.id)
+        event = await EventRepository.create_event(event_data, current_user.id, session=session)
         
-        event_details = await EventRepository.get_event_with_details(event.id)
+        event_details = await EventRepository.get_event_with_details(event.id, session=session)
         if not event_details:
             raise HTTPException(status_code=404, detail="Событие не найдено")
         
@@ -57,7 +61,11 @@ async def get_events_feed(
     page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
     include_tags: str = Query(None, description="ID тегов для включения (через запятую)"),
     exclude_tags: str = Query(None, description="ID тегов для исключения (через запятую)"),
-    current_user: UserOrm = Depends(get_current_user)
+    sort: str = Query(None, pattern="^(match|date)$", description="Сортировка: match (по совпадению интересов) или date"),
+    after: str = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    personalized: bool = Query(False, description="Только события по интересам пользователя, по убыванию совпадения"),
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить ленту событий с пагинацией, процентом совпадения и фильтрацией
     
@@ -65,10 +73,21 @@ async def get_events_feed(
     - include_tags: показывать события, которые имеют ХОТЯ БЫ ОДИН из указанных тегов
     - exclude_tags: НЕ показывать события, которые имеют ХОТЯ БЫ ОДИН из указанных тегов
     
+    Сортировка и keyset-пагинация:
+    - sort=match: сначала события с наибольшим числом совпавших интересов, затем по дате и ID
+    - sort=date: по дате и ID
+    - after: курсор из next_cursor предыдущей страницы (page при этом не используется)
+    
+    Персонализация:
+    - personalized=true: события хотя бы с одним тегом из интересов пользователя
+      (без интересов — вся лента города), по умолчанию sort=match
+    
     Примеры использования:
     - /events/feed?include_tags=1,2,3 - события с тегами 1, 2 или 3
     - /events/feed?exclude_tags=4,5 - события без тегов 4 и 5  
     - /events/feed?include_tags=1,2&exclude_tags=3 - события с тегами 1 или 2, но без тега 3
+    - /events/feed?sort=match - лента по релевантности, дальше листаем через after=<next_cursor>
+    - /events/feed?personalized=true - лента по всем интересам пользователя
     - /events/feed - все события города пользователя (без фильтрации)
     """
     try:
@@ -80,43 +99,18 @@ async def get_events_feed(
             if exclude_tags:
                 event_filter.exclude_tags = [int(tag_id.strip()) for tag_id in exclude_tags.split(",")]
         
-        events_with_details, total_count = await EventRepository.get_events_feed(
-            current_user.id, page, page_size, event_filter
+        events_with_details, total_count, next_cursor = await EventRepository.get_events_feed(
+            current_user.id, page, page_size, event_filter, sort, after, personalized,
+            session=session
         )
         
-        events_with_match = []
-        for event_data in events_with_details:
-            match_percentage = await calculate_tag_match_percentage(
-                current_user.id, event_data["event"].id
-            )
-            
-            event_response = SEventWithMatch(
-                id=event_data["event"].id,
-                title=event_data["event"].title,
-                description=event_data["event"].description,
-                address=event_data["event"].address,
-                contact=event_data["event"].contact,
-                what_to_do=event_data["event"].what_to_do,
-                date=event_data["event"].date,
-                city_id=event_data["event"].city_id,
-                created_by=event_data["event"].created_by,
-                created_at=event_data["event"].created_at,
-                creator_username=event_data["creator_username"],
-                tags=event_data["tags"],
-                match_percentage=match_percentage
-            )
-            
-            events_with_match.append(event_response)
-        
-        total_pages = (total_count + page_size - 1) // page_size if page_size > 0 else 0
+        user_interests = await UserProfileRepository.get_user_interests(current_user.id, session=session) if events_with_details else []
         
-        return SEventFeedResponse(
-            events=events_with_match,
-            total_count=total_count,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
+        return build_events_feed_response(
+            events_with_details, total_count, page, page_size, next_cursor, user_interests
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Ошибка при получении ленты событий")
 
@@ -125,12 +119,14 @@ async def get_events_feed(
 async def get_my_events(
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить события созданные текущим пользователем"""
     try:
         events_with_details, total_count = await EventRepository.get_user_events(
-            current_user.id, page, page_size
+            current_user.id, page, page_size,
+            session=session
         )
         
         events_with_tags = []
@@ -168,15 +164,16 @@ async def get_my_events(
 @router.get("/{event_id}", response_model=SEventWithMatch)
 async def get_event_details(
     event_id: int,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить подробную информацию о событии с процентом совпадения"""
     try:
-        event_details = await EventRepository.get_event_with_details(event_id)
+        event_details = await EventRepository.get_event_with_details(event_id, session=session)
         if not event_details:
             raise HTTPException(status_code=404, detail="Событие не найдено")
         
-        match_percentage = await calculate_tag_match_percentage(current_user.id, event_id)
+        match_percentage = await calculate_tag_match_percentage(current_user.id, event_id, session=session)
         
         event_response = SEventWithMatch(
             id=event_details["event"].id,
@@ -205,19 +202,20 @@ async def get_event_details(
 async def update_event(
     event_id: int,
     event_data: SEventUpdate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Обновить событие (только создатель события)"""
     try:
-        is_owner = await EventRepository.is_event_owner(event_id, current_user.id)
+        is_owner = await EventRepository.is_event_owner(event_id, current_user.id, session=session)
         if not is_owner:
             raise HTTPException(status_code=403, detail="Недостаточно прав для редактирования события")
         
-        event = await EventRepository.update_event(event_id, event_data)
+        event = await EventRepository.update_event(event_id, event_data, session=session)
         if not event:
             raise HTTPException(status_code=404, detail="Событие не найдено")
         
-        event_details = await EventRepository.get_event_with_details(event_id)
+        event_details = await EventRepository.get_event_with_details(event_id, session=session)
         if not event_details:
             raise HTTPException(status_code=404, detail="Событие не найдено")
         
@@ -246,15 +244,16 @@ async def update_event(
 @router.delete("/{event_id}/delete")
 async def delete_event(
     event_id: int,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Удалить событие (только создатель события)"""
     try:
-        is_owner = await EventRepository.is_event_owner(event_id, current_user.id)
+        is_owner = await EventRepository.is_event_owner(event_id, current_user.id, session=session)
         if not is_owner:
             raise HTTPException(status_code=403, detail="Недостаточно прав для удаления события")
         
-        success = await EventRepository.delete_event(event_id)
+        success = await EventRepository.delete_event(event_id, session=session)
         if not success:
             raise HTTPException(status_code=404, detail="Событие не найдено")
         
@@ -1,4 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_session
 from repositories.fund import FundRepository
 from repositories.user import UserProfileRepository
 from schemas.fund import (
@@ -10,6 +12,7 @@ from models.auth import UserOrm
 from utils.security import get_current_user
 from utils.admin_security import get_current_admin
 from utils.fund_matching import calculate_fund_tag_match_percentage
+from utils.matching import calculate_match_percentage
 
 
 
@@ -23,13 +26,14 @@ router = APIRouter(
 @router.post("/create", response_model=SFundWithTags)
 async def create_fund(
     fund_data: SFundCreate,
-    current_admin: UserOrm = Depends(get_current_admin)
+    current_admin: UserOrm = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
 ):
     """Создать новый фонд (только для админов)"""
     try:
-        fund = await FundRepository.create_fund(fund_data, current_admin.id)
+        fund = await FundRepository.create_fund(fund_data, current_admin.id, session=session)
         
-        fund_details = await FundRepository.get_fund_with_details(fund.id)
+        fund_details = await FundRepository.get_fund_with_details(fund.id, session=session)
         if not fund_details:
             raise HTTPException(status_code=404, detail="Фонд не найден")
         
@@ -58,19 +62,21 @@ async def create_fund(
 async def get_funds_feed(
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить ленту активных фондов с пагинацией и процентом совпадения"""
     try:
         funds_with_details, total_count = await FundRepository.get_active_funds_feed(
-            current_user.id, page, page_size
+            current_user.id, page, page_size,
+            session=session
         )
         
+        user_interests = await UserProfileRepository.get_user_interests(current_user.id, session=session) if funds_with_details else []
+        
         funds_with_match = []
         for fund_data in funds_with_details:
-            match_percentage = await calculate_fund_tag_match_percentage(
-                current_user.id, fund_data["fund"].id
-            )
+            match_percentage = calculate_match_percentage(user_interests, fund_data["tags"])
             
             fund_response = SFundWithMatch(
                 id=fund_data["fund"].id,
@@ -108,12 +114,14 @@ async def get_funds_feed(
 async def get_my_funds(
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
-    current_admin: UserOrm = Depends(get_current_admin)
+    current_admin: UserOrm = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить фонды созданные текущим администратором"""
     try:
         funds_with_details, total_count = await FundRepository.get_user_funds(
-            current_admin.id, page, page_size
+            current_admin.id, page, page_size,
+            session=session
         )
         
         funds_with_tags = []
@@ -153,11 +161,12 @@ async def get_my_funds(
 async def get_my_donations(
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить мои донаты"""
     try:
-        donations_with_details, total_count = await FundRepository.get_user_donations(current_user.id, page, page_size)
+        donations_with_details, total_count = await FundRepository.get_user_donations(current_user.id, page, page_size, session=session)
         
         donations = []
         for donation_data in donations_with_details:
@@ -181,13 +190,14 @@ async def get_my_donations(
 @router.post("/donate", response_model=SDonationWithFund)
 async def make_donation(
     donation_data: SDonationCreate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Сделать донат в фонд"""
     try:
-        donation = await FundRepository.make_donation(donation_data, current_user.id)
+        donation = await FundRepository.make_donation(donation_data, current_user.id, session=session)
         
-        fund_query = await FundRepository.get_fund_by_id(donation.fund_id)
+        fund_query = await FundRepository.get_fund_by_id(donation.fund_id, session=session)
         if not fund_query:
             raise HTTPException(status_code=404, detail="Фонд не найден")
         
@@ -212,15 +222,16 @@ async def make_donation(
 @router.get("/{fund_id}", response_model=SFundWithMatch)
 async def get_fund_details(
     fund_id: int,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Получить подробную информацию о фонде с процентом совпадения"""
     try:
-        fund_details = await FundRepository.get_fund_with_details(fund_id)
+        fund_details = await FundRepository.get_fund_with_details(fund_id, session=session)
         if not fund_details:
             raise HTTPException(status_code=404, detail="Фонд не найден")
         
-        match_percentage = await calculate_fund_tag_match_percentage(current_user.id, fund_id)
+        match_percentage = await calculate_fund_tag_match_percentage(current_user.id, fund_id, session=session)
         
         fund_response = SFundWithMatch(
             id=fund_details["fund"].id,
@@ -250,19 +261,20 @@ async def get_fund_details(
 async def update_fund(
     fund_id: int,
     fund_data: SFundUpdate,
-    current_admin: UserOrm = Depends(get_current_admin)
+    current_admin: UserOrm = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
 ):
     """Обновить фонд (только создатель фонда)"""
     try:
-        is_owner = await FundRepository.is_fund_owner(fund_id, current_admin.id)
+        is_owner = await FundRepository.is_fund_owner(fund_id, current_admin.id, session=session)
         if not is_owner:
             raise HTTPException(status_code=403, detail="Недостаточно прав для редактирования фонда")
         
-        fund = await FundRepository.update_fund(fund_id, fund_data)
+        fund = await FundRepository.update_fund(fund_id, fund_data, session=session)
         if not fund:
             raise HTTPException(status_code=404, detail="Фонд не найден")
         
-        fund_details = await FundRepository.get_fund_with_details(fund_id)
+        fund_details = await FundRepository.get_fund_with_details(fund_id, session=session)
         if not fund_details:
             raise HTTPException(status_code=404, detail="Фонд не найден")
         
@@ -292,15 +304,16 @@ async def update_fund(
 @router.delete("/{fund_id}/delete")
 async def delete_fund(
     fund_id: int,
-    current_admin: UserOrm = Depends(get_current_admin)
+    current_admin: UserOrm = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
 ):
     """Удалить фонд (только создатель фонда)"""
     try:
-        is_owner = await FundRepository.is_fund_owner(fund_id, current_admin.id)
+        is_owner = await FundRepository.is_fund_owner(fund_id, current_admin.id, session=session)
         if not is_owner:
             raise HTTPException(status_code=403, detail="Недостаточно прав для удаления фонда")
         
-        success = await FundRepository.delete_fund(fund_id)
+        success = await FundRepository.delete_fund(fund_id, session=session)
         if not success:
             raise HTTPException(status_code=404, detail="Фонд не найден")
         
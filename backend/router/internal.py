@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Depends
+from database import get_pool_metrics
+from models.auth import UserOrm
+from utils.admin_security import get_current_admin
+from utils.session_cache import session_cache
+
+
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Служебное"]
+)
+
+
+@router.get("/metrics")
+async def get_metrics(current_admin: UserOrm = Depends(get_current_admin)):
+    """Метрики процесса: пул соединений с БД и кэш сессий (только для администраторов)"""
+    try:
+        return {
+            "db_pool": get_pool_metrics(),
+            "session_cache": session_cache.stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Ошибка при получении метрик")
\ No newline at end of file
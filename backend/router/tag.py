@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Header, Response
 from repositories.tag import TagRepository
 from schemas.tag import STag, STagCreate
+from utils.etag import make_etag, etag_matches
+from utils.reference_cache import REFERENCE_CACHE_MAX_AGE
 
 
 
@@ -13,12 +16,20 @@ router = APIRouter(
 
 @router.get("", response_model=list[STag])
 async def get_tags(
+    response: Response,
     page: int = Query(1, ge=1, description="Номер страницы"),
-    page_size: int = Query(20, ge=1, le=100, description="Размер страницы")
+    page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Получить список тегов с пагинацией"""
     try:
-        tags = await TagRepository.get_all_tags(page, page_size)
+        tags = [STag.model_validate(tag) for tag in await TagRepository.get_all_tags(page, page_size)]
+        
+        cache_headers = {"ETag": make_etag(tags), "Cache-Control": f"public, max-age={REFERENCE_CACHE_MAX_AGE}"}
+        if etag_matches(if_none_match, cache_headers["ETag"]):
+            return Response(status_code=304, headers=cache_headers)
+        
+        response.headers.update(cache_headers)
         return tags
     except Exception as e:
         raise HTTPException(status_code=500, detail="Ошибка при получении списка тегов")
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_session
 from repositories.user import UserProfileRepository
 from schemas.user import (
     SUserProfile, SUserProfileCreate, SUserProfileUpdate, SUserProfileFullUpdate,
@@ -6,6 +9,8 @@ from schemas.user import (
 )
 from models.auth import UserOrm
 from utils.security import get_current_user
+from utils.leaderboard import leaderboard_snapshot
+from utils.etag import make_etag, etag_matches
 
 
 
@@ -17,10 +22,10 @@ router = APIRouter(
 
 
 @router.get("/profile", response_model=SUserProfileWithInterests)
-async def get_user_profile(current_user: UserOrm = Depends(get_current_user)):
+async def get_user_profile(current_user: UserOrm = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
     """Получить профиль текущего пользователя с интересами"""
     try:
-        profile, interests = await UserProfileRepository.get_profile_with_interests(current_user.id)
+        profile, interests = await UserProfileRepository.get_profile_with_interests(current_user.id, session=session)
         
         if not profile:
             profile_data = SUserProfileCreate(
@@ -30,7 +35,7 @@ async def get_user_profile(current_user: UserOrm = Depends(get_current_user)):
                 rating=0,
                 participation_count=0
             )
-            profile = await UserProfileRepository.create_or_update_profile(profile_data)
+            profile = await UserProfileRepository.create_or_update_profile(profile_data, session=session)
             interests = []
         
         profile_dict = SUserProfile.model_validate(profile).model_dump()
@@ -44,7 +49,8 @@ async def get_user_profile(current_user: UserOrm = Depends(get_current_user)):
 @router.put("/profile/update", response_model=SUserProfile)
 async def update_user_profile(
     profile_data: SUserProfileUpdate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Полное обновление профиля пользователя
     
@@ -52,7 +58,7 @@ async def update_user_profile(
     Доступные поля: city_id, about_me
     """
     try:
-        profile = await UserProfileRepository.update_profile(current_user.id, profile_data)
+        profile = await UserProfileRepository.update_profile(current_user.id, profile_data, session=session)
         return profile
     except Exception as e:
         raise HTTPException(status_code=500, detail="Ошибка при обновлении профиля")
@@ -61,7 +67,8 @@ async def update_user_profile(
 @router.patch("/profile/update", response_model=SUserProfile)
 async def partial_update_user_profile(
     profile_data: SUserProfileUpdate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Частичное обновление профиля пользователя
     
@@ -75,7 +82,7 @@ async def partial_update_user_profile(
     - Оставить без изменений: `{}`
     """
     try:
-        profile = await UserProfileRepository.partial_update_profile(current_user.id, profile_data)
+        profile = await UserProfileRepository.partial_update_profile(current_user.id, profile_data, session=session)
         return profile
     except Exception as e:
         raise HTTPException(status_code=500, detail="Ошибка при обновлении профиля")
@@ -84,7 +91,8 @@ async def partial_update_user_profile(
 @router.patch("/profile/full-update", response_model=SUserProfile)
 async def full_update_user_profile(
     profile_data: SUserProfileFullUpdate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Полное обновление профиля пользователя (сервисный эндпоинт)
     
@@ -106,7 +114,7 @@ async def full_update_user_profile(
     - Обновить несколько полей: `{"city_id": 2, "rating": 75}`
     """
     try:
-        profile = await UserProfileRepository.full_update_profile(current_user.id, profile_data)
+        profile = await UserProfileRepository.full_update_profile(current_user.id, profile_data, session=session)
         return profile
     except Exception as e:
         raise HTTPException(status_code=500, detail="Ошибка при обновлении профиля")
@@ -115,11 +123,12 @@ async def full_update_user_profile(
 @router.post("/interests", response_model=dict)
 async def update_user_interests(
     interest_data: SUserInterestCreate,
-    current_user: UserOrm = Depends(get_current_user)
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """Обновить интересы пользователя"""
     try:
-        await UserProfileRepository.update_user_interests(current_user.id, interest_data)
+        await UserProfileRepository.update_user_interests(current_user.id, interest_data, session=session)
         return {"success": True, "message": "Интересы обновлены"}
     except Exception as e:
         raise HTTPException(status_code=500, detail="Ошибка при обновлении интересов")
@@ -127,21 +136,38 @@ async def update_user_interests(
 
 @router.get("/leaderboard", response_model=SLeaderboard)
 async def get_leaderboard(
+    response: Response,
     top_n: int = Query(10, ge=1, le=100, description="Количество топовых пользователей"),
-    current_user: UserOrm = Depends(get_current_user)
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserOrm = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
 ):
-    """Получить лидерборд пользователей"""
+    """Получить лидерборд пользователей (поддерживает ETag / If-None-Match)
+    
+    Из снимка ETag считается по версии снимка и строке текущего пользователя, без сериализации топа.
+    """
     try:
-        top_users, current_user_position = await UserProfileRepository.get_leaderboard(top_n, current_user.id)
+        snapshot_version = None
+        if leaderboard_snapshot.loaded and top_n <= leaderboard_snapshot.size:
+            snapshot_version = leaderboard_snapshot.version
+            top_users = leaderboard_snapshot.top(top_n)
+            # Пользователь из топа — позиция того же снимка, иначе живая (см. LeaderboardSnapshot)
+            current_user_position = leaderboard_snapshot.get(current_user.id)
+            if current_user_position is None:
+                current_user_position = await UserProfileRepository.get_leaderboard_position(current_user.id, session=session)
+                if current_user_position:
+                    current_user_position = {**current_user_position, "username": current_user.username}
+        else:
+            top_users, current_user_position = await UserProfileRepository.get_leaderboard(top_n, current_user.id, session=session)
         
         leaderboard_items = []
         for user in top_users:
             leaderboard_items.append({
-                "user_id": user.user_id,
-                "username": user.username,
-                "rating": user.rating,
-                "participation_count": user.participation_count,
-                "position": user.position
+                "user_id": user["user_id"],
+                "username": user["username"],
+                "rating": user["rating"],
+                "participation_count": user["participation_count"],
+                "position": user["position"]
             })
         
         current_user_item = None
@@ -154,9 +180,20 @@ async def get_leaderboard(
                 "position": current_user_position["position"]
             }
         
-        return SLeaderboard(
+        leaderboard_response = SLeaderboard(
             top_users=leaderboard_items,
             current_user_position=current_user_item
         )
+        
+        if snapshot_version is not None:
+            etag = make_etag({"snapshot": snapshot_version, "top_n": top_n, "current_user_position": current_user_item})
+        else:
+            etag = make_etag(leaderboard_response)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+        
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        return leaderboard_response
     except Exception as e:
         raise HTTPException(status_code=500, detail="Ошибка при получении лидерборда")
\ No newline at end of file
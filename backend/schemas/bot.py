@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from schemas.city import SCity
+from schemas.event import SEventFeedResponse
+from schemas.user import SUserProfileWithInterests
+
+
+
+
+class SBotProfileScreen(BaseModel):
+    profile: SUserProfileWithInterests
+    city: Optional[SCity] = Field(None, description="Город пользователя, null — не указан")
+
+
+class SBotFeedScreen(BaseModel):
+    city: Optional[SCity] = Field(None, description="Город пользователя, null — не указан (лента будет пустой)")
+    interests: List[str] = Field(default=[], description="Интересы пользователя, по которым собрана лента")
+    feed: SEventFeedResponse
\ No newline at end of file
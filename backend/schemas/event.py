@@ -132,6 +132,10 @@ class SEventFeedResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Курсор следующей страницы (только для sort/after), null — страниц больше нет"
+    )
 
 
 class SEventListResponse(BaseModel):
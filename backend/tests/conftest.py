@@ -0,0 +1,71 @@
+import os
+import sys
+import asyncio
+import pytest
+from pathlib import Path
+
+
+
+
+# Тесты работают с настоящим PostgreSQL (ON CONFLICT, array_agg, RETURNING):
+# TEST_DATABASE_URL=postgresql+asyncpg://... pytest backend/tests
+# Таблицы в этой БД пересоздаются, поэтому рабочую базу указывать нельзя.
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+if not TEST_DATABASE_URL:
+    collect_ignore_glob = ['test_*.py']
+else:
+    os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def run(coro):
+    """Выполнить корутину в отдельном цикле событий и закрыть соединения пула после неё"""
+    from database import engine
+    
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+    
+    return asyncio.run(wrapper())
+
+
+@pytest.fixture
+def db():
+    """Чистая схема БД на каждый тест"""
+    import models.admin, models.application, models.auth, models.city  # noqa: F401 — регистрация таблиц
+    import models.event, models.fund, models.tag, models.user_profile  # noqa: F401
+    from database import create_tables, delete_tables
+    
+    async def reset():
+        await delete_tables()
+        await create_tables()
+    
+    run(reset())
+    yield
+    run(delete_tables())
+
+
+@pytest.fixture
+def count_queries():
+    """Контекстный счётчик SQL-запросов через событие before_cursor_execute"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+    from database import engine
+    
+    @contextmanager
+    def counter():
+        statements = []
+        
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(engine.sync_engine, 'before_cursor_execute', on_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, 'before_cursor_execute', on_execute)
+    
+    return counter
\ No newline at end of file
@@ -0,0 +1,84 @@
+import asyncio
+from conftest import run
+
+
+
+
+DONORS = 10
+DONATIONS = 1000
+AMOUNT = 100
+RATING_PER_100 = 3
+
+
+async def seed_fund(target_amount: int):
+    from database import new_session
+    from models.fund import FundOrm
+    
+    async with new_session() as session:
+        fund = FundOrm(
+            title='Фонд',
+            description='Описание',
+            requisites='Реквизиты',
+            target_amount=target_amount,
+            rating_per_100=RATING_PER_100,
+            created_by=1
+        )
+        session.add(fund)
+        await session.commit()
+        return fund.id
+
+
+async def donate_concurrently(fund_id: int):
+    """DONATIONS параллельных донатов от DONORS пользователей, каждый в своей сессии"""
+    from repositories.fund import FundRepository
+    from schemas.fund import SDonationCreate
+    
+    donation = SDonationCreate(fund_id=fund_id, amount=AMOUNT)
+    return await asyncio.gather(
+        *[FundRepository.make_donation(donation, user_id=index % DONORS + 1) for index in range(DONATIONS)],
+        return_exceptions=True
+    )
+
+
+async def load_state(fund_id: int):
+    from sqlalchemy import func, select
+    from database import new_session
+    from models.fund import DonationOrm, FundOrm
+    from models.user_profile import UserProfileOrm
+    
+    async with new_session() as session:
+        fund = await session.get(FundOrm, fund_id)
+        donations_count = await session.scalar(select(func.count()).select_from(DonationOrm))
+        donations_sum = await session.scalar(select(func.sum(DonationOrm.amount)))
+        ratings = dict((await session.execute(select(UserProfileOrm.user_id, UserProfileOrm.rating))).all())
+        return fund, donations_count, donations_sum, ratings
+
+
+def test_parallel_donations_lose_no_updates(db):
+    fund_id = run(seed_fund(target_amount=AMOUNT * DONATIONS * 2))
+    
+    results = run(donate_concurrently(fund_id))
+    fund, donations_count, donations_sum, ratings = run(load_state(fund_id))
+    
+    assert [result for result in results if isinstance(result, Exception)] == []
+    assert donations_count == DONATIONS
+    assert fund.collected_amount == donations_sum == AMOUNT * DONATIONS
+    assert fund.status == 'active'
+    per_donor = DONATIONS // DONORS * (AMOUNT // 100) * RATING_PER_100
+    assert ratings == {user_id: per_donor for user_id in range(1, DONORS + 1)}
+
+
+def test_parallel_donations_never_overshoot_target(db):
+    accepted = DONATIONS // 2
+    fund_id = run(seed_fund(target_amount=AMOUNT * accepted))
+    
+    results = run(donate_concurrently(fund_id))
+    fund, donations_count, donations_sum, ratings = run(load_state(fund_id))
+    
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert len(errors) == DONATIONS - accepted
+    assert donations_count == accepted
+    assert fund.collected_amount == donations_sum == fund.target_amount
+    assert fund.status == 'completed'
+    assert sum(ratings.values()) == accepted * (AMOUNT // 100) * RATING_PER_100
\ No newline at end of file
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from conftest import run
+
+
+
+
+async def seed_feed(events_count: int, tags_per_event: int = 3):
+    """Пользователь с городом и events_count событий в этом городе, у каждого несколько тегов"""
+    from database import new_session
+    from models.auth import UserOrm
+    from models.city import CityOrm
+    from models.event import EventOrm, EventTagOrm
+    from models.tag import TagOrm
+    from models.user_profile import UserProfileOrm
+    
+    async with new_session() as session:
+        city = CityOrm(name='Москва')
+        user = UserOrm(max_user_id='feed-user', username='feed_user')
+        session.add_all([city, user])
+        await session.flush()
+        
+        tags = [TagOrm(name=f'тег {i}') for i in range(tags_per_event * 2)]
+        session.add_all(tags)
+        session.add(UserProfileOrm(user_id=user.id, city_id=city.id))
+        await session.flush()
+        
+        starts_at = datetime.now(timezone.utc) + timedelta(days=1)
+        events = [
+            EventOrm(
+                title=f'Событие {i}',
+                description='Описание',
+                address='Адрес',
+                contact='Контакт',
+                what_to_do='Помочь',
+                date=starts_at + timedelta(hours=i),
+                city_id=city.id,
+                created_by=user.id
+            )
+            for i in range(events_count)
+        ]
+        session.add_all(events)
+        await session.flush()
+        
+        session.add_all([
+            EventTagOrm(event_id=event.id, tag_id=tags[(index + shift) % len(tags)].id)
+            for index, event in enumerate(events)
+            for shift in range(tags_per_event)
+        ])
+        await session.commit()
+        return user.id
+
+
+def feed_query_count(count_queries, user_id: int, page_size: int, **kwargs):
+    """Число SQL-запросов на одну страницу ленты"""
+    from repositories.event import EventRepository
+    
+    async def load():
+        return await EventRepository.get_events_feed(user_id, page=1, page_size=page_size, **kwargs)
+    
+    with count_queries() as statements:
+        events_with_details, _, _ = run(load())
+    
+    assert len(events_with_details) == page_size
+    assert all(len(item['tags']) == 3 for item in events_with_details)
+    return len(statements)
+
+
+def test_events_feed_query_count_does_not_grow_with_page_size(db, count_queries):
+    user_id = run(seed_feed(100))
+    
+    counts = {page_size: feed_query_count(count_queries, user_id, page_size) for page_size in (1, 10, 100)}
+    
+    assert len(set(counts.values())) == 1, counts
+
+
+def test_events_feed_by_match_query_count_does_not_grow_with_page_size(db, count_queries):
+    user_id = run(seed_feed(100))
+    
+    counts = {
+        page_size: feed_query_count(count_queries, user_id, page_size, sort='match')
+        for page_size in (1, 10, 100)
+    }
+    
+    assert len(set(counts.values())) == 1, counts
\ No newline at end of file
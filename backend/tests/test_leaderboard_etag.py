@@ -0,0 +1,119 @@
+from conftest import run
+
+
+
+
+async def seed_users(ratings):
+    from database import new_session
+    from models.auth import UserOrm
+    from models.user_profile import UserProfileOrm
+    
+    async with new_session() as session:
+        users = [UserOrm(max_user_id=f'user-{i}', username=f'user_{i}') for i in range(len(ratings))]
+        session.add_all(users)
+        await session.flush()
+        session.add_all([
+            UserProfileOrm(user_id=user.id, rating=rating, participation_count=0)
+            for user, rating in zip(users, ratings)
+        ])
+        await session.commit()
+        return users
+
+
+async def request_leaderboard(user, if_none_match=None):
+    """Вызвать обработчик /user/leaderboard; вернуть (статус, ETag, тело или None)"""
+    from fastapi import Response
+    from database import new_session
+    from router.user import get_leaderboard
+    
+    response = Response()
+    async with new_session() as session:
+        result = await get_leaderboard(response, top_n=3, if_none_match=if_none_match, current_user=user, session=session)
+    if isinstance(result, Response):
+        return result.status_code, result.headers.get('ETag'), None
+    return 200, response.headers.get('ETag'), result
+
+
+def test_leaderboard_revalidates_with_etag(db):
+    from sqlalchemy import update
+    from database import new_session
+    from models.user_profile import UserProfileOrm
+    from repositories.user import UserProfileRepository
+    from utils.leaderboard import leaderboard_snapshot
+    
+    users = run(seed_users([50, 40, 30, 20, 10]))
+    viewer = users[-1]
+    
+    async def scenario():
+        await leaderboard_snapshot.start(UserProfileRepository.get_leaderboard_snapshot)
+        try:
+            first = await request_leaderboard(viewer)
+            repeated = await request_leaderboard(viewer, if_none_match=first[1])
+            
+            async with new_session() as session:
+                await session.execute(
+                    update(UserProfileOrm).where(UserProfileOrm.user_id == viewer.id).values(rating=100)
+                )
+                await session.commit()
+            await leaderboard_snapshot.refresh()
+            changed = await request_leaderboard(viewer, if_none_match=first[1])
+            return first, repeated, changed
+        finally:
+            await leaderboard_snapshot.stop()
+    
+    first, repeated, changed = run(scenario())
+    
+    status, etag, body = first
+    assert status == 200 and etag
+    assert [item.rating for item in body.top_users] == [50, 40, 30]
+    assert body.current_user_position.position == 5
+    
+    assert repeated == (304, etag, None)
+    
+    status, new_etag, body = changed
+    assert status == 200 and new_etag != etag
+    assert body.top_users[0].user_id == viewer.id
+    assert body.current_user_position.position == 1
+
+def test_leaderboard_position_comes_from_snapshot(db):
+    from sqlalchemy import update
+    from database import new_session
+    from models.user_profile import UserProfileOrm
+    from repositories.user import UserProfileRepository
+    from utils.leaderboard import leaderboard_snapshot
+    
+    users = run(seed_users([50, 40, 30]))
+    viewer = users[-1]
+    
+    async def scenario():
+        await leaderboard_snapshot.start(UserProfileRepository.get_leaderboard_snapshot)
+        try:
+            first = await request_leaderboard(viewer)
+            
+            # Рейтинг в БД изменился, а снимок ещё нет: позиция и ETag остаются от снимка
+            async with new_session() as session:
+                await session.execute(
+                    update(UserProfileOrm).where(UserProfileOrm.user_id == viewer.id).values(rating=100)
+                )
+                await session.commit()
+            stale = await request_leaderboard(viewer, if_none_match=first[1])
+            
+            await leaderboard_snapshot.refresh()
+            refreshed = await request_leaderboard(viewer, if_none_match=first[1])
+            return first, stale, refreshed
+        finally:
+            await leaderboard_snapshot.stop()
+    
+    first, stale, refreshed = run(scenario())
+    
+    status, etag, body = first
+    assert status == 200
+    assert body.current_user_position.position == 3
+    assert body.current_user_position.position == body.top_users[2].position
+    
+    assert stale == (304, etag, None)
+    
+    status, new_etag, body = refreshed
+    assert status == 200 and new_etag != etag
+    assert body.top_users[0].user_id == viewer.id
+    assert body.current_user_position.position == 1
\ No newline at end of file
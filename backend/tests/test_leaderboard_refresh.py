@@ -0,0 +1,35 @@
+import asyncio
+
+
+
+
+def test_refresh_keeps_updates_committed_during_read():
+    from utils.leaderboard import Leaderboard
+    
+    leaderboard = Leaderboard(refresh_seconds=0)
+    read_started = asyncio.Event()
+    finish_read = asyncio.Event()
+    
+    async def loader():
+        # Строки прочитаны до коммитов, которые придут, пока пересборка ждёт
+        rows = [(1, 10, 0), (2, 20, 0), (3, 30, 0)]
+        read_started.set()
+        await finish_read.wait()
+        return rows
+    
+    async def scenario():
+        leaderboard._loader = loader
+        refresh = asyncio.create_task(leaderboard.refresh())
+        await read_started.wait()
+        leaderboard.update(1, 50, 1)
+        leaderboard.update(4, 5, 0)
+        leaderboard.discard(2)
+        finish_read.set()
+        await refresh
+    
+    asyncio.run(scenario())
+    
+    assert [item['user_id'] for item in leaderboard.top(10)] == [1, 3, 4]
+    assert leaderboard.get(1) == {'user_id': 1, 'rating': 50, 'participation_count': 1, 'position': 1}
+    assert leaderboard.get(2) is None
+    assert leaderboard._pending is None
\ No newline at end of file
@@ -0,0 +1,61 @@
+from conftest import run
+
+
+
+
+async def seed_reference(cities_count: int, tags_count: int):
+    from sqlalchemy import text
+    from database import engine
+    
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO cities (name) SELECT 'Город ' || i FROM generate_series(1, :n) AS i"),
+            {'n': cities_count}
+        )
+        await conn.execute(
+            text("INSERT INTO tags (name) SELECT 'Тег ' || i FROM generate_series(1, :n) AS i"),
+            {'n': tags_count}
+        )
+
+
+async def counts():
+    from repositories.city import CityRepository
+    from repositories.tag import TagRepository
+    
+    return await CityRepository.get_total_count(), await TagRepository.get_total_count()
+
+
+def test_counts_without_cache_use_single_count_query(db, count_queries):
+    run(seed_reference(cities_count=30, tags_count=70))
+    
+    with count_queries() as statements:
+        assert run(counts()) == (30, 70)
+    
+    assert len(statements) == 2
+    assert all('count(*)' in statement.lower() for statement in statements)
+
+
+def test_counts_are_served_from_reference_cache(db, count_queries):
+    from repositories.city import CityRepository
+    from repositories.tag import TagRepository
+    from schemas.tag import STagCreate
+    from utils.reference_cache import reference_cache
+    
+    run(seed_reference(cities_count=30, tags_count=70))
+    
+    async def scenario():
+        await reference_cache.start(CityRepository.get_all_city_rows, TagRepository.get_all_tag_rows)
+        try:
+            with count_queries() as statements:
+                before = await counts()
+            await TagRepository.create_tag(STagCreate(name='Новый тег'))
+            after = await counts()
+            return statements, before, after
+        finally:
+            await reference_cache.stop()
+    
+    statements, before, after = run(scenario())
+    
+    assert statements == []
+    assert before == (30, 70)
+    assert after == (30, 71)
\ No newline at end of file
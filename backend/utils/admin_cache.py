@@ -0,0 +1,137 @@
+import os
+import asyncio
+import asyncpg
+from dotenv import load_dotenv
+from database import engine
+
+
+
+
+load_dotenv()
+
+ADMIN_CACHE_REFRESH_SECONDS = int(os.getenv('ADMIN_CACHE_REFRESH_SECONDS', 300))
+ADMIN_LISTEN_CHECK_SECONDS = int(os.getenv('ADMIN_LISTEN_CHECK_SECONDS', 30))
+ADMIN_LISTEN_RETRY_SECONDS = int(os.getenv('ADMIN_LISTEN_RETRY_SECONDS', 5))
+ADMIN_NOTIFY_CHANNEL = "admins_changed"
+
+
+class AdminCache:
+    """Множество max_user_id администраторов в памяти процесса
+    
+    Загружается при старте приложения, обновляется при создании/удалении админа,
+    по Postgres NOTIFY из других воркеров и периодически (страховка на случай
+    потерянных уведомлений). Подписка держит отдельное соединение asyncpg вне пула
+    SQLAlchemy, поэтому не занимает место в пуле. Это соединение проверяется раз в
+    ADMIN_LISTEN_CHECK_SECONDS; после обрыва оно переоткрывается, а список
+    перечитывается целиком — уведомления за время обрыва не доставляются.
+    """
+    
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self.loaded = False
+        self._admin_ids = set()
+        self._loader = None
+        self._refresh_task = None
+        self._listen_task = None
+        self._listen_connection = None
+        self._pending_refreshes = set()
+    
+    
+    def __contains__(self, max_user_id: str):
+        return max_user_id in self._admin_ids
+    
+    
+    def add(self, max_user_id: str):
+        self._admin_ids.add(max_user_id)
+    
+    
+    def discard(self, max_user_id: str):
+        self._admin_ids.discard(max_user_id)
+    
+    
+    async def refresh(self):
+        """Перечитать список администраторов из БД"""
+        self._admin_ids = set(await self._loader())
+        self.loaded = True
+    
+    
+    async def start(self, loader):
+        """Загрузить кэш и запустить синхронизацию (loader — корутина, возвращающая список max_user_id)"""
+        self._loader = loader
+        await self.refresh()
+        
+        if self.refresh_seconds > 0:
+            self._refresh_task = asyncio.create_task(self._periodic_refresh())
+        self._listen_task = asyncio.create_task(self._listen())
+    
+    
+    async def stop(self):
+        """Остановить фоновое обновление и подписку на уведомления"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._listen_task:
+            self._listen_task.cancel()
+            await asyncio.gather(self._listen_task, return_exceptions=True)
+            self._listen_task = None
+        self.loaded = False
+    
+    
+    async def _listen(self):
+        """Держать подписку на NOTIFY, переподключаясь после обрыва"""
+        reconnected = False
+        while True:
+            try:
+                self._listen_connection = connection = await asyncpg.connect(_listen_dsn())
+                await connection.add_listener(ADMIN_NOTIFY_CHANNEL, self._on_notify)
+                if reconnected:
+                    await self.refresh()
+                    print(f'Подписка на {ADMIN_NOTIFY_CHANNEL} восстановлена')
+                
+                while not connection.is_closed():
+                    await asyncio.sleep(ADMIN_LISTEN_CHECK_SECONDS)
+                    await asyncio.wait_for(connection.execute('SELECT 1'), ADMIN_LISTEN_CHECK_SECONDS)
+                print(f'Соединение подписки на {ADMIN_NOTIFY_CHANNEL} закрыто')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f'Подписка на {ADMIN_NOTIFY_CHANNEL} недоступна: {e}')
+            finally:
+                await self._close_listen_connection()
+            
+            reconnected = True
+            await asyncio.sleep(ADMIN_LISTEN_RETRY_SECONDS)
+    
+    
+    async def _close_listen_connection(self):
+        """Закрыть соединение подписки (зависшее — оборвать)"""
+        connection, self._listen_connection = self._listen_connection, None
+        if connection is None or connection.is_closed():
+            return
+        try:
+            await connection.close(timeout=ADMIN_LISTEN_CHECK_SECONDS)
+        except Exception:
+            connection.terminate()
+    
+    
+    async def _periodic_refresh(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f'Ошибка обновления кэша администраторов: {e}')
+    
+    
+    def _on_notify(self, connection, pid, channel, payload):
+        task = asyncio.create_task(self.refresh())
+        self._pending_refreshes.add(task)
+        task.add_done_callback(self._pending_refreshes.discard)
+
+
+def _listen_dsn():
+    """DSN для asyncpg из URL движка (без диалекта +asyncpg)"""
+    return engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+
+
+admin_cache = AdminCache(ADMIN_CACHE_REFRESH_SECONDS)
\ No newline at end of file
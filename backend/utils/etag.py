@@ -0,0 +1,23 @@
+import json
+import hashlib
+from fastapi.encoders import jsonable_encoder
+
+
+
+
+def make_etag(payload) -> str:
+    """Сильный ETag по содержимому ответа"""
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Проверить заголовок If-None-Match (список ETag через запятую или *)"""
+    if not if_none_match:
+        return False
+    
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
\ No newline at end of file
@@ -0,0 +1,40 @@
+from schemas.event import SEventWithMatch, SEventFeedResponse
+from utils.matching import calculate_match_percentage
+
+
+
+
+def build_events_feed_response(events_with_details, total_count: int, page: int, page_size: int, next_cursor, user_interests) -> SEventFeedResponse:
+    """Собрать ответ ленты событий с процентом совпадения по уже загруженным интересам"""
+    events_with_match = []
+    for event_data in events_with_details:
+        match_percentage = calculate_match_percentage(user_interests, event_data["tags"])
+        
+        event_response = SEventWithMatch(
+            id=event_data["event"].id,
+            title=event_data["event"].title,
+            description=event_data["event"].description,
+            address=event_data["event"].address,
+            contact=event_data["event"].contact,
+            what_to_do=event_data["event"].what_to_do,
+            date=event_data["event"].date,
+            city_id=event_data["event"].city_id,
+            created_by=event_data["event"].created_by,
+            created_at=event_data["event"].created_at,
+            creator_username=event_data["creator_username"],
+            tags=event_data["tags"],
+            match_percentage=match_percentage
+        )
+        
+        events_with_match.append(event_response)
+    
+    total_pages = (total_count + page_size - 1) // page_size if page_size > 0 else 0
+    
+    return SEventFeedResponse(
+        events=events_with_match,
+        total_count=total_count,
+        page=page,
+        page_size=page_size,
+        total_pages=total_pages,
+        next_cursor=next_cursor
+    )
\ No newline at end of file
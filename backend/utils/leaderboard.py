@@ -0,0 +1,307 @@
+import os
+import math
+import random
+import asyncio
+from dotenv import load_dotenv
+from utils.etag import make_etag
+
+
+
+
+load_dotenv()
+
+LEADERBOARD_REFRESH_SECONDS = int(os.getenv('LEADERBOARD_REFRESH_SECONDS', 60))
+LEADERBOARD_SNAPSHOT_SIZE = int(os.getenv('LEADERBOARD_SNAPSHOT_SIZE', 100))
+LEADERBOARD_SNAPSHOT_SECONDS = int(os.getenv('LEADERBOARD_SNAPSHOT_SECONDS', 5))
+
+
+class _SkipListNode:
+    __slots__ = ("key", "next", "width")
+    
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class RankedSkipList:
+    """Индексируемый skip list: вставка, удаление, ранг и выборка по позиции за O(log n)"""
+    
+    MAX_LEVELS = 32
+    
+    def __init__(self):
+        self._tail = _SkipListNode((math.inf,), 0)
+        self._head = _SkipListNode(None, self.MAX_LEVELS)
+        self._head.next = [self._tail] * self.MAX_LEVELS
+        self.size = 0
+    
+    
+    def __len__(self):
+        return self.size
+    
+    
+    def insert(self, key):
+        chain = [None] * self.MAX_LEVELS
+        steps_at_level = [0] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        
+        levels = min(self.MAX_LEVELS, 1 - int(math.log2(1.0 - random.random())))
+        new_node = _SkipListNode(key, levels)
+        steps = 0
+        for level in range(levels):
+            prev_node = chain[level]
+            new_node.next[level] = prev_node.next[level]
+            prev_node.next[level] = new_node
+            new_node.width[level] = prev_node.width[level] - steps
+            prev_node.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, self.MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+    
+    
+    def remove(self, key):
+        chain = [None] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        
+        target = chain[0].next[0]
+        if target.key != key:
+            raise KeyError(key)
+        
+        for level in range(len(target.next)):
+            prev_node = chain[level]
+            prev_node.width[level] += target.width[level] - 1
+            prev_node.next[level] = target.next[level]
+        for level in range(len(target.next), self.MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self.size -= 1
+    
+    
+    def rank(self, key):
+        """Позиция ключа (с 1) или None, если ключа нет"""
+        position = 0
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        if node.next[0].key != key:
+            return None
+        return position + 1
+    
+    
+    def first(self, count: int):
+        """Первые count ключей по порядку"""
+        keys = []
+        node = self._head.next[0]
+        while node is not self._tail and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class Leaderboard:
+    """Рейтинг пользователей в памяти процесса
+    
+    Ключ сортировки — (-rating, user_id), поэтому топ N и позиция пользователя
+    считаются без полной сортировки в БД. Репозитории обновляют его после каждого
+    коммита, меняющего рейтинг, и периодически он пересобирается из БД.
+    
+    Точные позиции сразу после изменения гарантированы только при одном воркере:
+    при нескольких каждый видит лишь свои обновления, а чужие — после пересборки
+    (refresh_seconds, 0 — отключить). Обновления, пришедшие во время пересборки,
+    запоминаются и накладываются на новый рейтинг перед заменой.
+    """
+    
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self.loaded = False
+        self._entries = {}
+        self._ranking = RankedSkipList()
+        self._loader = None
+        self._refresh_task = None
+        # user_id -> (rating, participation_count) или None (удалён), пока идёт пересборка
+        self._pending = None
+    
+    
+    def update(self, user_id: int, rating: int, participation_count: int):
+        """Записать актуальные значения профиля"""
+        if self._pending is not None:
+            self._pending[user_id] = (rating, participation_count)
+        if not self.loaded:
+            return
+        self._apply(self._entries, self._ranking, user_id, (rating, participation_count))
+    
+    
+    def discard(self, user_id: int):
+        if self._pending is not None:
+            self._pending[user_id] = None
+        self._apply(self._entries, self._ranking, user_id, None)
+    
+    
+    @staticmethod
+    def _apply(entries: dict, ranking: RankedSkipList, user_id: int, entry):
+        """Записать (rating, participation_count) пользователя или удалить его (entry=None)"""
+        previous = entries.pop(user_id, None)
+        if previous is not None and (entry is None or previous[0] != entry[0]):
+            ranking.remove((-previous[0], user_id))
+        if entry is not None:
+            if previous is None or previous[0] != entry[0]:
+                ranking.insert((-entry[0], user_id))
+            entries[user_id] = entry
+    
+    
+    def top(self, count: int):
+        """Первые count пользователей: список словарей user_id/rating/participation_count/position"""
+        return [
+            self._as_item(user_id, position)
+            for position, (_, user_id) in enumerate(self._ranking.first(count), start=1)
+        ]
+    
+    
+    def get(self, user_id: int):
+        """Позиция пользователя в рейтинге или None"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        return self._as_item(user_id, self._ranking.rank((-entry[0], user_id)))
+    
+    
+    def _as_item(self, user_id: int, position: int):
+        rating, participation_count = self._entries[user_id]
+        return {
+            "user_id": user_id,
+            "rating": rating,
+            "participation_count": participation_count,
+            "position": position
+        }
+    
+    
+    async def refresh(self):
+        """Пересобрать рейтинг из БД
+        
+        Строки читаются с ожиданием, и коммиты, закончившиеся за это время, могут в них
+        не попасть: их обновления копятся в _pending и применяются к новому рейтингу.
+        """
+        self._pending = {}
+        try:
+            rows = await self._loader()
+            entries = {}
+            ranking = RankedSkipList()
+            for user_id, rating, participation_count in rows:
+                entries[user_id] = (rating, participation_count)
+                ranking.insert((-rating, user_id))
+            for user_id, entry in self._pending.items():
+                self._apply(entries, ranking, user_id, entry)
+            self._entries = entries
+            self._ranking = ranking
+            self.loaded = True
+        finally:
+            self._pending = None
+    
+    
+    async def start(self, loader):
+        """Загрузить рейтинг (loader — корутина, возвращающая строки user_id, rating, participation_count)"""
+        self._loader = loader
+        await self.refresh()
+        
+        if self.refresh_seconds > 0:
+            self._refresh_task = asyncio.create_task(self._periodic_refresh())
+    
+    
+    async def stop(self):
+        """Остановить фоновую пересборку"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        self.loaded = False
+    
+    
+    async def _periodic_refresh(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f'Ошибка пересборки лидерборда: {e}')
+
+
+
+class LeaderboardSnapshot:
+    """Готовый топ лидерборда (с именами пользователей), пересобираемый в фоне
+    
+    Запросы к /user/leaderboard отдают топ из снимка, не обращаясь к БД.
+    Снимок у каждого воркера свой и отстаёт от БД не больше чем на refresh_seconds.
+    Позиция пользователя из топа берётся из того же снимка, поэтому с топом она
+    совпадает. Пользователи вне снимка получают живую позицию, которая до следующей
+    пересборки может расходиться с топом (например, пользователь уже поднялся в топ).
+    version — хеш содержимого снимка: воркеры с одинаковым снимком отдают одинаковый ETag.
+    """
+    
+    def __init__(self, size: int, refresh_seconds: int):
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self.loaded = False
+        self.version = None
+        self._items = []
+        self._by_user = {}
+        self._builder = None
+        self._refresh_task = None
+    
+    
+    def top(self, count: int):
+        """Первые count записей снимка"""
+        return self._items[:count]
+    
+    
+    def get(self, user_id: int):
+        """Запись пользователя из снимка или None, если его нет в топе снимка"""
+        return self._by_user.get(user_id)
+    
+    
+    async def refresh(self):
+        """Пересобрать снимок"""
+        items = list(await self._builder(self.size))
+        self._by_user = {item["user_id"]: item for item in items}
+        self._items = items
+        self.version = make_etag(items)
+        self.loaded = True
+    
+    
+    async def start(self, builder):
+        """Собрать снимок (builder — корутина, принимающая размер топа) и запустить фоновую пересборку"""
+        self._builder = builder
+        await self.refresh()
+        
+        if self.refresh_seconds > 0:
+            self._refresh_task = asyncio.create_task(self._periodic_refresh())
+    
+    
+    async def stop(self):
+        """Остановить фоновую пересборку"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        self.loaded = False
+    
+    
+    async def _periodic_refresh(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f'Ошибка пересборки снимка лидерборда: {e}')
+
+
+leaderboard = Leaderboard(LEADERBOARD_REFRESH_SECONDS)
+leaderboard_snapshot = LeaderboardSnapshot(LEADERBOARD_SNAPSHOT_SIZE, LEADERBOARD_SNAPSHOT_SECONDS)
\ No newline at end of file
@@ -0,0 +1,24 @@
+import base64
+import json
+
+
+
+
+def encode_cursor(position: dict) -> str:
+    """Закодировать позицию keyset-пагинации в непрозрачный курсор"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Раскодировать курсор, полученный от клиента"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Некорректный курсор пагинации")
+    
+    if not isinstance(position, dict):
+        raise ValueError("Некорректный курсор пагинации")
+    
+    return position
\ No newline at end of file
@@ -0,0 +1,127 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+
+
+
+
+load_dotenv()
+
+REFERENCE_CACHE_REFRESH_SECONDS = int(os.getenv('REFERENCE_CACHE_REFRESH_SECONDS', 60))
+REFERENCE_CACHE_MAX_AGE = int(os.getenv('REFERENCE_CACHE_MAX_AGE', 60))
+
+
+class ReferenceDirectory:
+    """Справочник id → name и name → id (города или теги)"""
+    
+    def __init__(self, rows=()):
+        self._names = {}
+        self._ids = {}
+        for item_id, name in rows:
+            self._names[item_id] = name
+            self._ids[name] = item_id
+        self._sorted_ids = sorted(self._names)
+    
+    
+    def __len__(self):
+        return len(self._names)
+    
+    
+    def name(self, item_id: int):
+        return self._names.get(item_id)
+    
+    
+    def id(self, name: str):
+        return self._ids.get(name)
+    
+    
+    def names(self, item_ids):
+        """Имена по списку ID (неизвестные ID пропускаются)"""
+        return [self._names[item_id] for item_id in item_ids if item_id in self._names]
+    
+    
+    def names_by_id(self, item_ids):
+        """Словарь ID → имя по списку ID (неизвестные ID пропускаются)"""
+        return {item_id: self._names[item_id] for item_id in item_ids if item_id in self._names}
+    
+    
+    def page(self, page: int, page_size: int):
+        """Страница записей в порядке ID: список словарей id/name"""
+        offset = (page - 1) * page_size
+        return [
+            {"id": item_id, "name": self._names[item_id]}
+            for item_id in self._sorted_ids[offset:offset + page_size]
+        ]
+    
+    
+    def add(self, item_id: int, name: str):
+        if item_id not in self._names:
+            self._sorted_ids.append(item_id)
+            self._sorted_ids.sort()
+        self._names[item_id] = name
+        self._ids[name] = item_id
+
+
+class ReferenceCache:
+    """Города и теги в памяти процесса
+    
+    Загружаются при старте приложения; create_city/create_tag дописывают запись
+    в справочник своего процесса. Остальные воркеры увидят её после периодической
+    перезагрузки из БД (refresh_seconds, 0 — отключить; только при одном воркере).
+    """
+    
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self.loaded = False
+        self.cities = ReferenceDirectory()
+        self.tags = ReferenceDirectory()
+        self._cities_loader = None
+        self._tags_loader = None
+        self._refresh_task = None
+    
+    
+    def add_city(self, city_id: int, name: str):
+        if self.loaded:
+            self.cities.add(city_id, name)
+    
+    
+    def add_tag(self, tag_id: int, name: str):
+        if self.loaded:
+            self.tags.add(tag_id, name)
+    
+    
+    async def refresh(self):
+        """Перечитать справочники из БД"""
+        self.cities = ReferenceDirectory(await self._cities_loader())
+        self.tags = ReferenceDirectory(await self._tags_loader())
+        self.loaded = True
+    
+    
+    async def start(self, cities_loader, tags_loader):
+        """Загрузить справочники (загрузчики — корутины, возвращающие пары (id, name))"""
+        self._cities_loader = cities_loader
+        self._tags_loader = tags_loader
+        await self.refresh()
+        
+        if self.refresh_seconds > 0:
+            self._refresh_task = asyncio.create_task(self._periodic_refresh())
+    
+    
+    async def stop(self):
+        """Остановить фоновое обновление"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        self.loaded = False
+    
+    
+    async def _periodic_refresh(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f'Ошибка обновления справочников: {e}')
+
+
+reference_cache = ReferenceCache(REFERENCE_CACHE_REFRESH_SECONDS)
\ No newline at end of file
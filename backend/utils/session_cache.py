@@ -0,0 +1,88 @@
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+
+
+
+load_dotenv()
+
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv('SESSION_CACHE_MAX_ENTRIES', 10000))
+SESSION_CACHE_TTL_SECONDS = int(os.getenv('SESSION_CACHE_TTL_SECONDS', 60))
+
+
+class SessionCache:
+    """LRU-кэш с TTL: хэш токена сессии -> (снимок UserOrm, момент истечения записи)"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+    
+    
+    @staticmethod
+    def _key(session_token: str) -> str:
+        return hashlib.sha256(session_token.encode()).hexdigest()
+    
+    
+    def get(self, session_token: str):
+        """Получить пользователя из кэша или None, если записи нет или она устарела"""
+        key = self._key(session_token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+    
+    
+    def set(self, session_token: str, user, session_expires_at: datetime):
+        """Положить пользователя в кэш, не дольше TTL и не дольше жизни самой сессии"""
+        if self.max_entries <= 0:
+            return
+        
+        session_ttl = (session_expires_at - datetime.now(timezone.utc)).total_seconds()
+        ttl = min(self.ttl_seconds, session_ttl)
+        if ttl <= 0:
+            return
+        
+        key = self._key(session_token)
+        self._entries[key] = (user, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    
+    def invalidate(self, session_token: str):
+        """Удалить запись (например, при logout)"""
+        self._entries.pop(self._key(session_token), None)
+    
+    
+    def clear(self):
+        self._entries.clear()
+    
+    
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+session_cache = SessionCache(SESSION_CACHE_MAX_ENTRIES, SESSION_CACHE_TTL_SECONDS)
\ No newline at end of file